@@ -0,0 +1,56 @@
+"""Add click rollup tables
+
+Revision ID: 1f8c6d2e9b54
+Revises: e7a3b5c10d42
+Create Date: 2026-10-18 12:26:09.771340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f8c6d2e9b54'
+down_revision: Union[str, Sequence[str], None] = 'e7a3b5c10d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('click_rollups_hourly', 'click_rollups_daily'):
+        op.create_table(
+            table,
+            sa.Column('url_id', sa.Integer(), nullable=False),
+            sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('clicks', sa.Integer(), nullable=False),
+            sa.Column('unique_visitors', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['url_id'], ['urls.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('url_id', 'bucket_start'),
+        )
+    op.create_table(
+        'click_rollup_dimensions',
+        sa.Column('url_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('dimension', sa.String(length=16), nullable=False),
+        sa.Column('value', sa.String(length=512), nullable=False),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['url_id'], ['urls.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('url_id', 'bucket_start', 'dimension', 'value'),
+    )
+    op.create_table(
+        'rollup_checkpoints',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('last_id', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_checkpoints')
+    op.drop_table('click_rollup_dimensions')
+    op.drop_table('click_rollups_daily')
+    op.drop_table('click_rollups_hourly')
@@ -0,0 +1,57 @@
+"""Add archive tables
+
+Revision ID: 3e7b9d1c5a60
+Revises: 8c2e4f6a1b93
+Create Date: 2026-10-18 16:02:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7b9d1c5a60'
+down_revision: Union[str, Sequence[str], None] = '8c2e4f6a1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'archived_urls',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('original_url', sa.String(), nullable=False),
+        sa.Column('short_code', sa.String(length=12), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expired_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('max_clicks', sa.Integer(), nullable=True),
+        sa.Column('one_time_use', sa.Boolean(), nullable=False),
+        sa.Column('redirect_status', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_archived_urls_short_code'), 'archived_urls', ['short_code'], unique=False)
+    op.create_table(
+        'archived_click_logs',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('url_id', sa.Integer(), nullable=False),
+        sa.Column('clicked_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('referrer', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.Column('ip_address', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_click_logs_url_id', 'archived_click_logs', ['url_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_archived_click_logs_url_id', table_name='archived_click_logs')
+    op.drop_table('archived_click_logs')
+    op.drop_index(op.f('ix_archived_urls_short_code'), table_name='archived_urls')
+    op.drop_table('archived_urls')
@@ -0,0 +1,38 @@
+"""Add visitor sketches
+
+Revision ID: 5a9d0e3c7f18
+Revises: 1f8c6d2e9b54
+Create Date: 2026-10-18 13:05:42.219876
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9d0e3c7f18'
+down_revision: Union[str, Sequence[str], None] = '1f8c6d2e9b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'url_sketches',
+        sa.Column('url_id', sa.Integer(), nullable=False),
+        sa.Column('visitors', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['url_id'], ['urls.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('url_id'),
+    )
+    op.add_column('click_rollups_hourly', sa.Column('visitors_sketch', sa.LargeBinary(), nullable=True))
+    op.add_column('click_rollups_daily', sa.Column('visitors_sketch', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('click_rollups_daily', 'visitors_sketch')
+    op.drop_column('click_rollups_hourly', 'visitors_sketch')
+    op.drop_table('url_sketches')
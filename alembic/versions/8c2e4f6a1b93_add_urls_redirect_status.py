@@ -0,0 +1,28 @@
+"""Add urls redirect status
+
+Revision ID: 8c2e4f6a1b93
+Revises: 5a9d0e3c7f18
+Create Date: 2026-10-18 15:21:07.582134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e4f6a1b93'
+down_revision: Union[str, Sequence[str], None] = '5a9d0e3c7f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('urls', sa.Column('redirect_status', sa.Integer(), server_default='307', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('urls', 'redirect_status')
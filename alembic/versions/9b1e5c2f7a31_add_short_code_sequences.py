@@ -0,0 +1,33 @@
+"""Add short code sequences table
+
+Revision ID: 9b1e5c2f7a31
+Revises: 4d6a78ab2064
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1e5c2f7a31'
+down_revision: Union[str, Sequence[str], None] = '4d6a78ab2064'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'short_code_sequences',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('short_code_sequences')
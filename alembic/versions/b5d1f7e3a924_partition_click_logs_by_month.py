@@ -0,0 +1,96 @@
+"""Partition click logs by month
+
+Revision ID: b5d1f7e3a924
+Revises: 3e7b9d1c5a60
+Create Date: 2026-10-18 17:40:12.904551
+
+On PostgreSQL, `click_logs` is rebuilt as a table range-partitioned by month of `clicked_at`,
+with one partition per month from the oldest click to two months ahead and a default partition.
+Existing rows are copied in one transaction, so run this during a maintenance window on large
+tables. Other databases only get the `clicked_at` index.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f7e3a924'
+down_revision: Union[str, Sequence[str], None] = '3e7b9d1c5a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, url_id, clicked_at, referrer, user_agent, ip_address"
+
+
+def _next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_click_logs_id', 'click_logs', ['id'], unique=False)
+    op.create_index('ix_click_logs_url_id_clicked_at', 'click_logs', ['url_id', 'clicked_at'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_index('ix_click_logs_clicked_at', 'click_logs', ['clicked_at'], unique=False)
+        return
+
+    op.rename_table('click_logs', 'click_logs_unpartitioned')
+    op.execute("""
+        CREATE TABLE click_logs (
+            id INTEGER NOT NULL DEFAULT nextval('click_logs_id_seq'),
+            url_id INTEGER NOT NULL REFERENCES urls (id) ON DELETE CASCADE,
+            clicked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            referrer VARCHAR,
+            user_agent TEXT,
+            ip_address VARCHAR,
+            PRIMARY KEY (id, clicked_at)
+        ) PARTITION BY RANGE (clicked_at)
+    """)
+    op.execute("ALTER SEQUENCE click_logs_id_seq OWNED BY click_logs.id")
+    op.execute("CREATE TABLE click_logs_default PARTITION OF click_logs DEFAULT")
+
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(sa.text("SELECT min(clicked_at) FROM click_logs_unpartitioned")).scalar() or now
+    month = oldest.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = _next_month(_next_month(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)))
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE click_logs_{month.year:04d}_{month.month:02d} PARTITION OF click_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+
+    op.execute(f"INSERT INTO click_logs ({COLUMNS}) SELECT {COLUMNS} FROM click_logs_unpartitioned")
+    op.drop_table('click_logs_unpartitioned')
+    _create_indexes()
+    op.create_index('ix_click_logs_clicked_at', 'click_logs', ['clicked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('ix_click_logs_clicked_at', table_name='click_logs')
+        return
+
+    op.rename_table('click_logs', 'click_logs_partitioned')
+    op.execute("""
+        CREATE TABLE click_logs (
+            id INTEGER NOT NULL DEFAULT nextval('click_logs_id_seq') PRIMARY KEY,
+            url_id INTEGER NOT NULL REFERENCES urls (id) ON DELETE CASCADE,
+            clicked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            referrer VARCHAR,
+            user_agent TEXT,
+            ip_address VARCHAR
+        )
+    """)
+    op.execute("ALTER SEQUENCE click_logs_id_seq OWNED BY click_logs.id")
+    op.execute(f"INSERT INTO click_logs ({COLUMNS}) SELECT {COLUMNS} FROM click_logs_partitioned")
+    op.drop_table('click_logs_partitioned')
+    _create_indexes()
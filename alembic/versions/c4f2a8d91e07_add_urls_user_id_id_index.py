@@ -0,0 +1,28 @@
+"""Add urls user_id, id index
+
+Revision ID: c4f2a8d91e07
+Revises: 9b1e5c2f7a31
+Create Date: 2026-10-18 11:02:17.504913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f2a8d91e07'
+down_revision: Union[str, Sequence[str], None] = '9b1e5c2f7a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_urls_user_id_id', 'urls', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_urls_user_id_id', table_name='urls')
@@ -0,0 +1,36 @@
+"""Add bot hits daily
+
+Revision ID: d2a6c8e4f190
+Revises: b5d1f7e3a924
+Create Date: 2026-10-18 19:41:07.526913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6c8e4f190'
+down_revision: Union[str, Sequence[str], None] = 'b5d1f7e3a924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bot_hits_daily',
+        sa.Column('url_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['url_id'], ['urls.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('url_id', 'bucket_start', 'kind'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('bot_hits_daily')
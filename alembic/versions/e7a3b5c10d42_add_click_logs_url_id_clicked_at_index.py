@@ -0,0 +1,28 @@
+"""Add click_logs url_id, clicked_at index
+
+Revision ID: e7a3b5c10d42
+Revises: c4f2a8d91e07
+Create Date: 2026-10-18 11:41:53.087126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b5c10d42'
+down_revision: Union[str, Sequence[str], None] = 'c4f2a8d91e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_click_logs_url_id_clicked_at', 'click_logs', ['url_id', 'clicked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_click_logs_url_id_clicked_at', table_name='click_logs')
@@ -0,0 +1,145 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Iterable
+import json
+import logging
+import re
+
+from app.database.session import AsyncSessionLocal, session_router, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.services.bot_filter import PREFETCH, PURPOSE_HEADERS, bot_hit_counter, classify_request
+from app.services.click_counter import click_counter
+from app.services.redirect import ResolvedUrl, resolution_cache, resolve_short_code
+from app.services.redirect_throttle import redirect_throttle
+from app.services.short_code_filter import short_code_filter
+from app.services.url import log_click
+
+logger = logging.getLogger(__name__)
+
+_SHORT_CODE_PATH = re.compile(r"^/([A-Za-z0-9_-]{1,12})$")
+_PURPOSE_HEADERS = tuple(name.encode() for name in PURPOSE_HEADERS)
+
+
+def _json_response(status: int, detail: str, headers: Iterable[tuple[bytes, bytes]] = ()) -> tuple[dict, dict]:
+    body = json.dumps({"detail": detail}, separators=(",", ":")).encode()
+    start = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+_NOT_FOUND = _json_response(404, "Short URL not found.")
+_EXPIRED = _json_response(404, "Short URL expired.")
+_PREFETCH_DECLINED = (
+    {"type": "http.response.start", "status": 503, "headers": [(b"cache-control", b"no-store")]},
+    {"type": "http.response.body", "body": b""},
+)
+_THROTTLED = _json_response(
+    429, "Too many redirects.", [(b"retry-after", str(redirect_throttle.window_seconds).encode())]
+)
+
+
+class RedirectFastPathMiddleware:
+    """
+    Pure ASGI middleware answering `GET /{code}` redirects of unlimited short URLs before FastAPI
+    routing, dependency injection and `Request` construction get involved.
+
+    Codes are checked against the short code filter, then resolved from the resolution cache, and
+    only on a miss through a session opened for that lookup. The 3xx response is written from the
+    prebuilt headers of the cached record. Everything else falls through to the wrapped app:
+    other paths, `reserved_paths`, other methods, and click-limited URLs, whose click has to be
+    claimed by the regular redirect route. Bots, prefetches and throttled redirects are handled
+    like in the redirect route.
+    """
+
+    def __init__(
+            self,
+            app,
+            reserved_paths: Iterable[str] = (),
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ):
+        self.app = app
+        self.reserved_paths = frozenset(reserved_paths)
+        self.session_factory = session_factory
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        match = _SHORT_CODE_PATH.match(scope["path"])
+        if match is None or scope["path"] in self.reserved_paths:
+            await self.app(scope, receive, send)
+            return
+
+        code = match.group(1)
+        if not short_code_filter.might_exist(code):
+            await self._send(send, *_NOT_FOUND)
+            return
+
+        shard = shard_router.shard_for(code)
+        url = resolution_cache.get(code) or await self._resolve(code, shard)
+        if url is None:
+            await self._send(send, *_NOT_FOUND)
+            return
+        if url.is_expired():
+            await self._send(send, *_EXPIRED)
+            return
+        if url.is_limited or url.raw_headers is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        referrer = headers.get(b"referer")
+        user_agent = headers.get(b"user-agent")
+        user_agent = user_agent.decode("latin-1") if user_agent is not None else None
+        purpose = next((headers[name] for name in _PURPOSE_HEADERS if name in headers), None)
+        kind = classify_request(user_agent, purpose.decode("latin-1") if purpose is not None else None)
+        if kind is not None:
+            bot_hit_counter.increment(url.id, kind, shard)
+            if kind == PREFETCH:
+                await self._send(send, *_PREFETCH_DECLINED)
+                return
+        else:
+            client = scope.get("client")
+            ip_address = client[0] if client else None
+            throttled = redirect_throttle.hit(code, ip_address)
+            if throttled and redirect_throttle.rejects:
+                await self._send(send, *_THROTTLED)
+                return
+            if not throttled:
+                click_counter.increment(url.id, shard=shard)
+                await log_click(
+                    url.id,
+                    referrer.decode("latin-1") if referrer is not None else None,
+                    user_agent,
+                    ip_address,
+                    shard,
+                )
+        logger.info(f"Redirecting '{code}' to '{url.original_url}' with status {url.redirect_status} (fast path).")
+        await self._send(
+            send,
+            {"type": "http.response.start", "status": url.redirect_status, "headers": list(url.raw_headers)},
+            {"type": "http.response.body", "body": b""},
+        )
+
+    async def _resolve(self, code: str, shard: str) -> ResolvedUrl | None:
+        """
+        Looks a code up on a read replica of its shard, or on the shard itself, like the redirect route.
+        """
+        if shard != DEFAULT_SHARD:
+            async with shard_router.session_factory(shard)() as db:
+                return await resolve_short_code(db, code)
+        replica = session_router.read_session_factory()
+        if replica is not None:
+            async with replica() as db:
+                url = await resolve_short_code(db, code)
+            if url is not None:
+                return url
+        async with self.session_factory() as db:
+            return await resolve_short_code(db, code)
+
+    @staticmethod
+    async def _send(send, start: dict, body: dict) -> None:
+        await send(start)
+        await send(body)
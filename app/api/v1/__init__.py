@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
+from app.core.config import settings
+
 from .routes.auth import router as auth
+from .routes.metrics import router as metrics
 from .routes.redirect import router as redirect
 from .routes.url import router as url
 
@@ -9,3 +12,6 @@ router = APIRouter()
 router.include_router(auth, prefix="/api/v1/auth")
 router.include_router(redirect)
 router.include_router(url, prefix="/api/v1/url")
+
+if settings.METRICS_ENABLED:
+    router.include_router(metrics, prefix="/api/v1/metrics")
@@ -1,13 +1,15 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Path, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable
 from jose import JWTError, jwt
 
-from app.database.session import AsyncSessionLocal
+from app.database.session import AsyncSessionLocal, session_router, shard_router
+from app.database.sharding import DEFAULT_SHARD
 from app.core.security import decode_access_token
 from app.services.user import get_user_by_email
-from app.models.user import User
+from app.services.url import find_url_shard
+from app.services.auth import Principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
@@ -22,14 +24,27 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await db_session.close()
 
+def get_session_factory() -> Callable[[], AsyncSession]:
+    """
+    Dependency to provide the session factory itself.
+    Used by streaming responses, which outlive the request-scoped session from `get_db`
+    and therefore have to open and close their own session.
+    """
+    return AsyncSessionLocal
+
 async def get_current_user(
         token: str = Depends(oauth2_scheme),
         db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Dependency to get the current authenticated user.
-    Validates the JWT token and fetches the user from the database.
+    Serves tokens seen before from the principal cache; otherwise validates the JWT token,
+    fetches the user from the database and caches the result until the token expires.
     """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,4 +58,72 @@ async def get_current_user(
     user = await get_user_by_email(db, email=token_data.username)
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal(id=user.id, email=user.email)
+    principal_cache.set(token, principal, token_data.exp)
+    return principal
+
+
+async def get_read_db(db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to provide a session for read-only work, on a read replica when one is available.
+    Falls back to the primary session from `get_db`.
+    """
+    replica = session_router.read_session_factory()
+    if replica is None:
+        yield db
+        return
+    async with replica() as read_session:
+        yield read_session
+
+async def get_user_read_db(
+        db: AsyncSession = Depends(get_db),
+        current_user: Principal = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to provide a read-only session for the current user, on a read replica unless the
+    user wrote recently, in which case the primary is used so they read their own writes.
+    """
+    replica = session_router.read_session_factory(current_user.id)
+    if replica is None:
+        yield db
+        return
+    async with replica() as read_session:
+        yield read_session
+
+def get_read_session_factory(
+        session_factory: Callable[[], AsyncSession] = Depends(get_session_factory),
+        current_user: Principal = Depends(get_current_user),
+) -> Callable[[], AsyncSession]:
+    """
+    Dependency to provide a session factory for read-only streaming responses of the current user,
+    routed like `get_user_read_db`.
+    """
+    return session_router.read_session_factory(current_user.id) or session_factory
+
+async def _url_shard_session(db: AsyncSession, url_id: int, user_id: int) -> AsyncGenerator[AsyncSession, None]:
+    shard = await find_url_shard(db, url_id, user_id) or DEFAULT_SHARD
+    async with shard_router.session(shard, db) as shard_db:
+        yield shard_db
+
+async def get_url_db(
+        url_id: int = Path(...),
+        db: AsyncSession = Depends(get_db),
+        current_user: Principal = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to provide a session on the shard storing the current user's URL `url_id`.
+    Unknown URLs get the default shard's session, where lookups simply find nothing.
+    """
+    async for shard_db in _url_shard_session(db, url_id, current_user.id):
+        yield shard_db
+
+async def get_url_read_db(
+        url_id: int = Path(...),
+        db: AsyncSession = Depends(get_user_read_db),
+        current_user: Principal = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency like `get_url_db` for read-only work, using a read replica for the default shard.
+    """
+    async for shard_db in _url_shard_session(db, url_id, current_user.id):
+        yield shard_db
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi_limiter.depends import RateLimiter
 from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
@@ -9,10 +8,11 @@ import logging
 from app.schemas.user import UserCreate, UserResponse
 from app.schemas.token import Token
 from app.services.user import create_user, get_user_by_email
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password_async, create_access_token, PasswordHashPoolBusy
 from app.api.v1.deps import get_db, get_current_user
-from app.models.user import User
+from app.services.auth import Principal
 from app.core.config import settings
+from app.core.rate_limit import RateLimit
 
 router = APIRouter(tags=["Authentication"])
 logger = logging.getLogger(__name__)
@@ -25,7 +25,7 @@ logger = logging.getLogger(__name__)
     summary="Register a new user account",
     dependencies=[
         Depends(
-            RateLimiter(
+            RateLimit(
                 times=settings.RATE_LIMIT_REGISTER_TIMES,
                 seconds=settings.RATE_LIMIT_REGISTER_SECONDS
             )
@@ -53,6 +53,13 @@ async def register_user(
         new_user = await create_user(db=db, user_create=user_create)
         logger.info(f"User '{new_user.email}' registered successfully with ID: {new_user.id}")
         return new_user
+    except PasswordHashPoolBusy:
+        logger.warning(f"Registration for {user_create.email} rejected: password hash pool is saturated.")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is busy. Try again shortly.",
+            headers={"Retry-After": "1"},
+        )
     except IntegrityError:
         logger.error(f"Database integrity error during registration for {user_create.email}")
         raise HTTPException(
@@ -73,7 +80,7 @@ async def register_user(
     summary="Authenticate user and return access token",
     dependencies=[
         Depends(
-            RateLimiter(
+            RateLimit(
                 times=settings.RATE_LIMIT_LOGIN_TIMES,
                 seconds=settings.RATE_LIMIT_LOGIN_SECONDS
             )
@@ -91,7 +98,17 @@ async def login_for_access_token(
     logger.info(f"Login attempt for username: {form_data.username}")
     user = await get_user_by_email(db, email=form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        verified = user is not None and await verify_password_async(form_data.password, user.hashed_password)
+    except PasswordHashPoolBusy:
+        logger.warning(f"Login for '{form_data.username}' rejected: password hash pool is saturated.")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is busy. Try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    if not verified:
         logger.warning(f"Login failed: Incorrect credentials for username '{form_data.username}'")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -113,7 +130,7 @@ async def login_for_access_token(
     response_model=UserResponse,
     summary="Get current authenticated user"
 )
-async def read_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(current_user: Principal = Depends(get_current_user)):
     """
     Return current authenticated user information based on the provided JWT token.
     """
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+import logging
+
+from app.api.v1.deps import get_current_user
+from app.core.rate_limit import local_rate_limiter
+from app.core.security import password_hash_pool
+from app.database.engine import pool_monitor
+from app.database.session import engine, session_router
+from app.services.auth import Principal, principal_cache
+from app.services.bot_filter import bot_hit_counter
+from app.services.click_counter import click_counter
+from app.services.click_ingestion import click_ingestor
+from app.services.click_retention import click_retention_worker, shard_click_retention_workers
+from app.services.expiry_sweeper import expiry_sweeper, shard_expiry_sweepers
+from app.services.qr import qr_renderer
+from app.services.redirect import resolution_cache, invalidation_bus
+from app.services.redirect_throttle import redirect_throttle
+from app.services.short_code_filter import short_code_filter, short_code_bus
+from app.services.rollup import click_rollup_worker, shard_rollup_workers
+
+router = APIRouter(tags=["Metrics"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/", summary="Get in-process runtime metrics")
+async def get_metrics(current_user: Principal = Depends(get_current_user)) -> dict:
+    """
+    Returns counters of the in-process caches and background components of this worker.
+    Only mounted when `METRICS_ENABLED` is set, and requires authentication.
+    """
+    return {
+        "database_pool": pool_monitor.stats(engine.pool),
+        "read_replicas": session_router.stats(),
+        "redirect_cache": resolution_cache.stats(),
+        "redirect_throttle": redirect_throttle.stats(),
+        "auth_cache": principal_cache.stats(),
+        "password_hashing": password_hash_pool.stats(),
+        "rate_limiting": local_rate_limiter.stats(),
+        "qr_codes": qr_renderer.stats(),
+        "cache_invalidation": invalidation_bus.stats(),
+        "short_code_filter": {**short_code_filter.stats(), "broadcast": short_code_bus.stats()},
+        "click_ingestion": click_ingestor.stats(),
+        "click_counter": click_counter.stats(),
+        "bot_hits": bot_hit_counter.stats(),
+        "click_rollup": click_rollup_worker.stats(),
+        "shard_click_rollups": {shard: worker.stats() for shard, worker in shard_rollup_workers.items()},
+        "click_retention": click_retention_worker.stats(),
+        "shard_click_retentions": {shard: worker.stats() for shard, worker in shard_click_retention_workers.items()},
+        "expiry_sweep": expiry_sweeper.stats(),
+        "shard_expiry_sweeps": {shard: sweeper.stats() for shard, sweeper in shard_expiry_sweepers.items()},
+    }
@@ -1,11 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Request
-from fastapi.responses import RedirectResponse
-from sqlalchemy import select, func
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.v1.deps import get_db
-from app.models.url import Url
+from app.api.v1.deps import get_db, get_read_db
+from app.database.session import shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.services.bot_filter import PREFETCH, PURPOSE_HEADERS, bot_hit_counter, classify_request
+from app.services.click_counter import claim_limited_click, click_counter
+from app.services.redirect import (
+    PrebuiltRedirectResponse,
+    ResolvedUrl,
+    invalidate_short_code,
+    redirect_cache_control,
+    redirect_headers,
+    resolve_short_code,
+)
+from app.services.redirect_throttle import redirect_throttle
+from app.services.short_code_filter import short_code_filter
 from app.services.url import log_click
-from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,55 +33,119 @@ async def redirect_to_target_url(
         request: Request,
         code: str = Path(..., description="The short code to redirect."),
         db: AsyncSession = Depends(get_db),
-) -> RedirectResponse:
+        read_db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """
     Redirects a short code to its original long URL.
     Increments the click count, logs click details, and handles expiration/max clicks/one-time use.
+    Resolution records are served from an in-process cache, so hot codes skip the lookup query;
+    cache misses are looked up on a read replica, and on the primary if the replica does not know
+    the code yet (e.g. a link created moments ago).
+    Click logs go through the background ingestion pipeline and unlimited URLs are counted by the
+    coalescing click counter. Click-limited URLs claim their click synchronously with a single
+    conditional `UPDATE ... RETURNING original_url`, which keeps their limits exact under load.
+    Each URL redirects with its own status code; unlimited URLs are answered from headers encoded
+    once per cache fill, with a Cache-Control bounded by their expiry, and limited ones with `no-store`.
+    Codes stored on another shard than the default one are resolved and counted on that shard.
+    Codes the short code Bloom filter has never seen are rejected before any lookup.
+    Redirects of short codes and client IPs over their throttle limits are rejected, or for
+    unlimited URLs redirected without counting or logging the click, as configured.
+    Link preview crawlers and browser prefetches never consume a click: they get a non-consuming
+    response and are only tallied per URL and day in `bot_hits_daily`.
     """
     logger.info(f"Redirect request for short code: {code}")
-    result = await db.execute(select(Url).where(Url.short_code == code))
-    url = result.scalar_one_or_none()
+    if not short_code_filter.might_exist(code):
+        logger.info(f"Redirect rejected: Short URL '{code}' is not in the short code filter.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL not found.")
+    shard = shard_router.shard_for(code)
+    if shard != DEFAULT_SHARD:
+        async with shard_router.session(shard) as shard_db:
+            return await _redirect(request, code, shard, shard_db, shard_db)
+    return await _redirect(request, code, shard, db, read_db)
+
+
+async def _redirect(
+        request: Request,
+        code: str,
+        shard: str,
+        db: AsyncSession,
+        read_db: AsyncSession,
+) -> Response:
+    url = await resolve_short_code(read_db, code)
+    if not url and read_db is not db:
+        url = await resolve_short_code(db, code)
 
     if not url:
         logger.warning(f"Redirect failed: Short URL '{code}' not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL not found.")
 
-    if url.expired_at and url.expired_at < datetime.now(url.expired_at.tzinfo):
+    if url.is_expired():
         logger.warning(f"Redirect failed for '{code}': URL expired at {url.expired_at}.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL expired.")
 
-    if url.max_clicks is not None and url.clicks >= url.max_clicks:
-        logger.warning(
-            f"Redirect failed for '{code}': Max clicks limit reached ({url.clicks}/{url.max_clicks}).")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL limit reached.")
-
     referrer = request.headers.get("referer")
     user_agent = request.headers.get("user-agent")
     ip_address = request.client.host
 
-    try:
-        await log_click(db, url.id, referrer, user_agent, ip_address)
-    except Exception as e:
-        logger.error(f"Failed to log click for URL ID {url.id}: {e}", exc_info=True)
-
-    url.clicks += 1
-
-    if url.one_time_use:
-        url.expired_at = func.now()
-        logger.info(f"One-time use URL '{code}' consumed and expired.")
-
-    try:
-        await db.commit()
-        await db.refresh(url)
-        logger.info(f"Redirecting '{code}' to '{url.original_url}'. Clicks: {url.clicks}.")
-        return RedirectResponse(url=url.original_url)
-    except Exception as e:
-        await db.rollback()
-        logger.critical(
-            f"Unexpected error during redirect and URL update for '{code}': {e}",
-            exc_info=True
-        )
+    kind = classify_request(user_agent, _request_purpose(request))
+    if kind is not None:
+        bot_hit_counter.increment(url.id, kind, shard)
+        logger.info(f"Redirect of '{code}' classified as {kind}, not counted as a click.")
+        return _classified_response(url, kind)
+
+    throttled = redirect_throttle.hit(code, ip_address)
+    if throttled and (url.is_limited or redirect_throttle.rejects):
+        logger.warning(f"Redirect rejected for '{code}': Throttled for client {ip_address}.")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error during redirect."
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many redirects.",
+            headers={"Retry-After": str(redirect_throttle.window_seconds)},
         )
+
+    raw_headers = url.raw_headers
+    if url.is_limited:
+        try:
+            target_url = await claim_limited_click(db, url.id)
+        except Exception as e:
+            await db.rollback()
+            logger.critical(
+                f"Unexpected error during redirect and URL update for '{code}': {e}",
+                exc_info=True
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error during redirect."
+            )
+        if target_url is None:
+            logger.warning(f"Redirect failed for '{code}': Max clicks limit reached ({url.click_limit}).")
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL limit reached.")
+        if url.one_time_use:
+            await invalidate_short_code(code)
+            logger.info(f"One-time use URL '{code}' consumed and expired.")
+        cache_control = redirect_cache_control(url.redirect_status, url.expired_at, limited=True)
+        raw_headers = redirect_headers(target_url, cache_control)
+    elif not throttled:
+        click_counter.increment(url.id, shard=shard)
+
+    if not throttled:
+        await log_click(url.id, referrer, user_agent, ip_address, shard)
+    logger.info(f"Redirecting '{code}' to '{url.original_url}' with status {url.redirect_status}.")
+    return PrebuiltRedirectResponse(url.redirect_status, raw_headers)
+
+
+def _request_purpose(request: Request) -> str | None:
+    return next((request.headers[name] for name in PURPOSE_HEADERS if name in request.headers), None)
+
+
+def _classified_response(url: ResolvedUrl, kind: str) -> Response:
+    """
+    Answers a bot or a prefetch without consuming a click. Prefetches are declined with an
+    uncacheable 503, so the browser requests the link again when it is actually followed. Bots are
+    redirected to unlimited URLs, and get an empty response for click-limited ones, whose target
+    is only handed out against a click.
+    """
+    if kind == PREFETCH:
+        return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Cache-Control": "no-store"})
+    if url.is_limited:
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Cache-Control": "no-store"})
+    return PrebuiltRedirectResponse(url.redirect_status, url.raw_headers)
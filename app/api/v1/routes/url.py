@@ -1,23 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, status
-from fastapi.responses import JSONResponse, Response
-from fastapi_limiter.depends import RateLimiter
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, AsyncGenerator, Callable
+from pydantic import ValidationError
+from io import StringIO
+import base64
+import csv
 import logging
 
-from app.api.v1.deps import get_db, get_current_user
-from app.schemas.url import UrlCreate, UrlUpdate, UrlOut, UrlAnalyticsOut, ClickLogOut
-from app.models.user import User
+from app.api.v1.deps import (
+    get_db,
+    get_current_user,
+    get_session_factory,
+    get_user_read_db,
+    get_read_session_factory,
+    get_url_db,
+    get_url_read_db,
+)
+from app.database.session import session_router
+from app.schemas.url import (
+    UrlCreate,
+    UrlUpdate,
+    UrlOut,
+    UrlAnalyticsOut,
+    ClickLogOut,
+    AnalyticsBucket,
+    UrlBulkCreate,
+    UrlBulkCreateOut,
+    UrlBulkItemResult,
+    UrlStatus,
+    UrlExportFormat,
+    QrFormat,
+    QrErrorCorrection,
+    QrExportRequest,
+)
+from app.services.auth import Principal
 from app.core.config import settings
+from app.core.rate_limit import RateLimit
 from app.services.url import (
     create_short_url,
+    create_short_urls_bulk,
     get_user_urls,
+    stream_user_urls,
     get_url_by_id,
     update_url,
     delete_url_by_id,
-    get_url_analytics
 )
-from app.utils import generate_qr_code_base64
+from app.services.analytics import get_url_analytics, get_url_click_logs
+from app.services.qr import qr_etag, qr_renderer, stream_qr_zip
+from app.utils import encode_cursor, decode_cursor
 
 router = APIRouter(tags=["URLs"])
 logger = logging.getLogger(__name__)
@@ -30,7 +62,7 @@ logger = logging.getLogger(__name__)
     summary="Create a new short URL",
     dependencies=[
         Depends(
-            RateLimiter(
+            RateLimit(
                 times=settings.RATE_LIMIT_CREATE_URL_TIMES,
                 seconds=settings.RATE_LIMIT_CREATE_URL_SECONDS
             )
@@ -40,7 +72,7 @@ logger = logging.getLogger(__name__)
 async def create_url(
         url_create: UrlCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
     Create a new shortened URL for the authenticated user.
@@ -48,7 +80,9 @@ async def create_url(
     """
     logger.info(f"User {current_user.id} attempting to create URL: {url_create.original_url}")
     try:
-        return await create_short_url(db, current_user.id, url_create)
+        url = await create_short_url(db, current_user.id, url_create)
+        session_router.record_write(current_user.id)
+        return url
     except ValueError as e:
         logger.warning(f"URL creation failed due to validation error: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -57,23 +91,245 @@ async def create_url(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create URL.")
 
 
-@router.get("/", response_model=List[UrlOut], summary="List all short URLs for the current user")
-async def list_user_urls(
+@router.post(
+    "/bulk",
+    response_model=UrlBulkCreateOut,
+    summary="Create many short URLs at once",
+    dependencies=[
+        Depends(
+            RateLimit(
+                times=settings.RATE_LIMIT_CREATE_URL_TIMES,
+                seconds=settings.RATE_LIMIT_CREATE_URL_SECONDS
+            )
+        )
+    ]
+)
+async def create_urls_bulk(
+        bulk_create: UrlBulkCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
-    Retrieve a list of all shortened URLs owned by the current authenticated user.
+    Create up to `BULK_CREATE_MAX_ITEMS` shortened URLs in one request.
+    Every item gets its own result; items that fail (e.g. a taken custom code) carry an error
+    instead of aborting the batch.
     """
-    logger.info(f"Fetching all URLs for user ID: {current_user.id}")
-    return await get_user_urls(db, current_user.id)
+    logger.info(f"User {current_user.id} creating {len(bulk_create.items)} URLs in bulk.")
+    results = await create_short_urls_bulk(db, current_user.id, bulk_create.items)
+    session_router.record_write(current_user.id)
+    failed = sum(result.error is not None for result in results)
+    return UrlBulkCreateOut(created=len(results) - failed, failed=failed, results=results)
+
+
+@router.post(
+    "/bulk/ndjson",
+    summary="Create short URLs from an NDJSON stream",
+    response_class=StreamingResponse,
+    dependencies=[
+        Depends(
+            RateLimit(
+                times=settings.RATE_LIMIT_CREATE_URL_TIMES,
+                seconds=settings.RATE_LIMIT_CREATE_URL_SECONDS
+            )
+        )
+    ]
+)
+async def create_urls_bulk_ndjson(
+        request: Request,
+        session_factory: Callable[[], AsyncSession] = Depends(get_session_factory),
+        current_user: Principal = Depends(get_current_user),
+):
+    """
+    Create shortened URLs from a newline-delimited JSON body with one `UrlCreate` object per line.
+    The body is parsed up front (at most `BULK_CREATE_MAX_ITEMS` lines of at most
+    `BULK_CREATE_MAX_LINE_BYTES` bytes each); the URLs are then created chunk by chunk while
+    one result line per input line is streamed back.
+    """
+    logger.info(f"User {current_user.id} started an NDJSON bulk creation.")
+    user_id = current_user.id
+    items, parse_errors = await _read_ndjson_items(request)
+
+    async def generate_results() -> AsyncGenerator[str, None]:
+        for error in parse_errors:
+            yield error.model_dump_json() + "\n"
+        async with session_factory() as db:
+            chunk_size = settings.BULK_CREATE_CHUNK_SIZE
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start:start + chunk_size]
+                results = await create_short_urls_bulk(db, user_id, [item for _, item in chunk])
+                session_router.record_write(user_id)
+                for (index, _), result in zip(chunk, results):
+                    result.index = index
+                    yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(generate_results(), media_type="application/x-ndjson")
+
+
+async def _read_ndjson_items(
+        request: Request,
+) -> tuple[List[tuple[int, UrlCreate]], List[UrlBulkItemResult]]:
+    """
+    Reads and validates an NDJSON request body, enforcing the line length and item count limits.
+    Returns the valid items with their line index, and an error result for every invalid line.
+    """
+    max_line_bytes = settings.BULK_CREATE_MAX_LINE_BYTES
+    items: List[tuple[int, UrlCreate]] = []
+    errors: List[UrlBulkItemResult] = []
+    index = 0
+
+    def parse(line: bytes) -> None:
+        nonlocal index
+        if not line.strip():
+            return
+        if index >= settings.BULK_CREATE_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.BULK_CREATE_MAX_ITEMS} items can be created per request.",
+            )
+        try:
+            items.append((index, UrlCreate.model_validate_json(line)))
+        except ValidationError as e:
+            errors.append(UrlBulkItemResult(index=index, error=str(e)))
+        index += 1
+
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes or any(len(line) > max_line_bytes for line in lines):
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"NDJSON lines must not exceed {max_line_bytes} bytes.",
+            )
+        for line in lines:
+            parse(line)
+    parse(buffer)
+    return items, errors
+
+
+@router.get("/", response_model=List[UrlOut], summary="List the short URLs of the current user")
+async def list_user_urls(
+        response: Response,
+        limit: int = Query(
+            settings.URL_LIST_DEFAULT_PAGE_SIZE,
+            ge=1,
+            le=settings.URL_LIST_MAX_PAGE_SIZE,
+            description="Maximum number of URLs to return.",
+        ),
+        cursor: str | None = Query(None, description="Cursor from the `X-Next-Cursor` header of the previous page."),
+        url_status: UrlStatus | None = Query(None, alias="status", description="Only return URLs in this state."),
+        created_from: datetime | None = Query(None, description="Only return URLs created at or after this time."),
+        created_to: datetime | None = Query(None, description="Only return URLs created before this time."),
+        db: AsyncSession = Depends(get_user_read_db),
+        current_user: Principal = Depends(get_current_user),
+):
+    """
+    Retrieve one page of the shortened URLs owned by the current authenticated user, newest first.
+    If more URLs are available, the `X-Next-Cursor` response header holds the cursor of the next page.
+    """
+    logger.info(f"Fetching URLs for user ID: {current_user.id}")
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    urls, next_id = await get_user_urls(
+        db, current_user.id, limit, after_id, url_status, created_from, created_to
+    )
+    if next_id is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_id)
+    return urls
+
+
+@router.get("/export", summary="Export all short URLs of the current user", response_class=StreamingResponse)
+async def export_user_urls(
+        export_format: UrlExportFormat = Query(UrlExportFormat.NDJSON, alias="format"),
+        url_status: UrlStatus | None = Query(None, alias="status", description="Only export URLs in this state."),
+        created_from: datetime | None = Query(None, description="Only export URLs created at or after this time."),
+        created_to: datetime | None = Query(None, description="Only export URLs created before this time."),
+        session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+        current_user: Principal = Depends(get_current_user),
+):
+    """
+    Stream every URL of the current user as NDJSON or CSV, read from a server-side cursor.
+    """
+    logger.info(f"User {current_user.id} exporting URLs as {export_format.value}.")
+    user_id = current_user.id
+    columns = list(UrlOut.model_fields)
+
+    async def generate_rows() -> AsyncGenerator[str, None]:
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        if export_format == UrlExportFormat.CSV:
+            writer.writerow(columns)
+        async with session_factory() as db:
+            async for row in stream_user_urls(db, user_id, url_status, created_from, created_to):
+                if export_format == UrlExportFormat.NDJSON:
+                    yield UrlOut.model_validate(row).model_dump_json() + "\n"
+                    continue
+                writer.writerow([getattr(row, column) for column in columns])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if export_format == UrlExportFormat.CSV and buffer.tell():
+            yield buffer.getvalue()
+
+    if export_format == UrlExportFormat.CSV:
+        return StreamingResponse(
+            generate_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="urls.csv"'},
+        )
+    return StreamingResponse(generate_rows(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/qr/export",
+    summary="Export the QR codes of many short URLs as a ZIP archive",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/zip": {}}}},
+)
+async def export_qr_codes(
+        export: QrExportRequest,
+        session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+        current_user: Principal = Depends(get_current_user),
+):
+    """
+    Streams a ZIP archive with the QR code of every listed URL of the current user (or of every URL
+    matching the filters when no IDs are given), one `<short_code>.<format>` file each, and a
+    `manifest.csv` mapping the files to their short URLs. QR codes are rendered in parallel on the
+    QR process pool and each file is sent as soon as it is rendered. IDs of URLs the user does not
+    own are skipped.
+    """
+    logger.info(f"User {current_user.id} exporting QR codes as a ZIP archive.")
+    user_id = current_user.id
+
+    async def short_urls() -> AsyncGenerator[tuple[str, str], None]:
+        async with session_factory() as db:
+            async for row in stream_user_urls(
+                    db, user_id, export.status, export.created_from, export.created_to, export.url_ids
+            ):
+                yield row.short_code, f"{settings.BASE_DOMAIN}/{row.short_code}"
+
+    return StreamingResponse(
+        stream_qr_zip(
+            short_urls(),
+            qr_renderer,
+            export.size,
+            export.format,
+            export.error_correction.value,
+            settings.QR_EXPORT_CONCURRENCY,
+        ),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="qr-codes.zip"'},
+    )
 
 
 @router.get("/{url_id}", response_model=UrlOut, summary="Get a short URL by its ID")
 async def get_url(
         url_id: int = Path(..., description="The ID of the short URL to retrieve."),
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_url_read_db),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
     Retrieve details of a specific short URL by its ID, ensuring it belongs to the current user.
@@ -90,8 +346,8 @@ async def get_url(
 async def update_url_endpoint(
         url_update: UrlUpdate,
         url_id: int = Path(..., description="The ID of the short URL to update."),
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_url_db),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
     Update details of an existing short URL (e.g., original URL, expiration date, max clicks, one-time use).
@@ -99,6 +355,7 @@ async def update_url_endpoint(
     """
     logger.info(f"User {current_user.id} attempting to update URL ID: {url_id}")
     updated_url = await update_url(db, url_id, current_user.id, url_update)
+    session_router.record_write(current_user.id)
     if not updated_url:
         logger.warning(f"URL update failed: ID {url_id} not found or not allowed for user {current_user.id}.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or not allowed.")
@@ -109,14 +366,15 @@ async def update_url_endpoint(
 @router.delete("/{url_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a short URL")
 async def delete_url(
         url_id: int = Path(..., description="The ID of the short URL to delete."),
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_url_db),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
     Delete a specific short URL. Only the owner of the URL can delete it.
     """
     logger.info(f"User {current_user.id} attempting to delete URL ID: {url_id}")
     success = await delete_url_by_id(db, url_id, current_user.id)
+    session_router.record_write(current_user.id)
     if not success:
         logger.warning(f"URL deletion failed: ID {url_id} not found or not allowed for user {current_user.id}.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or not allowed.")
@@ -124,14 +382,26 @@ async def delete_url(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("/{url_id}/qr", summary="Get QR Code for a short URL", response_class=JSONResponse)
+@router.get(
+    "/{url_id}/qr",
+    summary="Get QR Code for a short URL",
+    response_class=JSONResponse,
+    responses={200: {"content": {"image/png": {}, "image/svg+xml": {}}}},
+)
 async def get_qr_code(
+        request: Request,
         url_id: int = Path(..., description="The ID of the short URL to get QR code for."),
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        image_format: QrFormat = Query(QrFormat.JSON, alias="format", description="json (base64 PNG), png or svg."),
+        size: int = Query(10, ge=1, le=settings.QR_MAX_SIZE, description="Pixels per QR module."),
+        error_correction: QrErrorCorrection = Query(QrErrorCorrection.L, description="Error correction level."),
+        db: AsyncSession = Depends(get_url_read_db),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
-    Generates and returns a Base64 encoded QR Code image for the specified short URL.
+    Returns a QR Code image for the specified short URL: Base64 encoded PNG in JSON by default,
+    or the raw PNG or SVG image, which avoids the base64 overhead.
+    Images are rendered off the event loop and cached; responses carry an ETag, so clients
+    revalidating with If-None-Match get a 304 without anything being rendered.
     """
     logger.info(f"User {current_user.id} requesting QR code for URL ID: {url_id}")
     url = await get_url_by_id(db, url_id, current_user.id)
@@ -141,10 +411,25 @@ async def get_qr_code(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or not owned by user.")
 
     short_url = f"{settings.BASE_DOMAIN}/{url.short_code}"
-    qr_code_base64 = generate_qr_code_base64(short_url)
+    etag = qr_etag(short_url, size, image_format.value, error_correction.value)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={settings.QR_HTTP_MAX_AGE_SECONDS}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
+    rendered = await qr_renderer.render(
+        short_url,
+        size,
+        "svg" if image_format == QrFormat.SVG else "png",
+        error_correction.value,
+    )
     logger.info(f"QR code generated for URL ID {url_id}.")
-    return JSONResponse(content={"qr_code_png_base64": qr_code_base64, "short_url": short_url})
+    if image_format == QrFormat.JSON:
+        return JSONResponse(
+            content={"qr_code_png_base64": base64.b64encode(rendered.content).decode(), "short_url": short_url},
+            headers=headers,
+        )
+    return Response(content=rendered.content, media_type=rendered.media_type, headers=headers)
 
 
 @router.get(
@@ -154,28 +439,63 @@ async def get_qr_code(
 )
 async def get_url_analytics_endpoint(
         url_id: int = Path(..., description="The ID of the short URL to get analytics for."),
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        start: datetime | None = Query(None, description="Start of the range; defaults to 30 days before `end`."),
+        end: datetime | None = Query(None, description="End of the range (exclusive); defaults to now."),
+        bucket: AnalyticsBucket = Query(AnalyticsBucket.DAY, description="Width of the time series buckets."),
+        top: int = Query(settings.ANALYTICS_TOP_N, ge=1, le=100, description="Number of top referrers and user agents."),
+        db: AsyncSession = Depends(get_url_read_db),
+        current_user: Principal = Depends(get_current_user),
 ):
     """
-    Retrieves detailed click analytics for a specific short URL, ensuring it belongs to the current user.
+    Retrieves aggregated click analytics for a specific short URL, ensuring it belongs to the current user:
+    clicks per hour or day, top referrers, top user agents and unique visitors within the range.
+    Raw click logs are available from `/{url_id}/clicks`.
     """
     logger.info(f"User {current_user.id} requesting analytics for URL ID: {url_id}")
-    url_with_logs = await get_url_analytics(db, url_id, current_user.id)
+    try:
+        analytics = await get_url_analytics(db, url_id, current_user.id, start, end, bucket, top)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    if not url_with_logs:
+    if not analytics:
         logger.warning(f"Analytics request failed: URL ID {url_id} not found or not owned by user {current_user.id}.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or not owned by user.")
+    return analytics
 
-    return UrlAnalyticsOut(
-        id=url_with_logs.id,
-        original_url=str(url_with_logs.original_url),
-        short_code=url_with_logs.short_code,
-        clicks=url_with_logs.clicks,
-        created_at=url_with_logs.created_at,
-        expired_at=url_with_logs.expired_at,
-        max_clicks=url_with_logs.max_clicks,
-        one_time_use=url_with_logs.one_time_use,
-        total_clicks=url_with_logs.clicks,
-        click_logs=[ClickLogOut.model_validate(log) for log in url_with_logs.click_logs]
-    )
+
+@router.get(
+    "/{url_id}/clicks",
+    response_model=List[ClickLogOut],
+    summary="List the raw click logs of a short URL"
+)
+async def list_url_clicks(
+        response: Response,
+        url_id: int = Path(..., description="The ID of the short URL to list clicks for."),
+        limit: int = Query(
+            settings.ANALYTICS_CLICKS_DEFAULT_PAGE_SIZE,
+            ge=1,
+            le=settings.ANALYTICS_CLICKS_MAX_PAGE_SIZE,
+            description="Maximum number of clicks to return.",
+        ),
+        cursor: str | None = Query(None, description="Cursor from the `X-Next-Cursor` header of the previous page."),
+        start: datetime | None = Query(None, description="Only return clicks at or after this time."),
+        end: datetime | None = Query(None, description="Only return clicks before this time."),
+        db: AsyncSession = Depends(get_url_read_db),
+        current_user: Principal = Depends(get_current_user),
+):
+    """
+    Retrieve one page of the click logs of a short URL owned by the current user, newest first.
+    If more clicks are available, the `X-Next-Cursor` response header holds the cursor of the next page.
+    """
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    page = await get_url_click_logs(db, url_id, current_user.id, limit, after_id, start, end)
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or not owned by user.")
+    logs, next_id = page
+    if next_id is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_id)
+    return logs
@@ -0,0 +1,71 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli sweep-expired [--shard NAME ...] [--grace-seconds 86400] [--pause-seconds 0.05]
+    python -m app.cli expire-clicks [--shard NAME ...] [--retention-days 365] [--export-dir DIR]
+
+`sweep-expired` runs one full pass of the dead URL sweeper over the given shards (all by default),
+archiving expired, exhausted and consumed one-time links with their click logs. It shares its
+checkpoint with the sweepers of running workers, so it can run while the application serves traffic.
+
+`expire-clicks` applies the click log retention policy once: months of click logs older than the
+retention period are exported to gzip-compressed CSV files and removed from the database.
+"""
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.database.session import shard_router
+from app.services.click_retention import ClickRetentionWorker
+from app.services.expiry_sweeper import ExpirySweeper
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_expired(args: argparse.Namespace) -> None:
+    for shard in args.shard or shard_router.shards:
+        sweeper = ExpirySweeper(
+            session_factory=shard_router.session_factory(shard),
+            grace_seconds=args.grace_seconds,
+            pause=args.pause_seconds,
+        )
+        archived = await sweeper.run_once()
+        print(f"{shard}: archived {archived} URLs and {sweeper.archived_click_logs} click logs.")
+
+
+async def expire_clicks(args: argparse.Namespace) -> None:
+    for shard in args.shard or shard_router.shards:
+        worker = ClickRetentionWorker(
+            session_factory=shard_router.session_factory(shard),
+            shard=shard,
+            retention_days=args.retention_days,
+            export_dir=args.export_dir,
+        )
+        exported = await worker.run_once()
+        print(f"{shard}: exported {exported} click logs to {worker.exported_files} files.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sweep = commands.add_parser("sweep-expired", help="Archive dead URLs and their click logs.")
+    sweep.add_argument("--shard", action="append", choices=shard_router.shards)
+    sweep.add_argument("--grace-seconds", type=float, default=settings.EXPIRY_SWEEP_GRACE_SECONDS)
+    sweep.add_argument("--pause-seconds", type=float, default=settings.EXPIRY_SWEEP_PAUSE_SECONDS)
+    sweep.set_defaults(handler=sweep_expired)
+
+    expire = commands.add_parser("expire-clicks", help="Export and remove click logs past their retention.")
+    expire.add_argument("--shard", action="append", choices=shard_router.shards)
+    expire.add_argument("--retention-days", type=int, default=settings.CLICK_RETENTION_DAYS)
+    expire.add_argument("--export-dir", default=settings.CLICK_EXPORT_DIR)
+    expire.set_defaults(handler=expire_clicks)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
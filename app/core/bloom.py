@@ -0,0 +1,48 @@
+from hashlib import blake2b
+import math
+
+
+class BloomFilter:
+    """
+    Bloom filter: a fixed-size bit array answering "possibly present" or "definitely absent".
+
+    Sized for `capacity` items at a false positive rate of `error_rate`, it takes
+    `-capacity * ln(error_rate) / ln(2)**2` bits (about 1.2 MB per million items at 1%) and sets
+    `k = bits / capacity * ln(2)` bits per item, derived from one hash by double hashing.
+    Items can't be removed; the false positive rate grows once more than `capacity` items are added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity < 1:
+            raise ValueError("A Bloom filter needs a capacity of at least one item.")
+        if not 0 < error_rate < 1:
+            raise ValueError("The Bloom filter error rate must be between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+    def _positions(self, item: str):
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def false_positive_rate(self) -> float:
+        """
+        The expected false positive rate at the current number of added items.
+        """
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
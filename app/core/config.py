@@ -12,15 +12,47 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./shortener.db"
     DATABASE_ECHO: bool = False
 
+    # Database engine profile: sqlite-dev, sqlite-wal or postgres-asyncpg
+    DATABASE_PROFILE: str = "sqlite-dev"
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30.0
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268_435_456  # 256 MB
+
+    # Read replica settings
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated, same profile as DATABASE_URL
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DATABASE_REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+
+    # Short code sharding settings
+    DATABASE_SHARD_URLS: str = ""  # comma-separated name=url pairs, in addition to the default shard
+    SHARD_VIRTUAL_NODES: int = 128
+
     BASE_DOMAIN: str = "http://localhost:8000"
 
     SECRET_KEY: str = "your-super-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Verified token cache settings
+    AUTH_CACHE_MAX_SIZE: int = 10_000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+
+    # Password hashing pool settings
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
     # Logging settings
     LOG_LEVEL: str = "INFO"
 
+    # Exposes /api/v1/metrics to authenticated users
+    METRICS_ENABLED: bool = False
+
     # Redis settings for Rate Limiting
     REDIS_URL: str = "redis://localhost:6379/0"
 
@@ -34,6 +66,122 @@ class Settings(BaseSettings):
     RATE_LIMIT_CREATE_URL_TIMES: int = 20
     RATE_LIMIT_CREATE_URL_SECONDS: int = 60
 
+    # Rate limiting backend: "redis" (FastAPI-Limiter, falling back to the local limiter when Redis
+    # is down), "local" (in-process, per worker) or "hybrid" (local, synced to Redis in batches)
+    RATE_LIMIT_BACKEND: str = "redis"
+    RATE_LIMIT_LOCAL_SHARDS: int = 16
+    RATE_LIMIT_LOCAL_SWEEP_EVERY: int = 1_000
+    RATE_LIMIT_SYNC_SECONDS: float = 1.0
+    RATE_LIMIT_SYNC_PREFIX: str = "shortener:rate-limit"
+
+    # Short code allocation settings
+    SHORT_CODE_STRATEGY: str = "random"  # random or sequence
+    SHORT_CODE_LENGTH: int = 6
+    SHORT_CODE_BLOCK_SIZE: int = 1000
+    SHORT_CODE_SCRAMBLE: bool = True
+    SHORT_CODE_SCRAMBLE_KEY: str = ""  # defaults to SECRET_KEY
+    SHORT_CODE_MAX_ATTEMPTS: int = 5
+
+    # Bulk URL creation settings
+    BULK_CREATE_MAX_ITEMS: int = 10_000
+    BULK_CREATE_CHUNK_SIZE: int = 500
+    BULK_CREATE_MAX_LINE_BYTES: int = 8192
+
+    # URL listing settings
+    URL_LIST_DEFAULT_PAGE_SIZE: int = 50
+    URL_LIST_MAX_PAGE_SIZE: int = 500
+    URL_EXPORT_BATCH_SIZE: int = 1000
+
+    # QR code settings
+    QR_RENDER_WORKERS: int = 2  # processes rendering QR codes; 0 renders on a thread instead
+    QR_CACHE_MAX_SIZE: int = 10_000
+    QR_CACHE_TTL_SECONDS: int = 86_400
+    QR_MAX_SIZE: int = 40  # largest box size (pixels per module) clients may request
+    QR_HTTP_MAX_AGE_SECONDS: int = 86_400  # Cache-Control max-age of QR code responses
+    QR_EXPORT_MAX_ITEMS: int = 10_000  # URL IDs accepted by one ZIP export
+    QR_EXPORT_CONCURRENCY: int = 8  # QR codes rendered at once per ZIP export
+
+    # Analytics settings
+    ANALYTICS_DEFAULT_RANGE_DAYS: int = 30
+    ANALYTICS_MAX_BUCKETS: int = 2000
+    ANALYTICS_TOP_N: int = 10
+    ANALYTICS_CLICKS_DEFAULT_PAGE_SIZE: int = 100
+    ANALYTICS_CLICKS_MAX_PAGE_SIZE: int = 1000
+    HLL_PRECISION: int = 12  # 2**12 registers: ~4 KB per sketch, 1.6% standard error
+    CLICK_ROLLUP_ENABLED: bool = True
+    CLICK_ROLLUP_INTERVAL_SECONDS: float = 30.0
+    CLICK_ROLLUP_BATCH_SIZE: int = 50_000
+
+    # Click log retention settings
+    CLICK_RETENTION_ENABLED: bool = False
+    CLICK_RETENTION_DAYS: int = 365
+    CLICK_RETENTION_INTERVAL_SECONDS: float = 3600.0
+    CLICK_RETENTION_CHUNK_SIZE: int = 10_000  # click logs exported and deleted per step
+    CLICK_EXPORT_DIR: str = "exports/click_logs"
+    CLICK_PARTITION_MONTHS_AHEAD: int = 2  # monthly partitions created in advance on PostgreSQL
+
+    # Dead URL archival settings
+    EXPIRY_SWEEP_ENABLED: bool = False
+    EXPIRY_SWEEP_INTERVAL_SECONDS: float = 3600.0
+    EXPIRY_SWEEP_GRACE_SECONDS: float = 86_400.0  # expired links answer "expired" this long before archival
+    EXPIRY_SWEEP_SCAN_SIZE: int = 10_000  # URL IDs scanned per window
+    EXPIRY_SWEEP_BATCH_SIZE: int = 500  # URLs archived per transaction
+    EXPIRY_SWEEP_CHUNK_SIZE: int = 5_000  # click logs moved per transaction
+    EXPIRY_SWEEP_PAUSE_SECONDS: float = 0.05
+
+    # Redirect resolution cache settings
+    REDIRECT_CACHE_MAX_SIZE: int = 100_000
+    REDIRECT_CACHE_TTL_SECONDS: int = 60
+    REDIRECT_PERMANENT_MAX_AGE_SECONDS: int = 86_400  # Cache-Control max-age of 301/308 redirects
+    REDIRECT_TEMPORARY_MAX_AGE_SECONDS: int = 0  # Cache-Control max-age of 302/307 redirects
+    REDIRECT_FAST_PATH_ENABLED: bool = False  # Answer unlimited redirects in raw ASGI middleware
+    REDIRECT_THROTTLE_ENABLED: bool = False  # Throttle redirects of heavy-hitting short codes and IPs
+    REDIRECT_THROTTLE_ACTION: str = "skip_log"  # skip_log (redirect without logging) or reject (429)
+    REDIRECT_THROTTLE_WINDOW_SECONDS: int = 60
+    REDIRECT_THROTTLE_CODE_LIMIT: int = 6_000
+    REDIRECT_THROTTLE_IP_LIMIT: int = 120
+    REDIRECT_THROTTLE_SKETCH_WIDTH: int = 4_096
+    REDIRECT_THROTTLE_SKETCH_DEPTH: int = 4
+    BOT_FILTER_ENABLED: bool = True  # Count bot and prefetch redirects apart from clicks
+    BOT_FILTER_EXTRA_USER_AGENTS: str = ""  # comma-separated user agent tokens to treat as bots
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = "shortener:cache-invalidation"
+    CACHE_INVALIDATION_RECONNECT_SECONDS: float = 1.0
+
+    # Short code Bloom filter settings
+    SHORT_CODE_FILTER_ENABLED: bool = True
+    SHORT_CODE_FILTER_CAPACITY: int = 1_000_000  # ~1.2 MB at a 1% error rate
+    SHORT_CODE_FILTER_ERROR_RATE: float = 0.01
+    SHORT_CODE_FILTER_REBUILD_SECONDS: float = 3600.0
+    SHORT_CODE_FILTER_CHANNEL: str = "shortener:short-codes"
+
+    # Click ingestion pipeline settings
+    CLICK_INGEST_QUEUE_SIZE: int = 10_000
+    CLICK_INGEST_BATCH_SIZE: int = 500
+    CLICK_INGEST_FLUSH_INTERVAL_SECONDS: float = 1.0
+    CLICK_INGEST_OVERFLOW_POLICY: str = "drop_newest"  # drop_newest, drop_oldest or block
+    CLICK_INGEST_BLOCK_TIMEOUT_SECONDS: float = 0.05
+    CLICK_INGEST_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+    CLICK_INGEST_MAX_RETRIES: int = 3
+
+    # Click counter settings
+    CLICK_COUNTER_FLUSH_INTERVAL_SECONDS: float = 2.0
+    CLICK_COUNTER_BATCH_SIZE: int = 1000
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def shard_urls(self) -> dict[str, str]:
+        shards = {}
+        for entry in filter(None, (entry.strip() for entry in self.DATABASE_SHARD_URLS.split(","))):
+            name, separator, url = entry.partition("=")
+            if not separator or not name.strip() or not url.strip():
+                raise ValueError(f"Invalid DATABASE_SHARD_URLS entry '{entry}', expected name=url.")
+            shards[name.strip()] = url.strip()
+        return shards
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,61 @@
+from hashlib import blake2b
+import math
+
+
+class CountMinSketch:
+    """
+    Count-min sketch: estimates how many times each item was added in a fixed `width * depth`
+    table of counters, whatever the number of distinct items.
+
+    Each item maps to one counter per row, derived from one hash by double hashing, and its
+    estimate is the smallest of them. Estimates never undercount; with conservative updates
+    (only the counters at the current minimum are raised) they overcount by at most
+    `e / width` of the total added, with probability `1 - e**-depth` (0.07% of the total for
+    width=4096, in 98% of cases for depth=4), so heavy hitters stand out clearly.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        if width < 1 or depth < 1:
+            raise ValueError("A count-min sketch needs a width and depth of at least one.")
+        self.width = width
+        self.depth = depth
+        self.counters = [0] * (width * depth)
+        self.total = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        # A list slot per counter; small counters are shared int objects.
+        return len(self.counters) * 8
+
+    @property
+    def error_bound(self) -> float:
+        """
+        The overcount bound of the estimates, as a fraction of the total added.
+        """
+        return math.e / self.width
+
+    def _positions(self, item: str) -> list[int]:
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [row * self.width + (first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, item: str, count: int = 1) -> int:
+        """
+        Adds `count` occurrences of `item`. Returns its new estimate.
+        """
+        positions = self._positions(item)
+        counters = self.counters
+        estimate = min(counters[position] for position in positions) + count
+        for position in positions:
+            if counters[position] < estimate:
+                counters[position] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        counters = self.counters
+        return min(counters[position] for position in self._positions(item))
+
+    def clear(self) -> None:
+        self.counters = [0] * (self.width * self.depth)
+        self.total = 0
@@ -0,0 +1,62 @@
+from bisect import bisect, insort
+from hashlib import blake2b
+from typing import Iterable
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring mapping keys to nodes.
+
+    Every node is placed on the ring at `virtual_nodes` pseudo-random points and a key belongs to
+    the first point at or after its own hash. Adding a node to a ring of N therefore only moves
+    about 1/(N+1) of the keys, all of them onto the new node, and removing one only moves the keys
+    it owned. More virtual nodes spread the keys more evenly at the cost of a larger ring.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = 128):
+        if virtual_nodes < 1:
+            raise ValueError("A consistent hash ring needs at least one virtual node per node.")
+        self.virtual_nodes = virtual_nodes
+        self._points: list[int] = []
+        self._owners: dict[int, str] = {}
+        self._nodes: set[str] = set()
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> frozenset[str]:
+        return frozenset(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for replica in range(self.virtual_nodes):
+            point = _hash(f"{node}#{replica}")
+            # On the (astronomically unlikely) collision the point keeps its first owner.
+            if point not in self._owners:
+                self._owners[point] = node
+                insort(self._points, point)
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+
+    def node_for(self, key: str) -> str:
+        """
+        Returns the node that owns `key`. Raises LookupError if the ring is empty.
+        """
+        if not self._points:
+            raise LookupError("The consistent hash ring has no nodes.")
+        index = bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
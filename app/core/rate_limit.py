@@ -0,0 +1,251 @@
+from fastapi import HTTPException, Request, Response, status
+from fastapi_limiter import FastAPILimiter
+from fastapi_limiter.depends import RateLimiter
+from redis.exceptions import RedisError
+from typing import Callable
+import asyncio
+import logging
+import math
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-key state: [window, bucket, current, previous, unsynced, remote_current, remote_previous].
+# `current` and `previous` count the hits of this worker in the current and previous fixed
+# windows; the remote counts are the hits of the other workers, as last read back from Redis.
+_WINDOW, _BUCKET, _CURRENT, _PREVIOUS, _UNSYNCED, _REMOTE_CURRENT, _REMOTE_PREVIOUS = range(7)
+
+
+class SlidingWindowLimiter:
+    """
+    In-process sliding window rate limiter.
+
+    Each key keeps the counts of the current and previous fixed windows only, and the number of
+    hits in the sliding window is estimated by weighting the previous count by the part of it
+    still covered, so memory stays constant per key whatever the limit. Keys are spread over
+    `shards` dictionaries; state is reset lazily when a key is hit after its windows passed, and
+    every `sweep_every` hits on a shard its idle keys are dropped.
+
+    In hybrid mode (`start()` with a Redis client) the per-request check still only reads local
+    state: every `sync_interval` seconds the hits counted since the last sync are added to
+    per-window Redis counters in one pipeline, and the totals read back give the hits of the
+    other workers, which are added to the local estimate. Limits are thus shared by all workers,
+    at the cost of letting up to one sync interval worth of hits through on each of them.
+    """
+
+    def __init__(
+            self,
+            shards: int = settings.RATE_LIMIT_LOCAL_SHARDS,
+            sweep_every: int = settings.RATE_LIMIT_LOCAL_SWEEP_EVERY,
+            sync_interval: float = settings.RATE_LIMIT_SYNC_SECONDS,
+            prefix: str = settings.RATE_LIMIT_SYNC_PREFIX,
+            clock: Callable[[], float] = time.time,
+    ):
+        self._shards: list[dict[str, list]] = [{} for _ in range(shards)]
+        self._hits_since_sweep = [0] * shards
+        self.sweep_every = sweep_every
+        self.sync_interval = sync_interval
+        self.prefix = prefix
+        self._clock = clock
+        self._redis = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.allowed = 0
+        self.rejected = 0
+        self.swept = 0
+        self.syncs = 0
+        self.sync_failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @staticmethod
+    def _roll(state: list, bucket: int) -> None:
+        """
+        Moves `state` forward to `bucket`, shifting the current window into the previous one.
+        """
+        if state[_BUCKET] == bucket:
+            return
+        adjacent = state[_BUCKET] == bucket - 1
+        state[_PREVIOUS] = state[_CURRENT] if adjacent else 0
+        state[_REMOTE_PREVIOUS] = state[_REMOTE_CURRENT] if adjacent else 0
+        state[_BUCKET] = bucket
+        state[_CURRENT] = state[_REMOTE_CURRENT] = state[_UNSYNCED] = 0
+
+    def hit(self, key: str, times: int, seconds: float) -> float:
+        """
+        Counts a hit on `key` if fewer than `times` hits were counted over the last `seconds`.
+        Returns 0 when the hit is allowed, otherwise the number of seconds until it would be.
+        """
+        now = self._clock()
+        bucket = int(now // seconds)
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+        state = shard.get(key)
+        if state is None:
+            state = shard[key] = [seconds, bucket, 0, 0, 0, 0, 0]
+        else:
+            self._roll(state, bucket)
+
+        elapsed = now / seconds - bucket
+        current = state[_CURRENT] + state[_REMOTE_CURRENT]
+        previous = state[_PREVIOUS] + state[_REMOTE_PREVIOUS]
+        if previous * (1 - elapsed) + current + 1 <= times:
+            state[_CURRENT] += 1
+            state[_UNSYNCED] += 1
+            self.allowed += 1
+            self._maybe_sweep(index, now)
+            return 0
+
+        self.rejected += 1
+        if current + 1 > times or previous == 0:
+            # Blocked until the next window at least.
+            return (bucket + 1 - now / seconds) * seconds
+        # Blocked until enough of the previous window has slid out.
+        return max((1 - (times - 1 - current) / previous - elapsed) * seconds, 0.001)
+
+    def _maybe_sweep(self, index: int, now: float) -> None:
+        self._hits_since_sweep[index] += 1
+        if self._hits_since_sweep[index] < self.sweep_every:
+            return
+        self._hits_since_sweep[index] = 0
+        shard = self._shards[index]
+        idle = [
+            key for key, state in shard.items()
+            if state[_BUCKET] < now // state[_WINDOW] - 1 and not (self._redis and state[_UNSYNCED])
+        ]
+        for key in idle:
+            del shard[key]
+        self.swept += len(idle)
+
+    def reset(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+    async def start(self, redis) -> None:
+        """
+        Starts syncing local counts with the other workers through `redis` (hybrid mode).
+        """
+        if self.running:
+            return
+        self._redis = redis
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="rate-limit-sync")
+        logger.info("Rate limit sync started.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Rate limit sync stopped.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.sync()
+            except RedisError as e:
+                self.sync_failures += 1
+                logger.error(f"Error while syncing rate limit counts to Redis: {e}")
+
+    async def sync(self) -> int:
+        """
+        Adds the hits counted since the last sync to the shared Redis counters and refreshes the
+        counts of the other workers. Returns the number of keys synced.
+        """
+        if self._redis is None:
+            return 0
+        # Keys hit since the last sync, and keys of live windows whose remote counts may have moved.
+        now = self._clock()
+        pending = [
+            (key, state, state[_BUCKET], state[_UNSYNCED])
+            for shard in self._shards
+            for key, state in shard.items()
+            if state[_UNSYNCED] or state[_BUCKET] == now // state[_WINDOW]
+        ]
+        if not pending:
+            return 0
+        for _, state, _, delta in pending:
+            state[_UNSYNCED] -= delta
+
+        pipeline = self._redis.pipeline(transaction=False)
+        for key, state, bucket, delta in pending:
+            counter = f"{self.prefix}:{key}:{bucket}"
+            pipeline.incrby(counter, delta)
+            pipeline.pexpire(counter, int(state[_WINDOW] * 2000))
+        try:
+            results = await pipeline.execute()
+        except RedisError:
+            for _, state, bucket, delta in pending:
+                if state[_BUCKET] == bucket:
+                    state[_UNSYNCED] += delta
+            raise
+
+        for (_, state, bucket, _), total in zip(pending, results[::2]):
+            # The total includes every hit of this worker synced so far in the window; hits counted
+            # while the pipeline was in flight are still unsynced. Totals of a rolled window are stale.
+            if state[_BUCKET] == bucket:
+                state[_REMOTE_CURRENT] = max(int(total) - state[_CURRENT] + state[_UNSYNCED], 0)
+        self.syncs += 1
+        return len(pending)
+
+    def stats(self) -> dict:
+        return {
+            "backend": settings.RATE_LIMIT_BACKEND,
+            "syncing": self.running,
+            "keys": sum(len(shard) for shard in self._shards),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "swept": self.swept,
+            "syncs": self.syncs,
+            "sync_failures": self.sync_failures,
+        }
+
+
+local_rate_limiter = SlidingWindowLimiter()
+
+
+class RateLimit:
+    """
+    Rate limiting dependency: allows `times` requests per client and route every `seconds`.
+
+    With the "redis" backend the check goes through FastAPI-Limiter and falls back to the
+    in-process limiter of this worker whenever Redis is not configured or fails, instead of
+    failing the request. The "local" and "hybrid" backends check `local_rate_limiter` only.
+    """
+
+    def __init__(self, times: int, seconds: int):
+        self.times = times
+        self.seconds = seconds
+        self._redis_limiter = RateLimiter(times=times, seconds=seconds)
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        if settings.RATE_LIMIT_BACKEND == "redis" and FastAPILimiter.redis is not None:
+            try:
+                return await self._redis_limiter(request, response)
+            except RedisError as e:
+                logger.warning(f"Redis rate limiting failed, falling back to the local limiter: {e}")
+
+        identifier = FastAPILimiter.identifier or _default_identifier
+        key = f"{await identifier(request)}:{self.times}:{self.seconds}"
+        retry_after = local_rate_limiter.hit(key, self.times, self.seconds)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+async def _default_identifier(request: Request) -> str:
+    forwarded = request.headers.get("X-Forwarded-For")
+    ip = forwarded.split(",")[0] if forwarded else request.client.host
+    return f"{ip}:{request.scope['path']}"
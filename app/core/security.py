@@ -1,5 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Final
+from typing import Any, Callable, Optional, Final
+import asyncio
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.schemas.token import TokenData
@@ -38,6 +42,111 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPoolBusy(Exception):
+    """
+    Raised when the password hash pool already has as many jobs in flight as it accepts.
+    """
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt hashing and verification on a dedicated, bounded thread pool.
+
+    A bcrypt round takes a few hundred milliseconds of CPU; run inline it would stall the event loop
+    and every request it is serving. bcrypt releases the GIL while hashing, so threads give real
+    parallelism here. At most `max_workers` hashes run at once and up to `queue_size` more wait for
+    a thread; beyond that jobs are rejected with `PasswordHashPoolBusy` instead of queueing
+    without bound. The time jobs spend waiting for a thread is recorded.
+    """
+
+    def __init__(self, max_workers: int, queue_size: int):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _record_wait(self, wait: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Runs `func(*args)` on the pool and returns its result.
+        Raises PasswordHashPoolBusy if the pool is saturated.
+        """
+        if self.in_flight >= self.max_workers + self.queue_size:
+            self.rejected += 1
+            raise PasswordHashPoolBusy("Too many password hashing jobs in flight.")
+        self.in_flight += 1
+        submitted = time.perf_counter()
+
+        def job():
+            self._record_wait(time.perf_counter() - submitted)
+            return func(*args)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), job)
+            self.completed += 1
+            return result
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        started = self.completed + self.in_flight
+        return {
+            "max_workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "avg_wait_seconds": round(self.wait_seconds_total / started, 6) if started else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password like `verify_password`, on the password hash pool instead of the event loop.
+
+    Raises:
+        PasswordHashPoolBusy: If the pool is saturated.
+    """
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hashes a password like `get_password_hash`, on the password hash pool instead of the event loop.
+
+    Raises:
+        PasswordHashPoolBusy: If the pool is saturated.
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Creates a JWT access token.
@@ -82,7 +191,11 @@ def decode_access_token(token: str) -> TokenData:
         if username is None:
             raise JWTError("Token payload missing 'sub' claim.")
 
-        token_data = TokenData(username=username)
+        exp = payload.get("exp")
+        token_data = TokenData(
+            username=username,
+            exp=datetime.fromtimestamp(exp, tz=timezone.utc) if exp is not None else None,
+        )
     except JWTError:
         raise JWTError("Could not validate credentials (invalid token).")
     except Exception as e:
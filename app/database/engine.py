@@ -0,0 +1,159 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+import logging
+import threading
+import time
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+SQLITE_DEV = "sqlite-dev"
+SQLITE_WAL = "sqlite-wal"
+POSTGRES_ASYNCPG = "postgres-asyncpg"
+
+# Driver each engine profile is meant for.
+ENGINE_PROFILES = {
+    SQLITE_DEV: "sqlite+aiosqlite",
+    SQLITE_WAL: "sqlite+aiosqlite",
+    POSTGRES_ASYNCPG: "postgresql+asyncpg",
+}
+
+
+class PoolMonitor:
+    """
+    Counts connection pool checkouts, the time spent waiting for a connection and checkout timeouts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_checked_out = 0
+
+    def record_checkout(self, wait: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, pool: Pool) -> dict:
+        stats = {
+            "pool": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "avg_wait_seconds": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+            "peak_checked_out": self.peak_checked_out,
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            capacity = pool.size() + pool._max_overflow
+            stats.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "saturation": round(pool.checkedout() / capacity, 4) if capacity > 0 else 0.0,
+            })
+        return stats
+
+
+pool_monitor = PoolMonitor()
+
+
+class MonitoredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that reports how long each checkout waited for a connection to `pool_monitor`.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_monitor.record_timeout()
+            raise
+        pool_monitor.record_checkout(time.perf_counter() - started, self.checkedout())
+        return connection
+
+
+def _sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    pragmas: dict[str, str | int] = {"busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS}
+    if settings.DATABASE_PROFILE == SQLITE_WAL:
+        pragmas.update({
+            "journal_mode": "WAL",
+            "synchronous": settings.SQLITE_SYNCHRONOUS,
+            "mmap_size": settings.SQLITE_MMAP_SIZE,
+            "temp_store": "MEMORY",
+        })
+    return pragmas
+
+
+def engine_options(settings: Settings, database_url: str | None = None) -> dict:
+    """
+    Returns the `create_async_engine` keyword arguments of the configured engine profile for
+    `database_url` (the primary `DATABASE_URL` by default).
+    Raises ValueError for an unknown profile or one that does not match the database URL.
+    """
+    profile = settings.DATABASE_PROFILE
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DATABASE_PROFILE '{profile}', expected one of: {', '.join(ENGINE_PROFILES)}.")
+    url = make_url(database_url or settings.DATABASE_URL)
+    if url.drivername != ENGINE_PROFILES[profile]:
+        raise ValueError(
+            f"DATABASE_PROFILE '{profile}' requires a '{ENGINE_PROFILES[profile]}' URL, got '{url.drivername}'."
+        )
+
+    options: dict = {"echo": settings.DATABASE_ECHO}
+    if profile == SQLITE_DEV:
+        # Keep SQLAlchemy's defaults (a static pool for in-memory databases), only monitored.
+        if url.database not in (None, "", ":memory:"):
+            options["poolclass"] = MonitoredAsyncQueuePool
+        return options
+
+    options.update({
+        "poolclass": MonitoredAsyncQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    })
+    if profile == POSTGRES_ASYNCPG:
+        options["connect_args"] = {"prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def create_engine_from_settings(settings: Settings, database_url: str | None = None) -> AsyncEngine:
+    """
+    Creates an engine for `database_url` (the primary `DATABASE_URL` by default) with the configured profile:
+
+    - `sqlite-dev`: SQLAlchemy's default pooling, a busy timeout and nothing else.
+    - `sqlite-wal`: a bounded pool over a WAL-journaled database with `synchronous`, `mmap_size`
+      and an in-memory temp store set on every connection, so readers never block the writer.
+    - `postgres-asyncpg`: a bounded, pre-pinged and recycled pool with asyncpg's prepared statement cache.
+    """
+    database_url = database_url or settings.DATABASE_URL
+    engine = create_async_engine(database_url, **engine_options(settings, database_url))
+    if engine.dialect.name == "sqlite":
+        pragmas = _sqlite_pragmas(settings)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    logger.info(f"Database engine created with profile '{settings.DATABASE_PROFILE}'.")
+    return engine
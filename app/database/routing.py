@@ -0,0 +1,118 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Sequence
+import asyncio
+import itertools
+import logging
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRouter:
+    """
+    Routes read-only work to read replicas, round-robin over the replicas that passed their last
+    health check, and everything else to the primary.
+
+    After a user writes, their reads stay on the primary for `sticky_seconds`, so they read their
+    own writes despite replication lag. The window is tracked per worker, which is enough when a
+    user's requests are pinned to one worker or when `sticky_seconds` covers the expected lag.
+    When no replica is configured or healthy, reads fall back to the primary.
+    """
+
+    def __init__(
+            self,
+            replicas: Sequence[Callable[[], AsyncSession]] = (),
+            sticky_seconds: float = 5.0,
+            health_check_interval: float = 5.0,
+            health_check_timeout: float = 2.0,
+            max_tracked_writers: int = 100_000,
+    ):
+        self.replicas = list(replicas)
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self._healthy = [True] * len(self.replicas)
+        self._round_robin = itertools.count()
+        self._recent_writers: TTLCache[int, bool] = TTLCache(
+            max_size=max_tracked_writers,
+            ttl_seconds=sticky_seconds,
+        )
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def read_session_factory(self, user_id: int | None = None) -> Callable[[], AsyncSession] | None:
+        """
+        Picks the replica to read from, or returns None if the read should go to the primary.
+        """
+        if user_id is not None and self._recent_writers.get(user_id, count=False):
+            self.sticky_reads += 1
+            return None
+        healthy = [replica for replica, ok in zip(self.replicas, self._healthy) if ok]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        self.replica_reads += 1
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def record_write(self, user_id: int) -> None:
+        """
+        Pins the reads of a user to the primary for the next `sticky_seconds`.
+        """
+        self._recent_writers.set(user_id, True)
+
+    async def check_health(self) -> None:
+        """
+        Probes every replica with `SELECT 1` and updates which ones receive reads.
+        """
+        for index, replica in enumerate(self.replicas):
+            try:
+                async with replica() as db:
+                    await asyncio.wait_for(db.execute(text("SELECT 1")), self.health_check_timeout)
+                healthy = True
+            except Exception as e:
+                healthy = False
+                if self._healthy[index]:
+                    logger.error(f"Read replica {index} failed its health check, routing reads elsewhere: {e}")
+            if healthy and not self._healthy[index]:
+                logger.info(f"Read replica {index} is healthy again.")
+            self._healthy[index] = healthy
+
+    async def start(self) -> None:
+        if self.running or not self.replicas:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="replica-health")
+        logger.info(f"Read replica health checks started for {len(self.replicas)} replica(s).")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Read replica health checks stopped.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            await self.check_health()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.health_check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "healthy_replicas": sum(self._healthy),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+        }
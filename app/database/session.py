@@ -1,12 +1,11 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.database.engine import create_engine_from_settings
+from app.database.routing import SessionRouter
+from app.database.sharding import DEFAULT_SHARD, ShardRouter
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    future=True  # Use the SQLAlchemy 2.0 style future API
-)
+engine = create_engine_from_settings(settings)
 
 AsyncSessionLocal = sessionmaker(  # type: ignore
     autocommit=False,
@@ -16,6 +15,30 @@ AsyncSessionLocal = sessionmaker(  # type: ignore
     expire_on_commit=False # Prevents objects from being expired after commit, allows access to attributes
 )
 
+replica_engines = [create_engine_from_settings(settings, url) for url in settings.replica_urls]
+
+session_router = SessionRouter(
+    replicas=[
+        sessionmaker(bind=replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)  # type: ignore
+        for replica in replica_engines
+    ],
+    sticky_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    health_check_interval=settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS,
+)
+
+shard_engines = {name: create_engine_from_settings(settings, url) for name, url in settings.shard_urls.items()}
+
+shard_router = ShardRouter(
+    {
+        DEFAULT_SHARD: AsyncSessionLocal,
+        **{
+            name: sessionmaker(bind=shard, class_=AsyncSession, autoflush=False, expire_on_commit=False)  # type: ignore
+            for name, shard in shard_engines.items()
+        },
+    },
+    virtual_nodes=settings.SHARD_VIRTUAL_NODES,
+)
+
 async def get_async_session() -> AsyncSession:
     """
     Provides an asynchronous database session.
@@ -0,0 +1,68 @@
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncGenerator, Awaitable, Callable, Mapping
+import asyncio
+import logging
+
+from app.core.hashring import ConsistentHashRing
+
+logger = logging.getLogger(__name__)
+
+# The shard living in the primary `DATABASE_URL` database; also the only shard of an unsharded deployment.
+DEFAULT_SHARD = "default"
+
+
+class ShardRouter:
+    """
+    Maps short codes to the database shard that stores their URL, with a consistent hash ring over
+    the configured shards, so adding a shard relocates only the codes that move onto it.
+
+    Request-scoped work on the default shard runs on the session the caller already has, so an
+    unsharded deployment opens no extra sessions; other shards get a session of their own.
+    """
+
+    def __init__(self, shards: Mapping[str, Callable[[], AsyncSession]], virtual_nodes: int = 128):
+        if DEFAULT_SHARD not in shards:
+            raise ValueError(f"The shard map must contain the '{DEFAULT_SHARD}' shard.")
+        self.shards = dict(shards)
+        self.ring = ConsistentHashRing(self.shards, virtual_nodes=virtual_nodes)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.shards) > 1
+
+    def shard_for(self, short_code: str) -> str:
+        if not self.sharded:
+            return DEFAULT_SHARD
+        return self.ring.node_for(short_code)
+
+    def session_factory(self, shard: str) -> Callable[[], AsyncSession]:
+        return self.shards[shard]
+
+    @asynccontextmanager
+    async def session(self, shard: str, db: AsyncSession | None = None) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Provides a session on `shard`, reusing `db` for the default shard when given.
+        """
+        if shard == DEFAULT_SHARD and db is not None:
+            yield db
+            return
+        async with self.shards[shard]() as shard_db:
+            yield shard_db
+
+    async def fan_out(
+            self,
+            db: AsyncSession | None,
+            query: Callable[[AsyncSession], Awaitable[Any]],
+    ) -> dict[str, Any]:
+        """
+        Runs `query` on every shard concurrently, each with its own session, and returns the
+        results by shard name.
+        """
+        async def run(shard: str) -> Any:
+            async with self.session(shard, db) as shard_db:
+                return await query(shard_db)
+
+        names = list(self.shards)
+        results = await asyncio.gather(*(run(shard) for shard in names))
+        return dict(zip(names, results))
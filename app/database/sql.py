@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Table, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+BUCKET_SIZES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# strftime / DATE_FORMAT patterns for dialects without date_trunc.
+_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+
+def time_bucket(dialect_name: str, bucket: str, column):
+    """
+    Returns a SQL expression truncating `column` to the start of its "hour" or "day" bucket.
+    SQLite and MySQL return the bucket as text; pass results through `as_utc`.
+    """
+    if dialect_name == "postgresql":
+        return func.date_trunc(bucket, column)
+    if dialect_name in ("mysql", "mariadb"):
+        return func.date_format(column, _BUCKET_FORMATS[bucket])
+    return func.strftime(_BUCKET_FORMATS[bucket], column)
+
+
+def as_utc(value: datetime | str) -> datetime:
+    """
+    Normalizes a datetime read from the database (or a bucket label) to an aware UTC datetime.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def floor_to_bucket(value: datetime, bucket: str) -> datetime:
+    """
+    Returns the start of the UTC hour or day `value` falls into.
+    """
+    value = as_utc(value).replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def additive_upsert(
+        dialect_name: str,
+        table: Table,
+        key_columns: list[str],
+        sum_columns: list[str],
+        replace_columns: list[str] = (),
+):
+    """
+    Builds an INSERT that, for an existing row with the same `key_columns`, adds `sum_columns` onto it
+    and overwrites `replace_columns` instead of failing, using the upsert syntax of the given dialect.
+    Execute it with a list of parameter dicts to apply many increments in one round trip.
+    """
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(
+            {column: table.c[column] + stmt.inserted[column] for column in sum_columns}
+            | {column: stmt.inserted[column] for column in replace_columns}
+        )
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(table)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"Upserts are not supported for the '{dialect_name}' dialect.")
+    return stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: table.c[column] + stmt.excluded[column] for column in sum_columns}
+        | {column: stmt.excluded[column] for column in replace_columns},
+    )
@@ -7,8 +7,21 @@ from fastapi_limiter import FastAPILimiter
 import logging
 
 from app.database import init_database
+from app.database.session import session_router
 from app.api.v1 import router as api_router
+from app.api.redirect_fast_path import RedirectFastPathMiddleware
 from app.core.config import settings
+from app.core.rate_limit import local_rate_limiter
+from app.core.security import password_hash_pool
+from app.services.bot_filter import bot_hit_counter
+from app.services.click_counter import click_counter
+from app.services.click_ingestion import click_ingestor
+from app.services.click_retention import click_retention_worker, shard_click_retention_workers
+from app.services.expiry_sweeper import expiry_sweeper, shard_expiry_sweepers
+from app.services.qr import qr_renderer
+from app.services.redirect import invalidation_bus
+from app.services.short_code_filter import short_code_filter, short_code_bus
+from app.services.rollup import click_rollup_worker, shard_rollup_workers
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +30,45 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     Manages the lifespan of the FastAPI application.
-    Initializes the database and Redis for rate limiting before the application starts.
+    Initializes the database and Redis for rate limiting before the application starts,
+    and runs the click ingestion, click counter and bot hit flushers, the click rollup job, the
+    click log retention policy and the dead URL sweeper until shutdown, draining them on the way out.
+    The same Redis connection carries redirect cache invalidations between workers and, with the
+    hybrid rate limiting backend, the rate limit counts of every worker.
     """
     logger.info("Application startup: Initializing database...")
     await init_database()
     logger.info("Database initialized.")
 
+    await session_router.start()
+    if settings.SHORT_CODE_FILTER_ENABLED:
+        await short_code_filter.start()
+    await click_ingestor.start()
+    await click_counter.start()
+    await bot_hit_counter.start()
+    if settings.CLICK_ROLLUP_ENABLED:
+        await click_rollup_worker.start()
+        for worker in shard_rollup_workers.values():
+            await worker.start()
+    if settings.CLICK_RETENTION_ENABLED:
+        await click_retention_worker.start()
+        for worker in shard_click_retention_workers.values():
+            await worker.start()
+    if settings.EXPIRY_SWEEP_ENABLED:
+        await expiry_sweeper.start()
+        for sweeper in shard_expiry_sweepers.values():
+            await sweeper.start()
+
     try:
         redis_client = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
         await FastAPILimiter.init(redis_client)
         logger.info("FastAPI-Limiter initialized with Redis.")
+        if settings.CACHE_INVALIDATION_ENABLED:
+            await invalidation_bus.start(redis_client)
+        if settings.SHORT_CODE_FILTER_ENABLED:
+            await short_code_bus.start(redis_client)
+        if settings.RATE_LIMIT_BACKEND == "hybrid":
+            await local_rate_limiter.start(redis_client)
     except Exception as e:
         logger.critical(f"Failed to connect to Redis for Rate Limiting: {e}", exc_info=True)
 
@@ -35,6 +77,26 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     logger.info("Application shutdown: Cleaning up resources...")
 
+    await local_rate_limiter.stop()
+    await invalidation_bus.stop()
+    await short_code_bus.stop()
+    await short_code_filter.stop()
+    for sweeper in shard_expiry_sweepers.values():
+        await sweeper.stop()
+    await expiry_sweeper.stop()
+    for worker in shard_click_retention_workers.values():
+        await worker.stop()
+    await click_retention_worker.stop()
+    for worker in shard_rollup_workers.values():
+        await worker.stop()
+    await click_rollup_worker.stop()
+    await bot_hit_counter.stop()
+    await click_counter.stop()
+    await click_ingestor.stop()
+    await session_router.stop()
+    password_hash_pool.shutdown()
+    qr_renderer.shutdown()
+
     if FastAPILimiter.redis:
         await FastAPILimiter.redis.close()
         logger.info("FastAPI-Limiter Redis client closed.")
@@ -48,6 +110,10 @@ app = FastAPI(
 
 app.include_router(api_router)
 
+if settings.REDIRECT_FAST_PATH_ENABLED:
+    # Static paths such as /docs keep going to their routes even though they look like short codes.
+    app.add_middleware(RedirectFastPathMiddleware, reserved_paths=[route.path for route in app.routes])
+
 
 @app.exception_handler(429)
 async def rate_limit_exception_handler(request: Request, exc: Exception):
@@ -55,4 +121,5 @@ async def rate_limit_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         content={"detail": "Rate limit exceeded. Try again in a minute."},
+        headers=getattr(exc, "headers", None),
     )
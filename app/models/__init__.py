@@ -1,9 +1,22 @@
+from .archive import ArchivedClickLog, ArchivedUrl
 from .click_log import ClickLog
+from .click_rollup import BotHitDaily, ClickRollupDaily, ClickRollupDimension, ClickRollupHourly, RollupCheckpoint
+from .short_code_sequence import ShortCodeSequence
 from .url import Url
+from .url_sketch import UrlSketch
 from .user import User
 
 __all__ = [
+    "ArchivedClickLog",
+    "ArchivedUrl",
+    "BotHitDaily",
     "ClickLog",
+    "ClickRollupDaily",
+    "ClickRollupDimension",
+    "ClickRollupHourly",
+    "RollupCheckpoint",
+    "ShortCodeSequence",
     "Url",
+    "UrlSketch",
     "User",
 ]
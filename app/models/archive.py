@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, Text, Index
+from app.database.base import Base
+
+
+class ArchivedUrl(Base):
+    """
+    SQLAlchemy model for dead URLs moved out of `urls` by the expiry sweeper.
+    Represents the 'archived_urls' table in the database. Rows keep their original IDs.
+    """
+    __tablename__ = "archived_urls"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    original_url = Column(String, nullable=False)
+    short_code = Column(String(12), index=True, nullable=False)
+    user_id = Column(Integer, nullable=True)
+    clicks = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expired_at = Column(DateTime(timezone=True), nullable=True)
+    max_clicks = Column(Integer, nullable=True)
+    one_time_use = Column(Boolean, nullable=False)
+    redirect_status = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedUrl(id={self.id}, short_code='{self.short_code}', archived_at='{self.archived_at}')>"
+
+
+class ArchivedClickLog(Base):
+    """
+    SQLAlchemy model for the click logs of archived URLs.
+    Represents the 'archived_click_logs' table in the database. Rows keep their original IDs.
+    """
+    __tablename__ = "archived_click_logs"
+    __table_args__ = (
+        Index("ix_archived_click_logs_url_id", "url_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    url_id = Column(Integer, nullable=False)
+    clicked_at = Column(DateTime(timezone=True), nullable=False)
+    referrer = Column(String, nullable=True)
+    user_agent = Column(Text, nullable=True)
+    ip_address = Column(String, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedClickLog(id={self.id}, url_id={self.url_id}, clicked_at='{self.clicked_at}')>"
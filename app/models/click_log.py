@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text, Index
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 
@@ -6,9 +6,18 @@ from app.database.base import Base
 class ClickLog(Base):
     """
     SQLAlchemy model for storing details of each URL click.
-    Represents the 'click_logs' table in the database.
+    Represents the 'click_logs' table in the database, range-partitioned by month of `clicked_at`
+    on PostgreSQL (see `app.services.click_retention`).
     """
     __tablename__ = "click_logs"
+    __table_args__ = (
+        # Serves the per-URL, time-ranged aggregations of the analytics endpoint.
+        Index("ix_click_logs_url_id_clicked_at", "url_id", "clicked_at"),
+        # Serves the month-by-month export and deletion of the click log retention policy.
+        Index("ix_click_logs_clicked_at", "clicked_at"),
+        # Rollups track progress by ID, so SQLite must never reuse the IDs of deleted rows.
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     url_id = Column(Integer, ForeignKey("urls.id", ondelete="CASCADE"), nullable=False)
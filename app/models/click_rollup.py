@@ -0,0 +1,92 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, LargeBinary, PrimaryKeyConstraint
+from app.database.base import Base
+
+
+class ClickRollupHourly(Base):
+    """
+    SQLAlchemy model for clicks pre-aggregated per URL and hour.
+    Represents the 'click_rollups_hourly' table in the database.
+    """
+    __tablename__ = "click_rollups_hourly"
+    __table_args__ = (PrimaryKeyConstraint("url_id", "bucket_start"),)
+
+    url_id = Column(Integer, ForeignKey("urls.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    clicks = Column(Integer, nullable=False, default=0)
+    unique_visitors = Column(Integer, nullable=False, default=0)
+    visitors_sketch = Column(LargeBinary, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ClickRollupHourly(url_id={self.url_id}, bucket_start='{self.bucket_start}', clicks={self.clicks})>"
+
+
+class ClickRollupDaily(Base):
+    """
+    SQLAlchemy model for clicks pre-aggregated per URL and day.
+    Represents the 'click_rollups_daily' table in the database.
+    """
+    __tablename__ = "click_rollups_daily"
+    __table_args__ = (PrimaryKeyConstraint("url_id", "bucket_start"),)
+
+    url_id = Column(Integer, ForeignKey("urls.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    clicks = Column(Integer, nullable=False, default=0)
+    unique_visitors = Column(Integer, nullable=False, default=0)
+    visitors_sketch = Column(LargeBinary, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ClickRollupDaily(url_id={self.url_id}, bucket_start='{self.bucket_start}', clicks={self.clicks})>"
+
+
+class ClickRollupDimension(Base):
+    """
+    SQLAlchemy model for clicks per URL, hour and referrer or user agent, used for "top" breakdowns.
+    Represents the 'click_rollup_dimensions' table in the database.
+    Missing values are stored as an empty string so they take part in the primary key.
+    """
+    __tablename__ = "click_rollup_dimensions"
+    __table_args__ = (PrimaryKeyConstraint("url_id", "bucket_start", "dimension", "value"),)
+
+    url_id = Column(Integer, ForeignKey("urls.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    dimension = Column(String(16), nullable=False)
+    value = Column(String(512), nullable=False)
+    clicks = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ClickRollupDimension(url_id={self.url_id}, bucket_start='{self.bucket_start}', "
+            f"dimension='{self.dimension}', clicks={self.clicks})>"
+        )
+
+
+class BotHitDaily(Base):
+    """
+    SQLAlchemy model for redirects of bots and prefetches per URL, day and kind ("bot" or "prefetch").
+    Represents the 'bot_hits_daily' table in the database. These hits are neither counted as clicks
+    nor logged in `click_logs`.
+    """
+    __tablename__ = "bot_hits_daily"
+    __table_args__ = (PrimaryKeyConstraint("url_id", "bucket_start", "kind"),)
+
+    url_id = Column(Integer, ForeignKey("urls.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    kind = Column(String(16), nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<BotHitDaily(url_id={self.url_id}, bucket_start='{self.bucket_start}', kind='{self.kind}', hits={self.hits})>"
+
+
+class RollupCheckpoint(Base):
+    """
+    SQLAlchemy model for the high-water marks of incremental rollup jobs.
+    Represents the 'rollup_checkpoints' table in the database.
+    """
+    __tablename__ = "rollup_checkpoints"
+
+    name = Column(String(32), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<RollupCheckpoint(name='{self.name}', last_id={self.last_id})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, BigInteger
+from app.database.base import Base
+
+
+class ShortCodeSequence(Base):
+    """
+    SQLAlchemy model for the counters that sequential short codes are allocated from.
+    Represents the 'short_code_sequences' table in the database.
+    """
+    __tablename__ = "short_code_sequences"
+
+    name = Column(String(32), primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<ShortCodeSequence(name='{self.name}', next_value={self.next_value})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 
@@ -9,6 +9,10 @@ class Url(Base):
     Represents the 'urls' table in the database.
     """
     __tablename__ = "urls"
+    __table_args__ = (
+        # Serves keyset pagination of a user's URLs (WHERE user_id = ? AND id < ? ORDER BY id DESC).
+        Index("ix_urls_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     original_url = Column(String, nullable=False)
@@ -19,6 +23,7 @@ class Url(Base):
     expired_at = Column(DateTime(timezone=True), nullable=True)
     max_clicks = Column(Integer, nullable=True)
     one_time_use = Column(Boolean, default=False, nullable=False)
+    redirect_status = Column(Integer, default=307, server_default="307", nullable=False)
 
     # Relationship to the User model, linking URLs to their creators.
     user = relationship("User", back_populates="urls", lazy="joined")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, LargeBinary
+from app.database.base import Base
+
+
+class UrlSketch(Base):
+    """
+    SQLAlchemy model for the serialized HyperLogLog sketch of the visitors of a URL.
+    Represents the 'url_sketches' table in the database.
+    """
+    __tablename__ = "url_sketches"
+
+    url_id = Column(Integer, ForeignKey("urls.id", ondelete="CASCADE"), primary_key=True)
+    visitors = Column(LargeBinary, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<UrlSketch(url_id={self.url_id}, size={len(self.visitors or b'')})>"
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 
 
@@ -10,3 +11,4 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     """Schema for data contained within a JWT token."""
     username: str | None = None
+    exp: datetime | None = None
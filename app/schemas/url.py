@@ -1,10 +1,21 @@
 from pydantic import BaseModel, HttpUrl, ConfigDict, Field
 from datetime import datetime
-from typing import List
+from enum import Enum
+from typing import List, Literal
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+class RedirectStatus(int, Enum):
+    """HTTP status code a short URL redirects with."""
+    MOVED_PERMANENTLY = 301
+    FOUND = 302
+    TEMPORARY_REDIRECT = 307
+    PERMANENT_REDIRECT = 308
+
+
 class UrlCreate(BaseModel):
     """Schema for creating a new URL."""
     original_url: HttpUrl
@@ -18,6 +29,11 @@ class UrlCreate(BaseModel):
     expired_at: datetime | None = None
     max_clicks: int | None = Field(None, ge=1, description="Optional maximum number of clicks before the URL expires. Must be at least 1.")
     one_time_use: bool = Field(False, description="If true, the URL expires after one click. Overrides max_clicks if true.")
+    redirect_status: RedirectStatus = Field(
+        RedirectStatus.TEMPORARY_REDIRECT,
+        description="Redirect status code. Permanent redirects (301/308) may be cached by browsers and CDNs, "
+                    "so later clicks and target changes may not reach the server until the cache expires.",
+    )
 
 
 class UrlOut(BaseModel):
@@ -30,16 +46,55 @@ class UrlOut(BaseModel):
     expired_at: datetime | None = None
     max_clicks: int | None = None
     one_time_use: bool = Field(False, description="If true, the URL expires after one click.")
+    redirect_status: RedirectStatus = RedirectStatus.TEMPORARY_REDIRECT
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class UrlBulkCreate(BaseModel):
+    """Schema for creating many URLs in one request."""
+    items: List[UrlCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BULK_CREATE_MAX_ITEMS,
+        description="The URLs to create. Each item is processed independently."
+    )
+
+
+class UrlBulkItemResult(BaseModel):
+    """Schema for the outcome of a single item of a bulk creation."""
+    index: int = Field(..., description="Position of the item in the request.")
+    url: UrlOut | None = None
+    error: str | None = None
+
+
+class UrlBulkCreateOut(BaseModel):
+    """Schema for returning the outcome of a bulk creation."""
+    created: int
+    failed: int
+    results: List[UrlBulkItemResult]
+
+
+class UrlStatus(str, Enum):
+    """Lifecycle state used to filter URL listings."""
+    ACTIVE = "active"
+    EXPIRED = "expired"
+    EXHAUSTED = "exhausted"
+
+
+class UrlExportFormat(str, Enum):
+    """Serialization format of a URL export."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class UrlUpdate(BaseModel):
     """Schema for updating an existing URL's details."""
     original_url: HttpUrl | None = None
     expired_at: datetime = None
     max_clicks: int | None = Field(None, ge=1)
     one_time_use: bool | None = None
+    redirect_status: RedirectStatus | None = None
 
 class ClickLogOut(BaseModel):
     """Schema for returning click log details."""
@@ -52,9 +107,71 @@ class ClickLogOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class QrFormat(str, Enum):
+    """Representation of a QR code: base64 PNG wrapped in JSON, or a raw PNG or SVG image."""
+    JSON = "json"
+    PNG = "png"
+    SVG = "svg"
+
+
+class QrErrorCorrection(str, Enum):
+    """QR code error correction level, from about 7% (L) to 30% (H) of recoverable data."""
+    L = "L"
+    M = "M"
+    Q = "Q"
+    H = "H"
+
+
+class QrExportRequest(BaseModel):
+    """Schema for exporting the QR codes of many URLs as a ZIP archive."""
+    url_ids: List[int] | None = Field(
+        None,
+        min_length=1,
+        max_length=settings.QR_EXPORT_MAX_ITEMS,
+        description="The URLs to export. All URLs of the user matching the filters when omitted."
+    )
+    status: UrlStatus | None = Field(None, description="Only export URLs in this state.")
+    created_from: datetime | None = Field(None, description="Only export URLs created at or after this time.")
+    created_to: datetime | None = Field(None, description="Only export URLs created before this time.")
+    format: Literal["png", "svg"] = Field("png", description="Image format of the QR codes.")
+    size: int = Field(10, ge=1, le=settings.QR_MAX_SIZE, description="Pixels per QR module.")
+    error_correction: QrErrorCorrection = Field(QrErrorCorrection.L, description="Error correction level.")
+
+
+class AnalyticsBucket(str, Enum):
+    """Width of the time buckets of an analytics time series."""
+    HOUR = "hour"
+    DAY = "day"
+
+
+class ClickBucketOut(BaseModel):
+    """Schema for the number of clicks in one time bucket."""
+    bucket: datetime = Field(..., description="Start of the bucket (UTC).")
+    clicks: int
+
+
+class ClickBreakdownOut(BaseModel):
+    """Schema for the number of clicks sharing one referrer or user agent."""
+    value: str | None
+    clicks: int
+
+
 class UrlAnalyticsOut(UrlOut):
     """Schema for returning URL details with aggregated analytics."""
     total_clicks: int = Field(..., description="Total number of clicks for this URL.")
-    click_logs: List[ClickLogOut] = Field([], description="Detailed logs for each click.")
-
-    model_config = ConfigDict(from_attributes=True)
+    total_unique_visitors: int = Field(..., description="Estimated number of distinct visitors (IP addresses) ever.")
+    unique_visitors_error: float = Field(
+        ...,
+        description="Relative standard error of the unique visitor estimates (about 1.6%; 95% of estimates "
+                    "are within twice this).",
+    )
+    range_start: datetime
+    range_end: datetime
+    bucket: AnalyticsBucket
+    range_clicks: int = Field(..., description="Number of clicks logged within the range.")
+    unique_visitors: int = Field(..., description="Estimated number of distinct IP addresses within the range.")
+    timeseries: List[ClickBucketOut] = Field([], description="Clicks per bucket; empty buckets are omitted.")
+    top_referrers: List[ClickBreakdownOut] = []
+    top_user_agents: List[ClickBreakdownOut] = []
+    bot_hits: int = Field(0, description="Redirects of link preview crawlers and other bots, not counted as clicks.")
+    prefetch_hits: int = Field(0, description="Browser prefetches of the short URL, not counted as clicks.")
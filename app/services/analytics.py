@@ -0,0 +1,182 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+from typing import List
+import logging
+
+from app.core.config import settings
+from app.database.sql import BUCKET_SIZES, time_bucket, as_utc, floor_to_bucket
+from app.models.click_log import ClickLog
+from app.models.click_rollup import BotHitDaily, ClickRollupHourly, ClickRollupDaily, ClickRollupDimension
+from app.models.url import Url
+from app.services.bot_filter import BOT, PREFETCH
+from app.services.rollup import ROLLUP_DIMENSIONS, dimension_value, get_rollup_checkpoint
+from app.services.unique_visitors import new_sketch, load_sketch, get_url_visitors
+from app.schemas.url import (
+    AnalyticsBucket,
+    ClickBucketOut,
+    ClickBreakdownOut,
+    UrlAnalyticsOut,
+    UrlOut,
+)
+
+logger = logging.getLogger(__name__)
+
+def resolve_time_range(
+        start: datetime | None,
+        end: datetime | None,
+        bucket: AnalyticsBucket,
+) -> tuple[datetime, datetime]:
+    """
+    Fills in the default analytics window, widens it to whole UTC buckets and validates it.
+    Raises ValueError if the range is empty or would produce more than `ANALYTICS_MAX_BUCKETS` buckets.
+    """
+    size = BUCKET_SIZES[bucket.value]
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=settings.ANALYTICS_DEFAULT_RANGE_DAYS)
+    if start >= end:
+        raise ValueError("The analytics range must start before it ends.")
+    start, aligned_end = floor_to_bucket(start, bucket.value), floor_to_bucket(end, bucket.value)
+    end = aligned_end if aligned_end == as_utc(end) else aligned_end + size
+    if (end - start) / size > settings.ANALYTICS_MAX_BUCKETS:
+        raise ValueError(
+            f"The analytics range spans more than {settings.ANALYTICS_MAX_BUCKETS} {bucket.value} buckets."
+        )
+    return start, end
+
+
+async def get_url_analytics(
+        db: AsyncSession,
+        url_id: int,
+        user_id: int,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        bucket: AnalyticsBucket = AnalyticsBucket.DAY,
+        top: int = settings.ANALYTICS_TOP_N,
+) -> UrlAnalyticsOut | None:
+    """
+    Computes click analytics for a URL owned by the user over `[start, end)`, widened to whole buckets.
+
+    Figures come from the rollup tables for every click log up to the rollup checkpoint, and only
+    the not-yet-rolled tail of `click_logs` is aggregated on the fly, so the cost grows with the
+    number of buckets rather than the number of clicks. Unique visitors are HyperLogLog estimates:
+    the bucket sketches of the range are merged with the addresses of the tail. Bot and prefetch
+    hits, which are never logged as clicks, are counted per day over the days the range touches.
+    Raises ValueError for an invalid range.
+    """
+    start, end = resolve_time_range(start, end, bucket)
+    logger.info(f"Fetching analytics for URL ID {url_id} by user {user_id} ({start} - {end}, per {bucket.value})")
+    result = await db.execute(
+        select(Url).where(Url.id == url_id, Url.user_id == user_id).options(noload(Url.user))
+    )
+    url = result.scalar_one_or_none()
+    if not url:
+        logger.warning(f"Analytics requested for URL ID {url_id} not found or not owned by user {user_id}")
+        return None
+
+    checkpoint = await get_rollup_checkpoint(db)
+    rollup = ClickRollupHourly if bucket == AnalyticsBucket.HOUR else ClickRollupDaily
+    rolled_range = (rollup.url_id == url_id, rollup.bucket_start >= start, rollup.bucket_start < end)
+    tail_range = (
+        ClickLog.url_id == url_id,
+        ClickLog.id > checkpoint,
+        ClickLog.clicked_at >= start,
+        ClickLog.clicked_at < end,
+    )
+
+    timeseries: Counter[datetime] = Counter()
+    visitors = new_sketch()
+    rows = await db.execute(select(rollup.bucket_start, rollup.clicks, rollup.visitors_sketch).where(*rolled_range))
+    for bucket_start, clicks, sketch in rows:
+        timeseries[as_utc(bucket_start)] += clicks
+        if sketch:
+            visitors.merge(load_sketch(sketch))
+
+    tail_bucket = time_bucket(db.get_bind().dialect.name, bucket.value, ClickLog.clicked_at).label("bucket")
+    rows = await db.execute(select(tail_bucket, func.count()).where(*tail_range).group_by(tail_bucket))
+    for bucket_start, clicks in rows:
+        timeseries[as_utc(bucket_start)] += clicks
+    rows = await db.execute(select(ClickLog.ip_address).where(*tail_range, ClickLog.ip_address.is_not(None)).distinct())
+    for ip_address in rows.scalars():
+        visitors.add(ip_address)
+
+    rows = await db.execute(
+        select(BotHitDaily.kind, func.sum(BotHitDaily.hits))
+        .where(
+            BotHitDaily.url_id == url_id,
+            BotHitDaily.bucket_start >= floor_to_bucket(start, "day"),
+            BotHitDaily.bucket_start < end,
+        )
+        .group_by(BotHitDaily.kind)
+    )
+    bot_hits = dict(rows.all())
+
+    async def breakdown(dimension: str) -> List[ClickBreakdownOut]:
+        counts: Counter[str] = Counter()
+        rows = await db.execute(
+            select(ClickRollupDimension.value, func.sum(ClickRollupDimension.clicks))
+            .where(
+                ClickRollupDimension.url_id == url_id,
+                ClickRollupDimension.dimension == dimension,
+                ClickRollupDimension.bucket_start >= start,
+                ClickRollupDimension.bucket_start < end,
+            )
+            .group_by(ClickRollupDimension.value)
+        )
+        counts.update(dict(rows.all()))
+        value = dimension_value(ROLLUP_DIMENSIONS[dimension])
+        rows = await db.execute(select(value, func.count()).where(*tail_range).group_by(value))
+        counts.update(dict(rows.all()))
+        return [ClickBreakdownOut(value=value or None, clicks=clicks) for value, clicks in counts.most_common(top)]
+
+    return UrlAnalyticsOut(
+        **UrlOut.model_validate(url).model_dump(),
+        total_clicks=url.clicks,
+        range_start=start,
+        range_end=end,
+        bucket=bucket,
+        total_unique_visitors=(await get_url_visitors(db, url_id)).count(),
+        unique_visitors_error=visitors.relative_error,
+        range_clicks=sum(timeseries.values()),
+        unique_visitors=visitors.count(),
+        timeseries=[ClickBucketOut(bucket=key, clicks=timeseries[key]) for key in sorted(timeseries)],
+        top_referrers=await breakdown("referrer"),
+        top_user_agents=await breakdown("user_agent"),
+        bot_hits=bot_hits.get(BOT, 0),
+        prefetch_hits=bot_hits.get(PREFETCH, 0),
+    )
+
+
+async def get_url_click_logs(
+        db: AsyncSession,
+        url_id: int,
+        user_id: int,
+        limit: int = settings.ANALYTICS_CLICKS_DEFAULT_PAGE_SIZE,
+        after_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+) -> tuple[List[ClickLog], int | None] | None:
+    """
+    Retrieves one page of the raw click logs of a URL owned by the user, newest first.
+    Uses keyset pagination on the click log ID. Returns the page and the ID to continue after
+    (None on the last page), or None if the URL was not found.
+    """
+    owned = await db.scalar(select(Url.id).where(Url.id == url_id, Url.user_id == user_id))
+    if owned is None:
+        logger.warning(f"Click logs requested for URL ID {url_id} not found or not owned by user {user_id}")
+        return None
+
+    filters = [ClickLog.url_id == url_id]
+    if after_id is not None:
+        filters.append(ClickLog.id < after_id)
+    if start is not None:
+        filters.append(ClickLog.clicked_at >= start)
+    if end is not None:
+        filters.append(ClickLog.clicked_at < end)
+    result = await db.execute(select(ClickLog).where(*filters).order_by(ClickLog.id.desc()).limit(limit + 1))
+    logs = list(result.scalars().all())
+    if len(logs) > limit:
+        return logs[:limit], logs[limit - 1].id
+    return logs, None
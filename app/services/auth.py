@@ -0,0 +1,83 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from hashlib import sha256
+from sqlalchemy import event
+import logging
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Compact, immutable identity of an authenticated user, as handed to the routes.
+    """
+    id: int
+    email: str
+
+
+class PrincipalCache:
+    """
+    Caches the principal of every verified access token, keyed by the SHA-256 of the token, so
+    repeated requests with the same token skip both the JWT verification and the user lookup.
+
+    Entries live until the token expires or for `ttl_seconds`, whichever comes first. Changes to a
+    user evict all of its tokens from this worker; other workers pick them up within `ttl_seconds`.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache: TTLCache[bytes, Principal] = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._keys_by_user: defaultdict[int, set[bytes]] = defaultdict(set)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Principal | None:
+        return self._cache.get(self._key(token))
+
+    def set(self, token: str, principal: Principal, expires_at: datetime | None = None) -> None:
+        ttl = self._cache.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        key = self._key(token)
+        self._cache.set(key, principal, ttl_seconds=ttl)
+        # Forget keys of this user that have expired in the meantime, so the index stays bounded.
+        keys = {k for k in self._keys_by_user.get(principal.id, ()) if k in self._cache}
+        keys.add(key)
+        self._keys_by_user[principal.id] = keys
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Evicts every cached token of a user.
+        """
+        for key in self._keys_by_user.pop(user_id, ()):
+            self._cache.invalidate(key)
+        logger.debug(f"Invalidated cached principals of user ID {user_id}.")
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    """
+    Drops the cached principals of a user whenever the user row is updated or deleted through the ORM.
+    """
+    principal_cache.invalidate_user(target.id)
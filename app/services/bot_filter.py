@@ -0,0 +1,178 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Callable
+import asyncio
+import logging
+import re
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.database.sql import additive_upsert
+from app.models.click_rollup import BotHitDaily
+
+logger = logging.getLogger(__name__)
+
+BOT = "bot"
+PREFETCH = "prefetch"
+
+# User agent tokens of link preview crawlers, search engine crawlers and monitoring services.
+# Generic HTTP clients (curl, python-requests, ...) and in-app browsers are left out: people use them.
+BOT_USER_AGENT_TOKENS = (
+    "facebookexternalhit", "facebookcatalog", "meta-externalagent", "Facebot",
+    "Twitterbot", "Slackbot", "Slack-ImgProxy", "Discordbot", "TelegramBot", "WhatsApp",
+    "LinkedInBot", "Pinterestbot", "redditbot", "SkypeUriPreview", "Iframely", "Embedly",
+    "vkShare", "Viber", "Mastodon", "Bluesky",
+    "Googlebot", "Google-InspectionTool", "AdsBot-Google", "Mediapartners-Google",
+    "FeedFetcher-Google", "bingbot", "BingPreview", "DuckDuckBot", "Baiduspider", "YandexBot",
+    "Applebot", "Amazonbot", "PetalBot", "SemrushBot", "AhrefsBot", "MJ12bot", "DotBot",
+    "GPTBot", "ClaudeBot", "PerplexityBot", "Bytespider", "CCBot",
+    "UptimeRobot", "Pingdom", "StatusCake", "HeadlessChrome",
+)
+
+# Request headers announcing a speculative load, checked in this order.
+PURPOSE_HEADERS = ("sec-purpose", "purpose", "x-purpose", "x-moz")
+
+_BOT_USER_AGENT = re.compile(
+    "|".join(
+        re.escape(token)
+        for token in (*BOT_USER_AGENT_TOKENS, *filter(None, settings.BOT_FILTER_EXTRA_USER_AGENTS.split(",")))
+    ),
+    re.IGNORECASE,
+)
+_SPECULATIVE_PURPOSE = re.compile(r"prefetch|prerender|preview", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def is_bot_user_agent(user_agent: str) -> bool:
+    """
+    Whether `user_agent` contains one of the known bot tokens. The few distinct user agents of a
+    traffic mix are matched once and then answered from an LRU cache.
+    """
+    return _BOT_USER_AGENT.search(user_agent) is not None
+
+
+def classify_request(user_agent: str | None, purpose: str | None) -> str | None:
+    """
+    Classifies a redirect request as a browser prefetch (`PREFETCH`), a bot (`BOT`) or a visit (None),
+    from its user agent and the value of its first `PURPOSE_HEADERS` header.
+    """
+    if not settings.BOT_FILTER_ENABLED:
+        return None
+    if purpose is not None and _SPECULATIVE_PURPOSE.search(purpose):
+        return PREFETCH
+    if user_agent and is_bot_user_agent(user_agent):
+        return BOT
+    return None
+
+
+class BotHitCounter:
+    """
+    Counts redirects of bots and prefetches per URL, day and kind in memory and periodically adds
+    them to `bot_hits_daily` with batched upserts, instead of logging a click for each of them.
+    Counts are kept and applied per shard; `session_factory` serves the default shard.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            flush_interval: float = settings.CLICK_COUNTER_FLUSH_INTERVAL_SECONDS,
+            batch_size: int = settings.CLICK_COUNTER_BATCH_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: defaultdict[tuple[str, int, datetime, str], int] = defaultdict(int)
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.hits = {BOT: 0, PREFETCH: 0}
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def increment(self, url_id: int, kind: str, shard: str = DEFAULT_SHARD) -> None:
+        day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._pending[(shard, url_id, day, kind)] += 1
+        self.hits[kind] += 1
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="bot-hit-counter")
+        logger.info("Bot hit counter flusher started.")
+
+    async def stop(self) -> None:
+        """
+        Stops the periodic flush and writes out every pending count.
+        """
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Bot hit counter flusher stopped.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Adds all pending counts to `bot_hits_daily`, `batch_size` rows per statement.
+        Counts of a failed batch are put back so they are retried on the next flush.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(int)
+        by_shard: defaultdict[str, list[dict]] = defaultdict(list)
+        for (shard, url_id, day, kind), hits in pending.items():
+            by_shard[shard].append({"url_id": url_id, "bucket_start": day, "kind": kind, "hits": hits})
+
+        for shard, items in by_shard.items():
+            session_factory = self.session_factory if shard == DEFAULT_SHARD else shard_router.session_factory(shard)
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                try:
+                    async with session_factory() as db:
+                        upsert = additive_upsert(
+                            db.get_bind().dialect.name,
+                            BotHitDaily.__table__,
+                            ["url_id", "bucket_start", "kind"],
+                            ["hits"],
+                        )
+                        await db.execute(upsert, chunk)
+                        await db.commit()
+                    self.flushed_rows += len(chunk)
+                except SQLAlchemyError as e:
+                    self.failures += 1
+                    for item in chunk:
+                        self._pending[(shard, item["url_id"], item["bucket_start"], item["kind"])] += item["hits"]
+                    logger.error(f"Database error flushing bot hits for {len(chunk)} URLs: {e}")
+        self.flushes += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "enabled": settings.BOT_FILTER_ENABLED,
+            "bot_hits": self.hits[BOT],
+            "prefetch_hits": self.hits[PREFETCH],
+            "pending_rows": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "flushes": self.flushes,
+            "failures": self.failures,
+        }
+
+
+bot_hit_counter = BotHitCounter()
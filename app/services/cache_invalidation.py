@@ -0,0 +1,130 @@
+from typing import Any, Callable, Hashable, Iterable
+import asyncio
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheInvalidationBus:
+    """
+    Broadcasts cache invalidations to every worker over a Redis pub/sub channel.
+
+    Each worker keeps its own in-process cache, so a change made through one worker (for example
+    adding a click limit to a URL) must also evict the entry cached by the others; otherwise they
+    would keep serving the stale record until its TTL runs out. Invalidations are always applied
+    locally first, so the bus degrades to per-worker invalidation when Redis is unavailable.
+    Whenever the subscription is (re)established, the local cache is reset, since messages
+    published while it was down were missed. The bus carries any per-key broadcast with these
+    semantics, e.g. newly created short codes for the short code filter.
+    """
+
+    def __init__(
+            self,
+            on_invalidate: Callable[[Hashable], Any],
+            on_reset: Callable[[], Any],
+            channel: str = settings.CACHE_INVALIDATION_CHANNEL,
+            reconnect_delay: float = settings.CACHE_INVALIDATION_RECONNECT_SECONDS,
+    ):
+        self._on_invalidate = on_invalidate
+        self._on_reset = on_reset
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._redis = None
+        self._task: asyncio.Task | None = None
+        self.published = 0
+        self.received = 0
+        self.publish_failures = 0
+        self.resets = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, redis) -> None:
+        """
+        Starts listening for invalidations published by other workers on `redis`.
+        """
+        if self.running:
+            return
+        self._redis = redis
+        self._task = asyncio.create_task(self._listen(), name="cache-invalidation")
+        logger.info(f"Cache invalidation listener started on channel '{self.channel}'.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._redis = None
+        logger.info("Cache invalidation listener stopped.")
+
+    async def publish(self, key: str) -> None:
+        """
+        Invalidates `key` in this worker and broadcasts the invalidation to the others.
+        """
+        self._on_invalidate(key)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.channel, key)
+            self.published += 1
+        except Exception as e:
+            self.publish_failures += 1
+            logger.error(f"Failed to broadcast cache invalidation for '{key}': {e}")
+
+    async def publish_many(self, keys: Iterable[str]) -> None:
+        """
+        Like `publish` for several keys, broadcast as a single newline-separated message.
+        """
+        keys = list(keys)
+        for key in keys:
+            self._on_invalidate(key)
+        if self._redis is None or not keys:
+            return
+        try:
+            await self._redis.publish(self.channel, "\n".join(keys))
+            self.published += 1
+        except Exception as e:
+            self.publish_failures += 1
+            logger.error(f"Failed to broadcast {len(keys)} keys on '{self.channel}': {e}")
+
+    def handle_message(self, message: dict) -> None:
+        if message.get("type") != "message":
+            return
+        data = message["data"]
+        if isinstance(data, bytes):
+            data = data.decode()
+        self.received += 1
+        for key in data.split("\n"):
+            self._on_invalidate(key)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._on_reset()
+                    self.resets += 1
+                    async for message in pubsub.listen():
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation subscription lost, retrying: {e}")
+            await asyncio.sleep(self.reconnect_delay)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "channel": self.channel,
+            "published": self.published,
+            "received": self.received,
+            "publish_failures": self.publish_failures,
+            "resets": self.resets,
+        }
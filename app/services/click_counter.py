@@ -0,0 +1,174 @@
+from collections import defaultdict
+from sqlalchemy import select, update, bindparam, func, case, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Callable
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.models.url import Url
+
+logger = logging.getLogger(__name__)
+
+_urls = Url.__table__
+
+_increment_clicks = (
+    update(_urls)
+    .where(_urls.c.id == bindparam("url_id"))
+    .values(clicks=_urls.c.clicks + bindparam("delta"))
+)
+
+
+class ClickCounter:
+    """
+    Coalesces click count increments per URL in memory and periodically applies them as
+    `UPDATE urls SET clicks = clicks + :delta` statements, executed in batches.
+
+    Only URLs without click limits are counted here; limited URLs must go through
+    `claim_limited_click` so their limit is enforced by the database. Deltas are kept and applied
+    per shard; `session_factory` serves the default shard.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            flush_interval: float = settings.CLICK_COUNTER_FLUSH_INTERVAL_SECONDS,
+            batch_size: int = settings.CLICK_COUNTER_BATCH_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: defaultdict[tuple[str, int], int] = defaultdict(int)
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.increments = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def increment(self, url_id: int, delta: int = 1, shard: str = DEFAULT_SHARD) -> None:
+        """
+        Records `delta` clicks for a URL. The database is updated on the next flush.
+        """
+        self._pending[(shard, url_id)] += delta
+        self.increments += delta
+
+    def pending(self, url_id: int, shard: str = DEFAULT_SHARD) -> int:
+        """
+        Returns the clicks recorded for a URL that have not been flushed yet.
+        """
+        return self._pending.get((shard, url_id), 0)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="click-counter")
+        logger.info("Click counter flusher started.")
+
+    async def stop(self) -> None:
+        """
+        Stops the periodic flush and writes out every pending delta.
+        """
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Click counter flusher stopped.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Applies all pending deltas, `batch_size` rows per statement.
+        Deltas of a failed batch are put back so they are retried on the next flush.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(int)
+        by_shard: defaultdict[str, list[dict]] = defaultdict(list)
+        for (shard, url_id), delta in pending.items():
+            by_shard[shard].append({"url_id": url_id, "delta": delta})
+
+        for shard, items in by_shard.items():
+            session_factory = self.session_factory if shard == DEFAULT_SHARD else shard_router.session_factory(shard)
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                try:
+                    async with session_factory() as db:
+                        await db.execute(_increment_clicks, chunk)
+                        await db.commit()
+                    self.flushed_rows += len(chunk)
+                except SQLAlchemyError as e:
+                    self.failures += 1
+                    for item in chunk:
+                        self._pending[(shard, item["url_id"])] += item["delta"]
+                    logger.error(f"Database error flushing click counts for {len(chunk)} URLs: {e}")
+        self.flushes += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending_urls": len(self._pending),
+            "pending_clicks": sum(self._pending.values()),
+            "increments": self.increments,
+            "flushed_rows": self.flushed_rows,
+            "flushes": self.flushes,
+            "failures": self.failures,
+        }
+
+
+_within_click_limit = and_(
+    or_(Url.max_clicks.is_(None), Url.clicks < Url.max_clicks),
+    or_(Url.one_time_use.is_(False), Url.clicks < 1),
+)
+
+
+async def claim_limited_click(db: AsyncSession, url_id: int) -> str | None:
+    """
+    Atomically counts one click for a click-limited URL if its limit has not been reached yet,
+    and returns its target URL. The limit check, the increment and the target lookup happen in a
+    single `UPDATE ... WHERE clicks < max_clicks RETURNING original_url`, so concurrent redirects can
+    never push a URL past its limit. Returns None if no click was left.
+    """
+    claim = (
+        update(Url)
+        .where(Url.id == url_id, _within_click_limit)
+        .values(
+            clicks=Url.clicks + 1,
+            expired_at=case((Url.one_time_use.is_(True), func.now()), else_=Url.expired_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.get_bind().dialect.update_returning:
+        result = await db.execute(claim.returning(Url.original_url))
+        original_url = result.scalar_one_or_none()
+        await db.commit()
+        return original_url
+
+    # Dialects without UPDATE ... RETURNING need a second round trip for the target.
+    result = await db.execute(claim)
+    if result.rowcount != 1:
+        await db.rollback()
+        return None
+    original_url = await db.scalar(select(Url.original_url).where(Url.id == url_id))
+    await db.commit()
+    return original_url
+
+
+click_counter = ClickCounter()
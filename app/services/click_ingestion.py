@@ -0,0 +1,280 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from typing import Callable
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.models.click_log import ClickLog
+from app.models.url import Url
+from app.services.unique_visitors import record_url_visitors
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """
+    What to do with a click event when the ingestion queue is full.
+    """
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+
+@dataclass(slots=True)
+class ClickEvent:
+    """
+    A single redirect, buffered in memory until the next batch flush.
+    """
+    url_id: int
+    referrer: str | None
+    user_agent: str | None
+    ip_address: str | None
+    clicked_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    shard: str = DEFAULT_SHARD
+
+    def as_row(self) -> dict:
+        return {
+            "url_id": self.url_id,
+            "referrer": self.referrer,
+            "user_agent": self.user_agent,
+            "ip_address": self.ip_address,
+            "clicked_at": self.clicked_at,
+        }
+
+
+class ClickIngestor:
+    """
+    Buffers click events in a bounded queue and writes them in multi-row INSERTs from a background task.
+    A batch is flushed when it reaches `batch_size` events or `flush_interval` seconds after its first event.
+    Events are written to the shard of their URL; `session_factory` serves the default shard.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            max_queue_size: int = settings.CLICK_INGEST_QUEUE_SIZE,
+            batch_size: int = settings.CLICK_INGEST_BATCH_SIZE,
+            flush_interval: float = settings.CLICK_INGEST_FLUSH_INTERVAL_SECONDS,
+            overflow_policy: OverflowPolicy = OverflowPolicy(settings.CLICK_INGEST_OVERFLOW_POLICY),
+            block_timeout: float = settings.CLICK_INGEST_BLOCK_TIMEOUT_SECONDS,
+            max_retries: int = settings.CLICK_INGEST_MAX_RETRIES,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+        self._retry_batch: list[ClickEvent] = []
+        self._retry_attempts: defaultdict[str, int] = defaultdict(int)
+        self._queue: asyncio.Queue[ClickEvent] = asyncio.Queue(maxsize=max_queue_size)
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.orphaned = 0
+        self.retries = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Starts the background flush task.
+        """
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="click-ingestor")
+        logger.info("Click ingestion pipeline started.")
+
+    async def stop(self, timeout: float = settings.CLICK_INGEST_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stops the background task after draining every queued event, or cancels it after `timeout` seconds.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._task, timeout)
+            logger.info("Click ingestion pipeline drained and stopped.")
+        except asyncio.TimeoutError:
+            logger.error(f"Click ingestion drain timed out; {self._queue.qsize()} events discarded.")
+            self.dropped += self._queue.qsize()
+        finally:
+            self._task = None
+
+    async def submit(self, event: ClickEvent) -> bool:
+        """
+        Enqueues a click event, applying the overflow policy when the queue is full.
+        Returns False if the event was dropped.
+        """
+        try:
+            self._queue.put_nowait(event)
+            self.enqueued += 1
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+            self._queue.get_nowait()
+            self._queue.put_nowait(event)
+            self.enqueued += 1
+            self.dropped += 1
+            return True
+
+        if self.overflow_policy == OverflowPolicy.BLOCK:
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.block_timeout)
+                self.enqueued += 1
+                return True
+            except asyncio.TimeoutError:
+                pass
+
+        self.dropped += 1
+        logger.warning(f"Click ingestion queue full; dropped click for URL ID {event.url_id}.")
+        return False
+
+    async def _next_batch(self) -> list[ClickEvent]:
+        """
+        Waits for the first event, then collects more until the batch is full or the flush interval elapses.
+        """
+        try:
+            first = await asyncio.wait_for(self._queue.get(), self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + (0 if self._stopping else self.flush_interval)
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            if self._retry_batch:
+                await asyncio.sleep(self.flush_interval)
+                batch, self._retry_batch = self._retry_batch, []
+                await self.flush(batch)
+                continue
+            batch = await self._next_batch()
+            if batch:
+                await self.flush(batch)
+            elif self._stopping and self._queue.empty():
+                return
+
+    def _session_factory(self, shard: str) -> Callable[[], AsyncSession]:
+        if shard == DEFAULT_SHARD:
+            return self.session_factory
+        return shard_router.session_factory(shard)
+
+    async def flush(self, batch: list[ClickEvent]) -> None:
+        """
+        Writes a batch of click events to `click_logs`, with a single multi-row INSERT per shard.
+
+        If the batch violates an integrity constraint (typically clicks for a URL deleted while the
+        events were queued), the events of URLs that no longer exist are dropped and the rest is
+        inserted again. A batch that fails for any other database error is kept and retried up to
+        `max_retries` times before it is discarded.
+        """
+        by_shard: defaultdict[str, list[ClickEvent]] = defaultdict(list)
+        for event in batch:
+            by_shard[event.shard].append(event)
+        for shard, events in by_shard.items():
+            await self._flush_shard(shard, events)
+
+    async def _flush_shard(self, shard: str, batch: list[ClickEvent]) -> None:
+        try:
+            try:
+                await self._insert(shard, batch)
+            except IntegrityError:
+                batch = await self._drop_orphans(shard, batch)
+                if batch:
+                    await self._insert(shard, batch)
+        except SQLAlchemyError as e:
+            if self._retry_attempts[shard] < self.max_retries:
+                self._retry_attempts[shard] += 1
+                self._retry_batch.extend(batch)
+                self.retries += 1
+                logger.warning(f"Database error flushing {len(batch)} click events, will retry: {e}")
+            else:
+                self._retry_attempts.pop(shard, None)
+                self.failed += len(batch)
+                logger.error(f"Database error flushing {len(batch)} click events, giving up: {e}")
+            return
+        except Exception as e:
+            self.failed += len(batch)
+            logger.critical(f"Unexpected error flushing {len(batch)} click events: {e}", exc_info=True)
+            return
+
+        self._retry_attempts.pop(shard, None)
+        if batch:
+            self.flushed += len(batch)
+            self.batches += 1
+            logger.debug(f"Flushed {len(batch)} click events.")
+
+    async def _insert(self, shard: str, batch: list[ClickEvent]) -> None:
+        """
+        Inserts the batch and folds its visitors into the per-URL sketches in one transaction.
+        """
+        async with self._session_factory(shard)() as db:
+            await db.execute(insert(ClickLog).values([event.as_row() for event in batch]))
+            await record_url_visitors(db, ((event.url_id, event.ip_address) for event in batch))
+            await db.commit()
+
+    async def _drop_orphans(self, shard: str, batch: list[ClickEvent]) -> list[ClickEvent]:
+        """
+        Returns the events of `batch` whose URL still exists, counting the others as orphaned.
+        """
+        async with self._session_factory(shard)() as db:
+            result = await db.execute(select(Url.id).where(Url.id.in_({event.url_id for event in batch})))
+            existing = set(result.scalars().all())
+        kept = [event for event in batch if event.url_id in existing]
+        orphaned = len(batch) - len(kept)
+        if orphaned:
+            self.orphaned += orphaned
+            logger.warning(f"Dropped {orphaned} click events for deleted URLs.")
+        return kept
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "overflow_policy": self.overflow_policy.value,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "orphaned": self.orphaned,
+            "retries": self.retries,
+            "pending_retry": len(self._retry_batch),
+            "batches": self.batches,
+        }
+
+
+click_ingestor = ClickIngestor()
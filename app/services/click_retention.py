@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from sqlalchemy import select, delete, func, text, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import Select
+from typing import Callable
+import asyncio
+import csv
+import gzip
+import logging
+import os
+import re
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.database.sql import as_utc
+from app.models.click_log import ClickLog
+from app.services.rollup import get_rollup_checkpoint
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ["id", "url_id", "clicked_at", "referrer", "user_agent", "ip_address"]
+
+# Monthly partitions of `click_logs` on PostgreSQL are named click_logs_YYYY_MM.
+_PARTITION_NAME = re.compile(r"^click_logs_(\d{4})_(\d{2})$")
+
+
+def month_start(value: datetime) -> datetime:
+    return as_utc(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"click_logs_{month.year:04d}_{month.month:02d}"
+
+
+class ClickRetentionWorker:
+    """
+    Enforces the click log retention policy: every month of click logs older than `retention_days`
+    is exported to a gzip-compressed CSV file under `export_dir` and then removed from the database.
+
+    On PostgreSQL, where `click_logs` is range-partitioned by month, a month is removed by detaching
+    and dropping its partition, which costs the same whatever its size; the worker also creates the
+    partitions of the coming `months_ahead` months. Elsewhere (or on a PostgreSQL table that was
+    never partitioned) months are deleted `chunk_size` rows per transaction.
+
+    Only click logs already folded into the rollups are removed, so analytics keep their figures
+    for exported months. Every export writes a new file, so a run interrupted between export and
+    removal never loses rows, at worst exports some of them twice.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            shard: str = DEFAULT_SHARD,
+            retention_days: int = settings.CLICK_RETENTION_DAYS,
+            export_dir: str = settings.CLICK_EXPORT_DIR,
+            months_ahead: int = settings.CLICK_PARTITION_MONTHS_AHEAD,
+            chunk_size: int = settings.CLICK_RETENTION_CHUNK_SIZE,
+            interval: float = settings.CLICK_RETENTION_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.shard = shard
+        self.retention_days = retention_days
+        self.export_dir = Path(export_dir) / shard
+        self.months_ahead = months_ahead
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.exported_rows = 0
+        self.exported_files = 0
+        self.dropped_partitions = 0
+        self.deleted_rows = 0
+        self.runs = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name=f"click-retention-{self.shard}")
+        logger.info(f"Click log retention started for shard '{self.shard}'.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info(f"Click log retention stopped for shard '{self.shard}'.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except (SQLAlchemyError, OSError) as e:
+                self.failures += 1
+                logger.error(f"Error while enforcing click log retention on shard '{self.shard}': {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """
+        Creates upcoming partitions, then exports and removes every expired month.
+        Returns the number of click logs exported.
+        """
+        cutoff = month_start(datetime.now(timezone.utc) - timedelta(days=self.retention_days))
+        async with self.session_factory() as db:
+            partitioned = await self._partitioned(db)
+        if partitioned:
+            await self.create_partitions()
+            exported = await self._expire_partitions(cutoff)
+        else:
+            exported = await self._expire_months(cutoff)
+        self.runs += 1
+        if exported:
+            logger.info(f"Exported and removed {exported} click logs older than {cutoff.date()} on shard '{self.shard}'.")
+        return exported
+
+    @staticmethod
+    async def _partitioned(db: AsyncSession) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(await db.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('click_logs'))"
+        )))
+
+    async def create_partitions(self) -> None:
+        """
+        Creates the partitions of the current month and the next `months_ahead` months.
+        """
+        month = month_start(datetime.now(timezone.utc))
+        async with self.session_factory() as db:
+            for _ in range(self.months_ahead + 1):
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF click_logs "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+                ))
+                month = next_month(month)
+            await db.commit()
+
+    async def _expire_partitions(self, cutoff: datetime) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass('click_logs')"
+            ))
+            names = sorted(result.scalars().all())
+            rolled_up = await get_rollup_checkpoint(db)
+
+        total = 0
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match is None:
+                continue
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            if next_month(month) > cutoff:
+                continue
+            partition = table(name, *(column(column_name) for column_name in _COLUMNS))
+            async with self.session_factory() as db:
+                if (await db.scalar(select(func.max(partition.c.id))) or 0) > rolled_up:
+                    logger.info(f"Keeping partition {name}: it holds click logs not rolled up yet.")
+                    continue
+                rows, _ = await self._export(db, select(partition).order_by(partition.c.id), month)
+                await db.execute(text(f"ALTER TABLE click_logs DETACH PARTITION {name}"))
+                await db.execute(text(f"DROP TABLE {name}"))
+                await db.commit()
+            self.dropped_partitions += 1
+            total += rows
+        return total
+
+    async def _expire_months(self, cutoff: datetime) -> int:
+        async with self.session_factory() as db:
+            oldest = await db.scalar(select(func.min(ClickLog.clicked_at)))
+            rolled_up = await get_rollup_checkpoint(db)
+        if oldest is None:
+            return 0
+
+        total = 0
+        month = month_start(oldest)
+        while next_month(month) <= cutoff:
+            in_month = (ClickLog.clicked_at >= month, ClickLog.clicked_at < next_month(month), ClickLog.id <= rolled_up)
+            async with self.session_factory() as db:
+                query = select(*(getattr(ClickLog, name) for name in _COLUMNS)).where(*in_month).order_by(ClickLog.id)
+                rows, last_id = await self._export(db, query, month)
+            total += rows
+            while rows:
+                async with self.session_factory() as db:
+                    result = await db.execute(
+                        select(ClickLog.id).where(*in_month, ClickLog.id <= last_id).limit(self.chunk_size)
+                    )
+                    chunk = list(result.scalars().all())
+                    if chunk:
+                        await db.execute(delete(ClickLog).where(ClickLog.id.in_(chunk)))
+                        await db.commit()
+                self.deleted_rows += len(chunk)
+                if len(chunk) < self.chunk_size:
+                    break
+            month = next_month(month)
+        return total
+
+    async def _export(self, db: AsyncSession, query: Select, month: datetime) -> tuple[int, int]:
+        """
+        Streams the rows of `query` (ordered by ID) into a new gzip-compressed CSV file for `month`.
+        Returns the number of rows exported and the highest ID among them.
+        """
+        exported_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = self.export_dir / f"{partition_name(month)}-{exported_at}.csv.gz"
+        partial = path.with_name(path.name + ".part")
+        await asyncio.to_thread(self.export_dir.mkdir, parents=True, exist_ok=True)
+        handle = await asyncio.to_thread(gzip.open, partial, "wt", newline="")
+        rows, last_id = 0, 0
+        try:
+            writer = csv.writer(handle)
+            writer.writerow(_COLUMNS)
+            result = await db.stream(query.execution_options(yield_per=self.chunk_size))
+            async for chunk in result.partitions():
+                await asyncio.to_thread(writer.writerows, chunk)
+                rows += len(chunk)
+                last_id = chunk[-1][0]
+        finally:
+            await asyncio.to_thread(handle.close)
+        if not rows:
+            os.remove(partial)
+            return 0, 0
+        os.replace(partial, path)
+        self.exported_rows += rows
+        self.exported_files += 1
+        logger.info(f"Exported {rows} click logs of {month:%Y-%m} to {path}.")
+        return rows, last_id
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "exported_rows": self.exported_rows,
+            "exported_files": self.exported_files,
+            "dropped_partitions": self.dropped_partitions,
+            "deleted_rows": self.deleted_rows,
+            "runs": self.runs,
+            "failures": self.failures,
+        }
+
+
+click_retention_worker = ClickRetentionWorker()
+
+# One more worker per extra shard, each enforcing the retention of the click logs stored on its shard.
+shard_click_retention_workers = {
+    shard: ClickRetentionWorker(session_factory=shard_router.session_factory(shard), shard=shard)
+    for shard in shard_router.shards
+    if shard != DEFAULT_SHARD
+}
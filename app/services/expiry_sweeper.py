@@ -0,0 +1,278 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, insert, update, delete, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import Callable, Sequence
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.models.archive import ArchivedClickLog, ArchivedUrl
+from app.models.click_log import ClickLog
+from app.models.click_rollup import (
+    BotHitDaily, ClickRollupHourly, ClickRollupDaily, ClickRollupDimension, RollupCheckpoint,
+)
+from app.models.url import Url
+from app.models.url_sketch import UrlSketch
+from app.services.redirect import invalidation_bus
+from app.services.rollup import get_rollup_checkpoint
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_SWEEP_CHECKPOINT = "expiry_sweep"
+
+_URL_COLUMNS = [
+    "id", "original_url", "short_code", "user_id", "clicks", "created_at",
+    "expired_at", "max_clicks", "one_time_use", "redirect_status",
+]
+_CLICK_LOG_COLUMNS = ["id", "url_id", "clicked_at", "referrer", "user_agent", "ip_address"]
+
+# Tables holding figures derived from the clicks and bot hits of a URL, dropped when it is archived.
+_DERIVED_TABLES = (ClickRollupHourly, ClickRollupDaily, ClickRollupDimension, UrlSketch, BotHitDaily)
+
+
+def is_dead(expired_before: datetime):
+    """
+    SQL condition matching URLs that can never redirect again: expired before `expired_before`,
+    out of clicks, or consumed one-time links.
+    """
+    return or_(
+        Url.expired_at < expired_before,
+        and_(Url.max_clicks.is_not(None), Url.clicks >= Url.max_clicks),
+        and_(Url.one_time_use.is_(True), Url.clicks >= 1),
+    )
+
+
+class ExpirySweeper:
+    """
+    Moves dead URLs and their click logs from `urls` and `click_logs` into `archived_urls` and
+    `archived_click_logs`, keeping the tables and indexes of the redirect path lean.
+
+    The sweep walks `urls` by ID in windows of `scan_size` IDs, so each scan is a bounded primary
+    key range read. Each window is claimed by moving a checkpoint with a compare-and-set before it
+    is processed, which lets a sweep resume where it stopped and keeps several workers from
+    archiving the same rows. Click logs are moved `chunk_size` rows per transaction and each URL
+    batch in one short final transaction, with a `pause` between transactions, so the sweep never
+    holds long locks and leaves room for redirect traffic. Links that expired less than
+    `grace_seconds` ago keep answering "expired" until they are swept.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            interval: float = settings.EXPIRY_SWEEP_INTERVAL_SECONDS,
+            grace_seconds: float = settings.EXPIRY_SWEEP_GRACE_SECONDS,
+            scan_size: int = settings.EXPIRY_SWEEP_SCAN_SIZE,
+            batch_size: int = settings.EXPIRY_SWEEP_BATCH_SIZE,
+            chunk_size: int = settings.EXPIRY_SWEEP_CHUNK_SIZE,
+            pause: float = settings.EXPIRY_SWEEP_PAUSE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.grace_seconds = grace_seconds
+        self.scan_size = scan_size
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.archived_urls = 0
+        self.archived_click_logs = 0
+        self.runs = 0
+        self.conflicts = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="expiry-sweep")
+        logger.info("Expiry sweeper started.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Expiry sweeper stopped.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.run_once()
+            except SQLAlchemyError as e:
+                self.failures += 1
+                logger.error(f"Database error while sweeping dead URLs: {e}")
+
+    async def _pause(self) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), self.pause)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run_once(self) -> int:
+        """
+        Sweeps from the checkpoint to the end of `urls`, then rewinds the checkpoint for the next pass.
+        Returns the number of URLs archived.
+        """
+        total = 0
+        expired_before = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+        while not self._stopping.is_set():
+            archived, finished = await self.sweep_window(expired_before)
+            total += archived
+            if finished:
+                break
+            await self._pause()
+        self.runs += 1
+        if total:
+            logger.info(f"Archived {total} dead URLs.")
+        return total
+
+    async def sweep_window(self, expired_before: datetime) -> tuple[int, bool]:
+        """
+        Claims the next window of URL IDs after the checkpoint and archives its dead URLs, at most
+        `batch_size` of them (the window shrinks to the last of them when there are more).
+        Returns the number of URLs archived and whether the end of the table was reached.
+        """
+        async with self.session_factory() as db:
+            start = await self._checkpoint(db)
+            last_id = await db.scalar(select(func.max(Url.id))) or 0
+            if start >= last_id:
+                await self._move_checkpoint(db, start, 0)
+                return 0, True
+            end = start + self.scan_size
+            result = await db.execute(
+                select(Url.id)
+                .where(Url.id > start, Url.id <= end, is_dead(expired_before))
+                .order_by(Url.id)
+                .limit(self.batch_size)
+            )
+            url_ids = list(result.scalars().all())
+            if len(url_ids) == self.batch_size:
+                end = url_ids[-1]
+            if not await self._move_checkpoint(db, start, end):
+                self.conflicts += 1
+                return 0, False
+
+        if not url_ids:
+            return 0, False
+        return await self.archive(url_ids, expired_before), False
+
+    async def archive(self, url_ids: Sequence[int], expired_before: datetime) -> int:
+        """
+        Moves the URLs among `url_ids` that are still dead to the archive tables, with their click logs.
+        Returns the number of URLs archived.
+        """
+        still_dead = select(Url.id).where(Url.id.in_(url_ids), is_dead(expired_before))
+        while True:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(ClickLog.id)
+                    .where(ClickLog.url_id.in_(still_dead))
+                    .order_by(ClickLog.id)
+                    .limit(self.chunk_size)
+                )
+                chunk = list(result.scalars().all())
+                if chunk:
+                    await self._move_click_logs(db, ClickLog.id.in_(chunk))
+                    await db.commit()
+            self.archived_click_logs += len(chunk)
+            if len(chunk) < self.chunk_size:
+                break
+            await self._pause()
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Url.id, Url.short_code)
+                .where(Url.id.in_(url_ids), is_dead(expired_before))
+                .with_for_update()
+            )
+            codes = dict(result.all())
+            if not codes:
+                return 0
+            dead_ids = list(codes)
+            # Clicks logged since the chunks above were moved go along with their URL.
+            self.archived_click_logs += await self._move_click_logs(db, ClickLog.url_id.in_(dead_ids))
+            await db.execute(
+                insert(ArchivedUrl).from_select(
+                    _URL_COLUMNS,
+                    select(*(getattr(Url, column) for column in _URL_COLUMNS)).where(Url.id.in_(dead_ids)),
+                )
+            )
+            for table in _DERIVED_TABLES:
+                await db.execute(delete(table).where(table.url_id.in_(dead_ids)))
+            await db.execute(delete(Url).where(Url.id.in_(dead_ids)))
+            await db.commit()
+
+        await invalidation_bus.publish_many(codes.values())
+        self.archived_urls += len(codes)
+        logger.debug(f"Archived URLs {dead_ids[0]}-{dead_ids[-1]} ({len(dead_ids)} URLs).")
+        return len(codes)
+
+    @staticmethod
+    async def _move_click_logs(db: AsyncSession, where) -> int:
+        await db.execute(
+            insert(ArchivedClickLog).from_select(
+                _CLICK_LOG_COLUMNS,
+                select(*(getattr(ClickLog, column) for column in _CLICK_LOG_COLUMNS)).where(where),
+            )
+        )
+        result = await db.execute(delete(ClickLog).where(where))
+        return result.rowcount
+
+    async def _checkpoint(self, db: AsyncSession) -> int:
+        last_id = await db.scalar(
+            select(RollupCheckpoint.last_id).where(RollupCheckpoint.name == EXPIRY_SWEEP_CHECKPOINT)
+        )
+        if last_id is not None:
+            return last_id
+        try:
+            await db.execute(insert(RollupCheckpoint).values(name=EXPIRY_SWEEP_CHECKPOINT, last_id=0))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+        return await get_rollup_checkpoint(db, EXPIRY_SWEEP_CHECKPOINT)
+
+    @staticmethod
+    async def _move_checkpoint(db: AsyncSession, current: int, new: int) -> bool:
+        """
+        Moves the checkpoint from `current` to `new` unless another sweeper moved it first.
+        """
+        result = await db.execute(
+            update(RollupCheckpoint)
+            .where(RollupCheckpoint.name == EXPIRY_SWEEP_CHECKPOINT, RollupCheckpoint.last_id == current)
+            .values(last_id=new)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "archived_urls": self.archived_urls,
+            "archived_click_logs": self.archived_click_logs,
+            "runs": self.runs,
+            "conflicts": self.conflicts,
+            "failures": self.failures,
+        }
+
+
+expiry_sweeper = ExpirySweeper()
+
+# One more sweeper per extra shard, each archiving the dead URLs stored on its shard.
+shard_expiry_sweepers = {
+    shard: ExpirySweeper(session_factory=shard_router.session_factory(shard))
+    for shard in shard_router.shards
+    if shard != DEFAULT_SHARD
+}
@@ -0,0 +1,223 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from io import RawIOBase, StringIO
+from typing import AsyncGenerator, AsyncIterable
+import asyncio
+import csv
+import hashlib
+import logging
+import multiprocessing
+import time
+import zipfile
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.utils import render_qr_code
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering changes, so clients holding an old ETag fetch the new image.
+QR_RENDER_VERSION = 1
+
+QR_MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+QrKey = tuple[str, int, str, str]
+
+
+@dataclass(frozen=True)
+class RenderedQrCode:
+    """
+    An encoded QR code image with its media type.
+    """
+    content: bytes
+    media_type: str
+
+
+def qr_etag(data: str, box_size: int, representation: str, error_correction: str) -> str:
+    """
+    Returns the strong ETag of a QR code response. QR codes are a pure function of their inputs,
+    so the tag is derived from them and a conditional request can be answered without rendering.
+    """
+    digest = hashlib.sha256(
+        f"{QR_RENDER_VERSION}|{data}|{box_size}|{representation}|{error_correction}".encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+class QrCodeRenderer:
+    """
+    Renders QR codes in a process pool and caches the encoded images.
+
+    Rendering is CPU-bound Python code that holds the GIL, so it runs in `max_workers` separate
+    processes (or on a thread when `max_workers` is 0) instead of on the event loop. Images are
+    cached by (data, box size, format, error correction level), and concurrent requests for an
+    image that is being rendered wait for that rendering instead of starting their own.
+    """
+
+    def __init__(self, max_workers: int, cache_size: int, cache_ttl_seconds: float):
+        self.max_workers = max_workers
+        self.cache: TTLCache[QrKey, RenderedQrCode] = TTLCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        self._executor: Executor | None = None
+        self._in_flight: dict[QrKey, asyncio.Task[RenderedQrCode]] = {}
+        self.rendered = 0
+        self.coalesced = 0
+
+    def _get_executor(self) -> Executor | None:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            # Spawned workers only import the renderer, not the forked state of the application.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def render(
+            self,
+            data: str,
+            box_size: int = 10,
+            image_format: str = "png",
+            error_correction: str = "L",
+            use_cache: bool = True,
+    ) -> RenderedQrCode:
+        """
+        Returns the QR code image for `data`, from the cache when it was rendered before.
+        With `use_cache` off the cache is neither read nor filled, for one-off bulk renders.
+        """
+        key = (data, box_size, image_format, error_correction)
+        cached = self.cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        task = asyncio.create_task(self._render(key, use_cache))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _render(self, key: QrKey, use_cache: bool) -> RenderedQrCode:
+        data, box_size, image_format, error_correction = key
+        content = await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), render_qr_code, data, box_size, image_format, error_correction
+        )
+        rendered = RenderedQrCode(content=content, media_type=QR_MEDIA_TYPES[image_format])
+        if use_cache:
+            self.cache.set(key, rendered)
+        self.rendered += 1
+        logger.info(f"QR code rendered for data: {data[:50]} ({image_format}, box size {box_size}).")
+        return rendered
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "rendered": self.rendered,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "cache": self.cache.stats(),
+        }
+
+
+class _ZipSink(RawIOBase):
+    """
+    Write-only, unseekable file object collecting what `zipfile` writes until it is drained.
+    `zipfile` falls back to data descriptors on unseekable output, so entries are never rewritten.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_qr_zip(
+        items: AsyncIterable[tuple[str, str]],
+        renderer: QrCodeRenderer,
+        box_size: int = 10,
+        image_format: str = "png",
+        error_correction: str = "L",
+        concurrency: int = 8,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Renders the QR code of every `(name, data)` item and yields a ZIP archive holding one
+    `<name>.<format>` entry per item, plus a `manifest.csv` mapping the files to their data.
+
+    Up to `concurrency` QR codes render at once on the renderer's pool, and each entry is written
+    and yielded as soon as its render finishes, so the archive starts streaming right away and
+    memory stays bounded by the renders in flight, whatever the number of items. Items that fail
+    to render are left out of the archive and listed in the manifest with their error.
+    """
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED)
+    compression = zipfile.ZIP_STORED if image_format == "png" else zipfile.ZIP_DEFLATED
+    manifest = StringIO()
+    manifest_writer = csv.writer(manifest)
+    manifest_writer.writerow(["file", "data", "error"])
+    date_time = time.gmtime()[:6]
+    pending: dict[asyncio.Task, tuple[str, str]] = {}
+
+    def write_finished(done) -> None:
+        for task in done:
+            name, data = pending.pop(task)
+            filename = f"{name}.{image_format}"
+            if task.exception() is not None:
+                logger.error(f"Failed to render QR code for '{data[:50]}' in ZIP export: {task.exception()}")
+                manifest_writer.writerow(["", data, str(task.exception())])
+                continue
+            entry = zipfile.ZipInfo(filename, date_time=date_time)
+            entry.compress_type = compression
+            archive.writestr(entry, task.result().content)
+            manifest_writer.writerow([filename, data, ""])
+
+    try:
+        async for name, data in items:
+            task = asyncio.create_task(
+                renderer.render(data, box_size, image_format, error_correction, use_cache=False)
+            )
+            pending[task] = (name, data)
+            if len(pending) >= concurrency:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                write_finished(done)
+                if chunk := sink.drain():
+                    yield chunk
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            write_finished(done)
+            if chunk := sink.drain():
+                yield chunk
+        archive.writestr(zipfile.ZipInfo("manifest.csv", date_time=date_time), manifest.getvalue())
+        archive.close()
+        yield sink.drain()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+qr_renderer = QrCodeRenderer(
+    max_workers=settings.QR_RENDER_WORKERS,
+    cache_size=settings.QR_CACHE_MAX_SIZE,
+    cache_ttl_seconds=settings.QR_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,153 @@
+from dataclasses import dataclass, replace
+from datetime import datetime
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from urllib.parse import quote
+import logging
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.url import Url
+from app.services.cache_invalidation import CacheInvalidationBus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedUrl:
+    """
+    Compact, immutable record of everything the redirect path needs to know about a short code.
+    """
+    id: int
+    original_url: str
+    expired_at: datetime | None
+    max_clicks: int | None
+    one_time_use: bool
+    redirect_status: int = 307
+    # Pre-encoded response headers of unlimited URLs, built once when the record is cached.
+    raw_headers: tuple[tuple[bytes, bytes], ...] | None = None
+
+    @property
+    def click_limit(self) -> int | None:
+        """
+        The effective maximum number of clicks, treating one-time-use links as a limit of 1.
+        """
+        if self.one_time_use:
+            return 1
+        return self.max_clicks
+
+    @property
+    def is_limited(self) -> bool:
+        return self.click_limit is not None
+
+    def is_expired(self) -> bool:
+        return self.expired_at is not None and self.expired_at < datetime.now(self.expired_at.tzinfo)
+
+
+_PERMANENT_STATUSES = frozenset({301, 308})
+
+
+def redirect_cache_control(
+        redirect_status: int,
+        expired_at: datetime | None,
+        limited: bool,
+) -> str:
+    """
+    Cache-Control value of a redirect. Click-limited links are never cached, so every click is
+    counted against the limit. Others may be cached for the configured permanent or temporary
+    max-age, cut short so no cache outlives the link's expiry, even when the header was built up to
+    one resolution cache TTL ago.
+    """
+    if limited:
+        return "no-store"
+    if redirect_status in _PERMANENT_STATUSES:
+        max_age = settings.REDIRECT_PERMANENT_MAX_AGE_SECONDS
+    else:
+        max_age = settings.REDIRECT_TEMPORARY_MAX_AGE_SECONDS
+    if expired_at is not None:
+        remaining = (expired_at - datetime.now(expired_at.tzinfo)).total_seconds()
+        max_age = min(max_age, int(remaining) - settings.REDIRECT_CACHE_TTL_SECONDS)
+    return f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+
+
+def redirect_headers(location: str, cache_control: str) -> tuple[tuple[bytes, bytes], ...]:
+    """
+    Encodes the headers of a bodiless redirect, quoting the location like `RedirectResponse` does.
+    """
+    return (
+        (b"location", quote(location, safe=":/%#?=@[]!$&'()*+,;").encode("latin-1")),
+        (b"cache-control", cache_control.encode("latin-1")),
+        (b"content-length", b"0"),
+    )
+
+
+class PrebuiltRedirectResponse(Response):
+    """
+    Redirect response sent from already encoded headers, skipping header rendering on the hot path.
+    """
+
+    def __init__(self, status_code: int, raw_headers: tuple[tuple[bytes, bytes], ...]):
+        self.status_code = status_code
+        self.body = b""
+        self.background = None
+        self.raw_headers = list(raw_headers)
+
+
+resolution_cache: TTLCache[str, ResolvedUrl] = TTLCache(
+    max_size=settings.REDIRECT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.REDIRECT_CACHE_TTL_SECONDS,
+)
+
+invalidation_bus = CacheInvalidationBus(
+    on_invalidate=resolution_cache.invalidate,
+    on_reset=resolution_cache.clear,
+)
+
+
+async def resolve_short_code(db: AsyncSession, code: str) -> ResolvedUrl | None:
+    """
+    Resolves a short code to its redirect record, serving hot codes from the in-process cache.
+    Only the columns needed for the redirect are selected, so the joined user load is skipped.
+    Records of unlimited URLs carry their encoded response headers.
+    """
+    resolved = resolution_cache.get(code)
+    if resolved is not None:
+        return resolved
+
+    result = await db.execute(
+        select(
+            Url.id,
+            Url.original_url,
+            Url.expired_at,
+            Url.max_clicks,
+            Url.one_time_use,
+            Url.redirect_status,
+        ).where(Url.short_code == code)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    resolved = ResolvedUrl(
+        id=row.id,
+        original_url=row.original_url,
+        expired_at=row.expired_at,
+        max_clicks=row.max_clicks,
+        one_time_use=row.one_time_use,
+        redirect_status=row.redirect_status,
+    )
+    if not resolved.is_limited:
+        cache_control = redirect_cache_control(resolved.redirect_status, resolved.expired_at, limited=False)
+        resolved = replace(resolved, raw_headers=redirect_headers(resolved.original_url, cache_control))
+    resolution_cache.set(code, resolved)
+    logger.debug(f"Cached resolution for short code '{code}'.")
+    return resolved
+
+
+async def invalidate_short_code(code: str) -> None:
+    """
+    Drops a short code from the resolution cache of every worker after its URL was changed or removed.
+    """
+    await invalidation_bus.publish(code)
+    logger.debug(f"Invalidated cached resolution for short code '{code}'.")
@@ -0,0 +1,100 @@
+from typing import Callable
+import logging
+import time
+
+from app.core.config import settings
+from app.core.count_min import CountMinSketch
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_ACTIONS = ("skip_log", "reject")
+
+
+class RedirectThrottle:
+    """
+    Detects short codes and client IPs redirecting more than `code_limit` and `ip_limit` times
+    within `window_seconds`, in constant memory.
+
+    Hits are counted in two count-min sketches, one for the current fixed window and one for the
+    previous window, whose estimate is weighted by the part of it the sliding window still covers.
+    Sketches overcount slightly and never undercount, so heavy hitters are never missed, while a
+    code or IP stays far below its limit unless its own traffic brings it there. Every hit is
+    counted, throttled or not, so a sustained flood stays throttled.
+
+    The redirect path decides what a throttled hit gets: with the "skip_log" action unlimited URLs
+    still redirect but their click is neither counted nor logged, with "reject" they are answered
+    429. Click-limited URLs are always rejected, since redirecting them consumes a click.
+    """
+
+    def __init__(
+            self,
+            enabled: bool = settings.REDIRECT_THROTTLE_ENABLED,
+            action: str = settings.REDIRECT_THROTTLE_ACTION,
+            window_seconds: int = settings.REDIRECT_THROTTLE_WINDOW_SECONDS,
+            code_limit: int = settings.REDIRECT_THROTTLE_CODE_LIMIT,
+            ip_limit: int = settings.REDIRECT_THROTTLE_IP_LIMIT,
+            width: int = settings.REDIRECT_THROTTLE_SKETCH_WIDTH,
+            depth: int = settings.REDIRECT_THROTTLE_SKETCH_DEPTH,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        if action not in THROTTLE_ACTIONS:
+            raise ValueError(f"Unknown redirect throttle action '{action}', expected one of {THROTTLE_ACTIONS}.")
+        self.enabled = enabled
+        self.action = action
+        self.window_seconds = window_seconds
+        self.code_limit = code_limit
+        self.ip_limit = ip_limit
+        self._clock = clock
+        self._current = CountMinSketch(width, depth)
+        self._previous = CountMinSketch(width, depth)
+        self._bucket = int(clock() // window_seconds)
+        self.hits = 0
+        self.throttled = 0
+
+    @property
+    def rejects(self) -> bool:
+        return self.action == "reject"
+
+    def _roll(self, bucket: int) -> None:
+        if bucket == self._bucket:
+            return
+        if bucket == self._bucket + 1:
+            self._current, self._previous = self._previous, self._current
+        else:
+            self._previous.clear()
+        self._current.clear()
+        self._bucket = bucket
+
+    def hit(self, code: str, ip: str | None) -> bool:
+        """
+        Counts a redirect of `code` by `ip`. Returns whether either is over its limit.
+        """
+        if not self.enabled:
+            return False
+        now = self._clock() / self.window_seconds
+        bucket = int(now)
+        self._roll(bucket)
+        overlap = 1 - (now - bucket)
+
+        key = f"code:{code}"
+        over = self._current.add(key) + self._previous.estimate(key) * overlap > self.code_limit
+        if ip is not None:
+            key = f"ip:{ip}"
+            over = self._current.add(key) + self._previous.estimate(key) * overlap > self.ip_limit or over
+        self.hits += 1
+        if over:
+            self.throttled += 1
+            logger.debug(f"Redirect of '{code}' by {ip} throttled.")
+        return over
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "action": self.action,
+            "hits": self.hits,
+            "throttled": self.throttled,
+            "memory_bytes": self._current.memory_bytes + self._previous.memory_bytes,
+        }
+
+
+redirect_throttle = RedirectThrottle()
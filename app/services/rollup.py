@@ -0,0 +1,254 @@
+from sqlalchemy import select, update, insert, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import Callable
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal, shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.database.sql import time_bucket, as_utc, additive_upsert
+from app.models.click_log import ClickLog
+from app.models.click_rollup import ClickRollupHourly, ClickRollupDaily, ClickRollupDimension, RollupCheckpoint
+from app.services.unique_visitors import sketches_by_key, load_sketch
+
+logger = logging.getLogger(__name__)
+
+CLICK_ROLLUP_CHECKPOINT = "click_rollups"
+
+# Click log columns broken down in `click_rollup_dimensions`.
+ROLLUP_DIMENSIONS = {
+    "referrer": ClickLog.referrer,
+    "user_agent": ClickLog.user_agent,
+}
+
+_DIMENSION_VALUE_LENGTH = ClickRollupDimension.__table__.c.value.type.length
+
+
+def dimension_value(column):
+    """
+    SQL expression for the value a click log column is rolled up under: NULLs become an empty string
+    and long values are truncated to the width of `click_rollup_dimensions.value`.
+    """
+    return func.substr(func.coalesce(column, ""), 1, _DIMENSION_VALUE_LENGTH)
+
+
+async def get_rollup_checkpoint(db: AsyncSession, name: str = CLICK_ROLLUP_CHECKPOINT) -> int:
+    """
+    Returns the ID of the last click log included in the rollups (0 if nothing was rolled up yet).
+    """
+    return await db.scalar(select(RollupCheckpoint.last_id).where(RollupCheckpoint.name == name)) or 0
+
+
+class ClickRollupWorker:
+    """
+    Incrementally folds new click logs into the hourly, daily and dimension rollup tables.
+    Hourly and daily rows also carry a HyperLogLog sketch of their visitors, merged with each increment.
+
+    Progress is tracked by a high-water mark on `ClickLog.id`. Each run only rolls up to the highest
+    ID seen on the previous run, so rows of transactions that were still in flight back then (and
+    might have received lower IDs than already visible rows) have had a full interval to commit.
+    The rollup increments and the checkpoint move are committed together, and the checkpoint is
+    advanced with a compare-and-set, so several workers running the job never count a row twice.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            interval: float = settings.CLICK_ROLLUP_INTERVAL_SECONDS,
+            batch_size: int = settings.CLICK_ROLLUP_BATCH_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._observed_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.rolled_rows = 0
+        self.runs = 0
+        self.conflicts = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="click-rollup")
+        logger.info("Click rollup worker started.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Click rollup worker stopped.")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.run_once()
+            except SQLAlchemyError as e:
+                self.failures += 1
+                logger.error(f"Database error while rolling up click logs: {e}")
+
+    async def run_once(self) -> int:
+        """
+        Rolls up every click log that was already visible on the previous run.
+        Returns the number of click logs rolled up.
+        """
+        async with self.session_factory() as db:
+            current = await db.scalar(select(func.max(ClickLog.id))) or 0
+        settled, self._observed_id = self._observed_id, current
+        if settled is None:
+            return 0
+        return await self.roll_up(settled)
+
+    async def roll_up(self, up_to_id: int) -> int:
+        """
+        Rolls up all click logs with an ID up to `up_to_id`, `batch_size` rows per transaction.
+        Returns the number of click logs rolled up.
+        """
+        total = 0
+        while True:
+            async with self.session_factory() as db:
+                last_id = await self._checkpoint(db)
+                if last_id >= up_to_id:
+                    break
+                upper = min(up_to_id, last_id + self.batch_size)
+                rows = await self._roll_range(db, last_id, upper)
+                advanced = await db.execute(
+                    update(RollupCheckpoint)
+                    .where(RollupCheckpoint.name == CLICK_ROLLUP_CHECKPOINT, RollupCheckpoint.last_id == last_id)
+                    .values(last_id=upper)
+                )
+                if advanced.rowcount != 1:
+                    # Another worker rolled up this range concurrently; discard our increments.
+                    await db.rollback()
+                    self.conflicts += 1
+                    continue
+                await db.commit()
+            total += rows
+        self.rolled_rows += total
+        self.runs += 1
+        if total:
+            logger.info(f"Rolled up {total} click logs up to ID {up_to_id}.")
+        return total
+
+    async def _checkpoint(self, db: AsyncSession) -> int:
+        last_id = await db.scalar(
+            select(RollupCheckpoint.last_id).where(RollupCheckpoint.name == CLICK_ROLLUP_CHECKPOINT)
+        )
+        if last_id is not None:
+            return last_id
+        try:
+            await db.execute(insert(RollupCheckpoint).values(name=CLICK_ROLLUP_CHECKPOINT, last_id=0))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+        return await get_rollup_checkpoint(db)
+
+    async def _roll_range(self, db: AsyncSession, after_id: int, up_to_id: int) -> int:
+        """
+        Adds the click logs with `after_id < id <= up_to_id` to the rollup tables.
+        Returns the number of click logs in the range.
+        """
+        dialect = db.get_bind().dialect.name
+        in_range = (ClickLog.id > after_id, ClickLog.id <= up_to_id)
+        hour = time_bucket(dialect, "hour", ClickLog.clicked_at).label("bucket_start")
+        day = time_bucket(dialect, "day", ClickLog.clicked_at).label("bucket_start")
+
+        rows = 0
+        for table, bucket_start in ((ClickRollupHourly, hour), (ClickRollupDaily, day)):
+            result = await db.execute(
+                select(ClickLog.url_id, bucket_start, func.count())
+                .where(*in_range)
+                .group_by(ClickLog.url_id, bucket_start)
+            )
+            clicks = {(url_id, as_utc(start)): count for url_id, start, count in result}
+            if not clicks:
+                return 0
+            if table is ClickRollupHourly:
+                rows = sum(clicks.values())
+
+            result = await db.execute(
+                select(ClickLog.url_id, bucket_start, ClickLog.ip_address).where(*in_range).distinct()
+            )
+            sketches = sketches_by_key((url_id, as_utc(start), ip) for url_id, start, ip in result)
+            existing = await db.execute(
+                select(table.url_id, table.bucket_start, table.visitors_sketch)
+                .where(tuple_(table.url_id, table.bucket_start).in_(list(clicks)))
+            )
+            for url_id, start, data in existing:
+                if data:
+                    sketches[(url_id, as_utc(start))].merge(load_sketch(data))
+
+            increments = []
+            for key, count in clicks.items():
+                sketch = sketches[key]
+                increments.append({
+                    "url_id": key[0],
+                    "bucket_start": key[1],
+                    "clicks": count,
+                    "unique_visitors": sketch.count(),
+                    "visitors_sketch": sketch.to_bytes(),
+                })
+            await db.execute(
+                additive_upsert(
+                    dialect,
+                    table.__table__,
+                    ["url_id", "bucket_start"],
+                    ["clicks"],
+                    ["unique_visitors", "visitors_sketch"],
+                ),
+                increments,
+            )
+
+        for dimension, column in ROLLUP_DIMENSIONS.items():
+            value = dimension_value(column).label("value")
+            result = await db.execute(
+                select(ClickLog.url_id, hour, value, func.count())
+                .where(*in_range)
+                .group_by(ClickLog.url_id, hour, value)
+            )
+            await db.execute(
+                additive_upsert(
+                    dialect,
+                    ClickRollupDimension.__table__,
+                    ["url_id", "bucket_start", "dimension", "value"],
+                    ["clicks"],
+                ),
+                [
+                    {"url_id": url_id, "bucket_start": as_utc(start), "dimension": dimension, "value": v, "clicks": c}
+                    for url_id, start, v, c in result
+                ],
+            )
+        return rows
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "rolled_rows": self.rolled_rows,
+            "runs": self.runs,
+            "conflicts": self.conflicts,
+            "failures": self.failures,
+        }
+
+
+click_rollup_worker = ClickRollupWorker()
+
+# One more worker per extra shard, each rolling up the click logs stored on its shard.
+shard_rollup_workers = {
+    shard: ClickRollupWorker(session_factory=shard_router.session_factory(shard))
+    for shard in shard_router.shards
+    if shard != DEFAULT_SHARD
+}
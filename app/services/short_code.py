@@ -0,0 +1,220 @@
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+import asyncio
+import logging
+
+from app.core.config import Settings, settings
+from app.models.short_code_sequence import ShortCodeSequence
+from app.models.url import Url
+from app.utils import generate_short_code, encode_base62, decode_base62
+
+logger = logging.getLogger(__name__)
+
+
+class ShortCodeAllocator(ABC):
+    """
+    Strategy for picking the short code of a newly created URL.
+    """
+
+    @abstractmethod
+    async def allocate(self, db: AsyncSession) -> str:
+        """
+        Returns a short code that is not in use by any other generated code.
+        """
+
+    async def allocate_many(self, db: AsyncSession, count: int) -> list[str]:
+        """
+        Returns `count` distinct short codes.
+        """
+        return [await self.allocate(db) for _ in range(count)]
+
+
+class RandomShortCodeAllocator(ShortCodeAllocator):
+    """
+    Draws random codes and checks each one against the database until an unused one is found.
+    """
+
+    def __init__(self, length: int = settings.SHORT_CODE_LENGTH):
+        self.length = length
+
+    async def allocate(self, db: AsyncSession) -> str:
+        while True:
+            short_code = generate_short_code(self.length)
+            result = await db.execute(select(Url.id).where(Url.short_code == short_code))
+            if result.scalar_one_or_none() is None:
+                return short_code
+
+    async def allocate_many(self, db: AsyncSession, count: int) -> list[str]:
+        """
+        Draws all codes at once and checks them with a single `IN (...)` query per round,
+        redrawing only the ones that are taken.
+        """
+        codes: set[str] = set()
+        while len(codes) < count:
+            candidates = {generate_short_code(self.length) for _ in range(count - len(codes))} - codes
+            result = await db.execute(select(Url.short_code).where(Url.short_code.in_(candidates)))
+            codes |= candidates - set(result.scalars().all())
+        return list(codes)
+
+
+class SequenceShortCodeAllocator(ShortCodeAllocator):
+    """
+    Encodes values of a database-backed counter in base62, so codes never collide and no
+    existence check is needed.
+
+    Each worker reserves a block of `block_size` values with a single atomic UPDATE and then hands
+    them out from memory. With `scramble` enabled, values are first passed through a keyed Feistel
+    permutation of `[0, 62**length)`, so codes can't be enumerated or mapped back to creation order
+    without the key.
+    """
+
+    ROUNDS = 4
+
+    def __init__(
+            self,
+            length: int = settings.SHORT_CODE_LENGTH,
+            block_size: int = settings.SHORT_CODE_BLOCK_SIZE,
+            scramble: bool = settings.SHORT_CODE_SCRAMBLE,
+            key: str | None = None,
+            sequence_name: str = "short_code",
+    ):
+        self.length = length
+        self.capacity = 62 ** length
+        if block_size <= 0:
+            raise ValueError("Short code block size must be a positive integer.")
+        self.block_size = block_size
+        self.scramble = scramble
+        if scramble:
+            key = key if key is not None else settings.SHORT_CODE_SCRAMBLE_KEY or settings.SECRET_KEY
+            if not key or key == Settings.model_fields["SECRET_KEY"].default:
+                raise ValueError(
+                    "Scrambled short codes need a secret key; set SECRET_KEY or SHORT_CODE_SCRAMBLE_KEY."
+                )
+            self._key = blake2b(key.encode(), digest_size=32, person=b"short-code").digest()
+        # The Feistel network permutes 2 * half_bits bits; values outside the code space are
+        # cycled through the network again until they land inside it.
+        self._half_bits = ((self.capacity - 1).bit_length() + 1) // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        self.sequence_name = sequence_name
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+        self.blocks_reserved = 0
+
+    def _round(self, index: int, half: int) -> int:
+        digest = blake2b(
+            index.to_bytes(1, "big") + half.to_bytes(8, "big"), key=self._key, digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big") & self._half_mask
+
+    def _permute(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._half_mask
+        for index in range(self.ROUNDS):
+            left, right = right, left ^ self._round(index, right)
+        return (left << self._half_bits) | right
+
+    def _unpermute(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._half_mask
+        for index in reversed(range(self.ROUNDS)):
+            left, right = right ^ self._round(index, left), left
+        return (left << self._half_bits) | right
+
+    def encode(self, value: int) -> str:
+        """
+        Maps a counter value to its short code.
+        """
+        if not 0 <= value < self.capacity:
+            raise ValueError(f"Short code space of length {self.length} is exhausted.")
+        if self.scramble:
+            value = self._permute(value)
+            while value >= self.capacity:
+                value = self._permute(value)
+        return encode_base62(value, self.length)
+
+    def decode(self, short_code: str) -> int:
+        """
+        Maps a generated short code back to the counter value it was allocated from.
+        """
+        value = decode_base62(short_code)
+        if self.scramble:
+            value = self._unpermute(value)
+            while value >= self.capacity:
+                value = self._unpermute(value)
+        return value
+
+    async def _reserve_block(self, db: AsyncSession) -> None:
+        """
+        Atomically advances the persistent counter by one block and commits, so the block stays
+        reserved even if the caller's transaction is rolled back later.
+        """
+        sequences = ShortCodeSequence.__table__
+        advance = (
+            update(sequences)
+            .where(sequences.c.name == self.sequence_name)
+            .values(next_value=sequences.c.next_value + self.block_size)
+        )
+        while True:
+            if db.get_bind().dialect.update_returning:
+                result = await db.execute(advance.returning(sequences.c.next_value))
+                end = result.scalar_one_or_none()
+            else:
+                # Without RETURNING, read the counter back inside the same transaction; the UPDATE
+                # holds the row lock until the commit, so no other worker can advance it in between.
+                result = await db.execute(advance)
+                end = None
+                if result.rowcount == 1:
+                    end = await db.scalar(
+                        select(sequences.c.next_value).where(sequences.c.name == self.sequence_name)
+                    )
+            if end is not None:
+                await db.commit()
+                break
+            try:
+                await db.execute(
+                    insert(sequences).values(name=self.sequence_name, next_value=self.block_size)
+                )
+                await db.commit()
+                end = self.block_size
+                break
+            except IntegrityError:
+                # Another worker created the counter concurrently; reserve from it instead.
+                await db.rollback()
+
+        self._next, self._end = end - self.block_size, end
+        self.blocks_reserved += 1
+        logger.info(f"Reserved short code block [{self._next}, {self._end}).")
+
+    async def allocate(self, db: AsyncSession) -> str:
+        return (await self.allocate_many(db, 1))[0]
+
+    async def allocate_many(self, db: AsyncSession, count: int) -> list[str]:
+        """
+        Hands out `count` codes, reserving new blocks whenever the current one runs out.
+        Reserving a block commits `db`, so call this before staging other changes on it.
+        """
+        codes = []
+        async with self._lock:
+            while len(codes) < count:
+                if self._next >= self._end:
+                    await self._reserve_block(db)
+                take = min(count - len(codes), self._end - self._next)
+                codes.extend(self.encode(value) for value in range(self._next, self._next + take))
+                self._next += take
+        return codes
+
+
+def build_short_code_allocator(strategy: str = settings.SHORT_CODE_STRATEGY) -> ShortCodeAllocator:
+    """
+    Creates the allocator configured by `SHORT_CODE_STRATEGY`.
+    """
+    if strategy == "random":
+        return RandomShortCodeAllocator()
+    if strategy == "sequence":
+        return SequenceShortCodeAllocator()
+    raise ValueError(f"Unknown short code strategy: {strategy}")
+
+
+short_code_allocator = build_short_code_allocator()
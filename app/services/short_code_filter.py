@@ -0,0 +1,174 @@
+from sqlalchemy import select, func
+from typing import Iterable
+import asyncio
+import logging
+import time
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.database.session import shard_router
+from app.models.url import Url
+from app.services.cache_invalidation import CacheInvalidationBus
+
+logger = logging.getLogger(__name__)
+
+
+class ShortCodeFilter:
+    """
+    Bloom filter of every existing short code, so the redirect route can answer unknown codes
+    (scanners probing `/wp-admin`, `/favicon.ico`, random guesses) with a 404 without a query.
+
+    The filter is built in the background by streaming the codes of every shard, and rebuilt every
+    `rebuild_interval` seconds, sized for at least `capacity` codes and twice the current count.
+    New codes are added as they are created, here and, through the broadcast bus, in every other
+    worker. Deleted codes stay in the filter until the next rebuild, which only costs a query.
+    Until the first build completes, and while a broadcast gap forces a rebuild, every code is let through.
+    """
+
+    def __init__(
+            self,
+            capacity: int = settings.SHORT_CODE_FILTER_CAPACITY,
+            error_rate: float = settings.SHORT_CODE_FILTER_ERROR_RATE,
+            rebuild_interval: float = settings.SHORT_CODE_FILTER_REBUILD_SECONDS,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self._filter: BloomFilter | None = None
+        self._added_during_build: list[str] | None = None
+        self._rebuild_requested = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.rejected = 0
+        self.passed = 0
+        self.rebuilds = 0
+        self.failures = 0
+        self.last_build_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_exist(self, short_code: str) -> bool:
+        """
+        Returns False only for codes that certainly do not exist.
+        """
+        if self._filter is None or short_code in self._filter:
+            self.passed += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def add(self, short_code: str) -> None:
+        if self._filter is not None:
+            self._filter.add(short_code)
+        if self._added_during_build is not None:
+            self._added_during_build.append(short_code)
+
+    def reset(self) -> None:
+        """
+        Stops rejecting codes and schedules a rebuild, after broadcasts may have been missed.
+        """
+        self._filter = None
+        self._rebuild_requested.set()
+
+    async def rebuild(self) -> None:
+        """
+        Builds a fresh filter from the codes of every shard, streamed in batches, and swaps it in.
+        Codes added while the build runs are carried over into the new filter.
+        """
+        started = time.perf_counter()
+        self._added_during_build = []
+        try:
+            total = 0
+            for factory in shard_router.shards.values():
+                async with factory() as db:
+                    total += await db.scalar(select(func.count()).select_from(Url))
+            bloom = BloomFilter(max(self.capacity, 2 * total), self.error_rate)
+            for factory in shard_router.shards.values():
+                async with factory() as db:
+                    result = await db.stream(
+                        select(Url.short_code).execution_options(yield_per=settings.URL_EXPORT_BATCH_SIZE)
+                    )
+                    async for partition in result.partitions():
+                        for (short_code,) in partition:
+                            bloom.add(short_code)
+            for short_code in self._added_during_build:
+                bloom.add(short_code)
+            self._filter = bloom
+        finally:
+            self._added_during_build = None
+        self.rebuilds += 1
+        self.last_build_seconds = time.perf_counter() - started
+        logger.info(
+            f"Short code filter rebuilt with {bloom.count} codes "
+            f"({bloom.memory_bytes} bytes) in {self.last_build_seconds:.2f}s."
+        )
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="short-code-filter")
+        logger.info("Short code filter started.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Short code filter stopped.")
+
+    async def _run(self) -> None:
+        while True:
+            self._rebuild_requested.clear()
+            try:
+                await self.rebuild()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to rebuild the short code filter: {e}")
+            try:
+                await asyncio.wait_for(self._rebuild_requested.wait(), self.rebuild_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        stats = {
+            "running": self.running,
+            "ready": self.ready,
+            "passed": self.passed,
+            "rejected": self.rejected,
+            "rebuilds": self.rebuilds,
+            "failures": self.failures,
+            "last_build_seconds": round(self.last_build_seconds, 3),
+        }
+        if self._filter is not None:
+            stats.update({
+                "codes": self._filter.count,
+                "capacity": self._filter.capacity,
+                "memory_bytes": self._filter.memory_bytes,
+                "false_positive_rate": round(self._filter.false_positive_rate(), 6),
+            })
+        return stats
+
+
+short_code_filter = ShortCodeFilter()
+
+short_code_bus = CacheInvalidationBus(
+    on_invalidate=short_code_filter.add,
+    on_reset=short_code_filter.reset,
+    channel=settings.SHORT_CODE_FILTER_CHANNEL,
+)
+
+
+async def announce_short_codes(short_codes: Iterable[str]) -> None:
+    """
+    Adds newly created short codes to the filter of every worker.
+    """
+    await short_code_bus.publish_many(short_codes)
@@ -0,0 +1,63 @@
+from collections import defaultdict
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from app.core.config import settings
+from app.core.hll import HyperLogLog
+from app.database.sql import additive_upsert
+from app.models.url_sketch import UrlSketch
+
+logger = logging.getLogger(__name__)
+
+
+def new_sketch() -> HyperLogLog:
+    return HyperLogLog(settings.HLL_PRECISION)
+
+
+def load_sketch(data: bytes | None) -> HyperLogLog:
+    """
+    Deserializes a stored sketch, returning an empty one for NULL.
+    """
+    return HyperLogLog.from_bytes(data) if data else new_sketch()
+
+
+def sketches_by_key(rows: Iterable[tuple]) -> defaultdict:
+    """
+    Builds one sketch per key from `(*key, ip_address)` rows, skipping rows without an address.
+    """
+    sketches: defaultdict[tuple, HyperLogLog] = defaultdict(new_sketch)
+    for *key, ip_address in rows:
+        if ip_address:
+            sketches[tuple(key)].add(ip_address)
+    return sketches
+
+
+async def record_url_visitors(db: AsyncSession, visits: Iterable[tuple[int, str | None]]) -> None:
+    """
+    Adds `(url_id, ip_address)` visits to the per-URL visitor sketches, within the caller's transaction.
+    Existing sketches are read with a row lock where the database supports it, merged in memory and
+    written back in a single upsert.
+    """
+    sketches = sketches_by_key(visits)
+    if not sketches:
+        return
+    url_ids = [url_id for url_id, in sketches]
+    result = await db.execute(
+        select(UrlSketch.url_id, UrlSketch.visitors).where(UrlSketch.url_id.in_(url_ids)).with_for_update()
+    )
+    for url_id, data in result:
+        sketches[(url_id,)].merge(load_sketch(data))
+
+    await db.execute(
+        additive_upsert(db.get_bind().dialect.name, UrlSketch.__table__, ["url_id"], [], ["visitors"]),
+        [{"url_id": url_id, "visitors": sketch.to_bytes()} for (url_id,), sketch in sketches.items()],
+    )
+
+
+async def get_url_visitors(db: AsyncSession, url_id: int) -> HyperLogLog:
+    """
+    Returns the visitor sketch of a URL over its whole lifetime.
+    """
+    return load_sketch(await db.scalar(select(UrlSketch.visitors).where(UrlSketch.url_id == url_id)))
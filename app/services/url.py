@@ -1,14 +1,21 @@
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, insert, and_, or_, not_
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy.orm import selectinload
-from typing import List
+from sqlalchemy.orm import noload
+from typing import AsyncGenerator, List, Sequence
+import heapq
 import logging
 
+from app.database.session import shard_router
+from app.database.sharding import DEFAULT_SHARD
 from app.models.url import Url
-from app.models.click_log import ClickLog
-from app.schemas.url import UrlCreate, UrlUpdate
-from app.utils import generate_short_code
+from app.schemas.url import UrlCreate, UrlUpdate, UrlOut, UrlBulkItemResult, UrlStatus
+from app.services.click_ingestion import ClickEvent, click_ingestor
+from app.services.redirect import invalidate_short_code
+from app.services.short_code import short_code_allocator
+from app.services.short_code_filter import announce_short_codes
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -21,66 +28,357 @@ async def create_short_url(
     """
     Creates a new shortened URL in the database.
     Supports custom short codes, expiration dates, max clicks limit, and one-time use.
+    Generated codes come from the configured short code allocator; if one clashes with an
+    existing custom code, the next code is tried. The URL is stored on the shard its code hashes to.
     """
-    short_code = url_create.custom_short_code
-    if short_code:
+    custom_short_code = url_create.custom_short_code
+    if custom_short_code:
         # Check if custom short code is already in use
-        existing_url = await db.execute(select(Url).where(Url.short_code == short_code))
-        if existing_url.scalar_one_or_none():
-            logger.warning(f"Attempt to create URL with existing custom short code: {short_code}")
-            raise ValueError(f"Custom short code '{short_code}' is already in use.")
-        logger.info(f"Using custom short code: {short_code}")
-    else:
-        short_code = await _generate_unique_short_code(db)
-        logger.info(f"Generated random short code: {short_code}")
-
-    new_url = Url(
-        original_url=str(url_create.original_url),
-        short_code=short_code,
-        user_id=user_id,
-        expired_at=url_create.expired_at,
-        max_clicks=url_create.max_clicks,
-        one_time_use=url_create.one_time_use,
+        async with shard_router.session(shard_router.shard_for(custom_short_code), db) as shard_db:
+            existing_url = await shard_db.execute(select(Url.id).where(Url.short_code == custom_short_code))
+            if existing_url.scalar_one_or_none():
+                logger.warning(f"Attempt to create URL with existing custom short code: {custom_short_code}")
+                raise ValueError(f"Custom short code '{custom_short_code}' is already in use.")
+        logger.info(f"Using custom short code: {custom_short_code}")
+
+    attempts = 1 if custom_short_code else settings.SHORT_CODE_MAX_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        short_code = custom_short_code or await short_code_allocator.allocate(db)
+        new_url = Url(
+            original_url=str(url_create.original_url),
+            short_code=short_code,
+            user_id=user_id,
+            expired_at=url_create.expired_at,
+            max_clicks=url_create.max_clicks,
+            one_time_use=url_create.one_time_use,
+            redirect_status=url_create.redirect_status.value,
+        )
+
+        async with shard_router.session(shard_router.shard_for(short_code), db) as shard_db:
+            try:
+                shard_db.add(new_url)
+                await shard_db.commit()
+                await shard_db.refresh(new_url)
+                await announce_short_codes([new_url.short_code])
+                logger.info(f"URL created successfully: ID {new_url.id}, Short Code: {new_url.short_code}")
+                return new_url
+            except IntegrityError as e:
+                await shard_db.rollback()
+                if attempt < attempts:
+                    logger.warning(f"Generated short code '{short_code}' is already taken, retrying.")
+                    continue
+                logger.error(f"Integrity error during URL creation for {url_create.original_url}: {e}")
+                raise ValueError("Failed to create URL, possibly due to a unique constraint violation.") from e
+            except SQLAlchemyError as e:
+                await shard_db.rollback()
+                logger.error(f"Database error during URL creation for {url_create.original_url}: {e}")
+                raise SQLAlchemyError(f"A database error occurred during URL creation.") from e
+            except Exception as e:
+                await shard_db.rollback()
+                logger.critical(f"Unexpected error during URL creation for {url_create.original_url}: {e}", exc_info=True)
+                raise Exception(f"An unexpected error occurred during URL creation.") from e
+
+
+_URL_OUT_COLUMNS = (
+    Url.id,
+    Url.original_url,
+    Url.short_code,
+    Url.clicks,
+    Url.created_at,
+    Url.expired_at,
+    Url.max_clicks,
+    Url.one_time_use,
+    Url.redirect_status,
+)
+
+
+async def create_short_urls_bulk(
+        db: AsyncSession,
+        user_id: int | None,
+        items: List[UrlCreate],
+) -> List[UrlBulkItemResult]:
+    """
+    Creates many shortened URLs at once and reports the outcome of each item.
+    Custom codes are checked with one `IN (...)` query per chunk, generated codes are allocated in
+    one pass, and every chunk is written with a single multi-row INSERT. A failing item is reported
+    in its result without aborting the rest of the batch.
+    """
+    results: List[UrlBulkItemResult] = []
+    chunk_size = settings.BULK_CREATE_CHUNK_SIZE
+    for chunk_start in range(0, len(items), chunk_size):
+        chunk = list(enumerate(items[chunk_start:chunk_start + chunk_size], start=chunk_start))
+        results.extend(await _create_bulk_chunk(db, user_id, chunk))
+    logger.info(
+        f"Bulk creation for user {user_id}: "
+        f"{sum(result.error is None for result in results)}/{len(results)} URLs created."
     )
+    return results
+
+
+async def _create_bulk_chunk(
+        db: AsyncSession,
+        user_id: int | None,
+        chunk: List[tuple[int, UrlCreate]],
+) -> List[UrlBulkItemResult]:
+    errors: dict[int, str] = {}
+
+    custom_codes = [item.custom_short_code for _, item in chunk if item.custom_short_code]
+    taken: set[str] = set()
+    for shard, codes in _group_by_shard(custom_codes, lambda code: code).items():
+        async with shard_router.session(shard, db) as shard_db:
+            result = await shard_db.execute(select(Url.short_code).where(Url.short_code.in_(codes)))
+            taken.update(result.scalars().all())
+
+    seen: set[str] = set()
+    generated_indexes: list[int] = []
+    for index, item in chunk:
+        code = item.custom_short_code
+        if code is None:
+            generated_indexes.append(index)
+        elif code in taken or code in seen:
+            errors[index] = f"Custom short code '{code}' is already in use."
+        else:
+            seen.add(code)
+
+    generated = await _allocate_bulk_codes(db, len(generated_indexes), reserved=seen)
+    if generated is None:
+        errors.update({index: "Failed to allocate a short code." for index in generated_indexes})
+        generated = []
+    generated_codes = dict(zip(generated_indexes, generated))
+
+    rows: dict[int, dict] = {}
+    for index, item in chunk:
+        if index in errors:
+            continue
+        rows[index] = {
+            "original_url": str(item.original_url),
+            "short_code": item.custom_short_code or generated_codes[index],
+            "user_id": user_id,
+            "expired_at": item.expired_at,
+            "max_clicks": item.max_clicks,
+            "one_time_use": item.one_time_use,
+            "redirect_status": item.redirect_status.value,
+        }
+
+    created: dict[int, UrlOut] = {}
+    for shard, shard_items in _group_by_shard(rows.items(), lambda item: item[1]["short_code"]).items():
+        shard_rows = dict(shard_items)
+        async with shard_router.session(shard, db) as shard_db:
+            try:
+                result = await shard_db.execute(
+                    insert(Url).values(list(shard_rows.values())).returning(*_URL_OUT_COLUMNS)
+                )
+                by_code = {row.short_code: UrlOut.model_validate(row) for row in result}
+                await shard_db.commit()
+                created.update({index: by_code[row["short_code"]] for index, row in shard_rows.items()})
+            except IntegrityError:
+                # A code was taken concurrently; insert row by row so only the offending items fail.
+                await shard_db.rollback()
+                generated_rows = {index for index in shard_rows if index in generated_codes}
+                created.update(
+                    await _insert_rows_individually(db, shard, shard_db, shard_rows, generated_rows, errors)
+                )
+            except SQLAlchemyError as e:
+                await shard_db.rollback()
+                logger.error(f"Database error during bulk URL creation: {e}")
+                errors.update({index: "A database error occurred during URL creation." for index in shard_rows})
+
+    await announce_short_codes(url.short_code for url in created.values())
 
+    results = []
+    for index, _ in chunk:
+        if index in errors:
+            results.append(UrlBulkItemResult(index=index, error=errors[index]))
+        else:
+            results.append(UrlBulkItemResult(index=index, url=created[index]))
+    return results
+
+
+async def _allocate_bulk_codes(db: AsyncSession, count: int, reserved: set[str]) -> List[str] | None:
+    """
+    Allocates `count` generated codes, replacing any that clash with the custom codes of the same chunk.
+    Returns None if the allocator fails.
+    """
+    codes: List[str] = []
     try:
-        db.add(new_url)
-        await db.commit()
-        await db.refresh(new_url)
-        logger.info(f"URL created successfully: ID {new_url.id}, Short Code: {new_url.short_code}")
-        return new_url
-    except IntegrityError as e:
-        await db.rollback()
-        logger.error(f"Integrity error during URL creation for {url_create.original_url}: {e}")
-        raise ValueError("Failed to create URL, possibly due to a unique constraint violation.") from e
+        while len(codes) < count:
+            fresh = await short_code_allocator.allocate_many(db, count - len(codes))
+            codes.extend(code for code in fresh if code not in reserved)
     except SQLAlchemyError as e:
         await db.rollback()
-        logger.error(f"Database error during URL creation for {url_create.original_url}: {e}")
-        raise SQLAlchemyError(f"A database error occurred during URL creation.") from e
-    except Exception as e:
-        await db.rollback()
-        logger.critical(f"Unexpected error during URL creation for {url_create.original_url}: {e}", exc_info=True)
-        raise Exception(f"An unexpected error occurred during URL creation.") from e
+        logger.error(f"Database error allocating {count} short codes: {e}")
+        return None
+    return codes
 
 
-async def _generate_unique_short_code(db: AsyncSession) -> str:
+async def _insert_rows_individually(
+        db: AsyncSession,
+        shard: str,
+        shard_db: AsyncSession,
+        rows: dict[int, dict],
+        generated_rows: set[int],
+        errors: dict[int, str],
+) -> dict[int, UrlOut]:
     """
-    Generates a unique random short code that does not yet exist in the database.
+    Inserts rows one at a time into `shard`. Rows with a generated code that turns out to be taken
+    are retried with fresh codes of the same shard, like `create_short_url` does; custom codes fail
+    right away. Codes are allocated through `db`, the default shard.
+    """
+    created: dict[int, UrlOut] = {}
+    for index, row in rows.items():
+        attempts = settings.SHORT_CODE_MAX_ATTEMPTS if index in generated_rows else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                result = await shard_db.execute(insert(Url).values(row).returning(*_URL_OUT_COLUMNS))
+                created[index] = UrlOut.model_validate(result.one())
+                await shard_db.commit()
+                break
+            except IntegrityError:
+                await shard_db.rollback()
+                if attempt < attempts:
+                    logger.warning(f"Generated short code '{row['short_code']}' is already taken, retrying.")
+                    try:
+                        row = {**row, "short_code": await _allocate_code_on_shard(db, shard)}
+                    except SQLAlchemyError as e:
+                        await db.rollback()
+                        logger.error(f"Database error allocating a short code for bulk item {index}: {e}")
+                        errors[index] = "Failed to allocate a short code."
+                        break
+                    continue
+                errors[index] = f"Short code '{row['short_code']}' is already in use."
+            except SQLAlchemyError as e:
+                await shard_db.rollback()
+                logger.error(f"Database error creating bulk item {index}: {e}")
+                errors[index] = "A database error occurred during URL creation."
+                break
+    return created
+
+
+async def _allocate_code_on_shard(db: AsyncSession, shard: str) -> str:
+    """
+    Allocates generated codes until one hashes to `shard`.
     """
     while True:
-        short_code = generate_short_code()
-        result = await db.execute(select(Url).where(Url.short_code == short_code))
-        if result.scalar_one_or_none() is None:
+        short_code = await short_code_allocator.allocate(db)
+        if shard_router.shard_for(short_code) == shard:
             return short_code
 
 
-async def get_user_urls(db: AsyncSession, user_id: int) -> List[Url]:
+def _group_by_shard(items, short_code_of) -> dict[str, list]:
     """
-    Retrieves all shortened URLs associated with a specific user ID.
+    Groups `items` by the shard of the short code `short_code_of(item)` returns, keeping their order.
     """
-    logger.info(f"Fetching URLs for user ID: {user_id}")
-    result = await db.execute(select(Url).where(Url.user_id == user_id))
-    return result.scalars().all()
+    groups: dict[str, list] = {}
+    for item in items:
+        groups.setdefault(shard_router.shard_for(short_code_of(item)), []).append(item)
+    return groups
+
+
+def _user_url_filters(
+        user_id: int,
+        url_status: UrlStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+) -> list:
+    """
+    Builds the WHERE clauses shared by the URL listing and export.
+    """
+    now = datetime.now(timezone.utc)
+    is_expired = and_(Url.expired_at.is_not(None), Url.expired_at <= now)
+    is_exhausted = or_(
+        and_(Url.max_clicks.is_not(None), Url.clicks >= Url.max_clicks),
+        and_(Url.one_time_use.is_(True), Url.clicks >= 1),
+    )
+    filters = [Url.user_id == user_id]
+    if url_status == UrlStatus.ACTIVE:
+        filters += [not_(is_expired), not_(is_exhausted)]
+    elif url_status == UrlStatus.EXPIRED:
+        filters.append(is_expired)
+    elif url_status == UrlStatus.EXHAUSTED:
+        filters.append(is_exhausted)
+    if created_from is not None:
+        filters.append(Url.created_at >= created_from)
+    if created_to is not None:
+        filters.append(Url.created_at < created_to)
+    return filters
+
+
+async def get_user_urls(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = settings.URL_LIST_DEFAULT_PAGE_SIZE,
+        after_id: int | None = None,
+        url_status: UrlStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+) -> tuple[List[Url], int | None]:
+    """
+    Retrieves one page of the shortened URLs of a user, newest first.
+    Pagination is keyset-based on the URL ID (IDs grow with creation time), so every page is an
+    index range scan no matter how deep it is. Returns the page and the ID to continue after,
+    or None if this was the last page.
+    On a sharded deployment every shard is queried concurrently for a page and the pages are merged.
+    """
+    logger.info(f"Fetching up to {limit} URLs for user ID: {user_id}")
+    filters = _user_url_filters(user_id, url_status, created_from, created_to)
+    if after_id is not None:
+        filters.append(Url.id < after_id)
+    query = select(Url).where(*filters).order_by(Url.id.desc()).limit(limit + 1).options(noload(Url.user))
+
+    async def fetch_page(shard_db: AsyncSession) -> List[Url]:
+        return list((await shard_db.execute(query)).scalars().all())
+
+    pages = await shard_router.fan_out(db, fetch_page)
+    urls = list(heapq.merge(*pages.values(), key=lambda url: url.id, reverse=True))
+    if len(urls) > limit:
+        return urls[:limit], urls[limit - 1].id
+    return urls, None
+
+
+async def stream_user_urls(
+        db: AsyncSession,
+        user_id: int,
+        url_status: UrlStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        url_ids: Sequence[int] | None = None,
+) -> AsyncGenerator[Row, None]:
+    """
+    Yields every URL of a user as a row of the `UrlOut` columns, newest first within each shard.
+    Rows are fetched from a server-side cursor `URL_EXPORT_BATCH_SIZE` at a time, so memory use
+    stays flat regardless of how many URLs the user has. `url_ids` restricts the rows to those URLs.
+    """
+    logger.info(f"Streaming URLs for user ID: {user_id}")
+    filters = _user_url_filters(user_id, url_status, created_from, created_to)
+    if url_ids is not None:
+        filters.append(Url.id.in_(url_ids))
+    query = (
+        select(*_URL_OUT_COLUMNS)
+        .where(*filters)
+        .order_by(Url.id.desc())
+        .execution_options(yield_per=settings.URL_EXPORT_BATCH_SIZE)
+    )
+    for shard in shard_router.shards:
+        async with shard_router.session(shard, db) as shard_db:
+            result = await shard_db.stream(query)
+            async for partition in result.partitions():
+                for row in partition:
+                    yield row
+
+
+async def find_url_shard(db: AsyncSession, url_id: int, user_id: int) -> str | None:
+    """
+    Returns the shard storing the URL with the given ID owned by the user, or None if no shard has it.
+    Unsharded deployments answer without a query. URL IDs must be unique across shards.
+    """
+    if not shard_router.sharded:
+        return DEFAULT_SHARD
+
+    async def owns(shard_db: AsyncSession) -> bool:
+        return await shard_db.scalar(select(Url.id).where(Url.id == url_id, Url.user_id == user_id)) is not None
+
+    found = await shard_router.fan_out(db, owns)
+    return next((shard for shard, owned in found.items() if owned), None)
 
 
 async def get_url_by_id(db: AsyncSession, url_id: int, user_id: int) -> Url | None:
@@ -121,6 +419,7 @@ async def update_url(db: AsyncSession, url_id: int, user_id: int, url_update: Ur
     try:
         await db.commit()
         await db.refresh(url)
+        await invalidate_short_code(url.short_code)
         logger.info(f"URL ID {url.id} updated successfully.")
         return url
     except SQLAlchemyError as e:
@@ -149,6 +448,7 @@ async def delete_url_by_id(db: AsyncSession, url_id: int, user_id: int) -> bool:
     try:
         await db.delete(url)
         await db.commit()
+        await invalidate_short_code(url.short_code)
         logger.info(f"URL ID {url.id} deleted successfully.")
         return True
     except SQLAlchemyError as e:
@@ -162,53 +462,25 @@ async def delete_url_by_id(db: AsyncSession, url_id: int, user_id: int) -> bool:
 
 
 async def log_click(
-        db: AsyncSession,
         url_id: int,
         referrer: str | None,
         user_agent: str | None,
-        ip_address: str | None
-) -> ClickLog:
+        ip_address: str | None,
+        shard: str = DEFAULT_SHARD,
+) -> bool:
     """
-    Logs a click event for a given URL.
+    Logs a click event for a given URL stored on `shard`.
+    The event is handed to the background ingestion pipeline, so no database write happens here.
+    Returns False if the event was dropped because the ingestion queue is full.
     """
-    new_click_log = ClickLog(
+    event = ClickEvent(
         url_id=url_id,
         referrer=referrer,
         user_agent=user_agent,
         ip_address=ip_address,
+        shard=shard,
     )
-    try:
-        db.add(new_click_log)
-        await db.commit()
-        await db.refresh(new_click_log)
-        logger.debug(f"Click logged for URL ID {url_id}. Referrer: {referrer}")
-        return new_click_log
-    except SQLAlchemyError as e:
-        await db.rollback()
-        logger.error(f"Database error logging click for URL ID {url_id}: {e}")
-        raise SQLAlchemyError(f"Failed to log click: {e}") from e
-    except Exception as e:
-        await db.rollback()
-        logger.critical(f"Unexpected error logging click for URL ID {url_id}: {e}", exc_info=True)
-        raise Exception(f"An unexpected error occurred during click logging: {e}") from e
-
-
-async def get_url_analytics(db: AsyncSession, url_id: int, user_id: int) -> Url | None:
-    """
-    Retrieves a URL along with its full click logs for analytics.
-    Ensures the URL belongs to the specified user.
-    """
-    logger.info(f"Fetching analytics for URL ID {url_id} by user {user_id}")
-    # Load URL and its related click logs
-    result = await db.execute(
-        select(Url).where(Url.id == url_id, Url.user_id == user_id)
-        .options(selectinload(Url.click_logs))
-    )
-    url = result.scalar_one_or_none()
-    if not url:
-        logger.warning(f"Analytics requested for URL ID {url_id} not found or not owned by user {user_id}")
-        return None
-
-    total_clicks = url.clicks
-    logger.info(f"Analytics fetched for URL ID {url_id}. Total clicks: {total_clicks}")
-    return url
+    queued = await click_ingestor.submit(event)
+    if queued:
+        logger.debug(f"Click queued for URL ID {url_id}. Referrer: {referrer}")
+    return queued
@@ -3,7 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
@@ -34,8 +34,9 @@ async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
 
     Raises:
         IntegrityError: If a user with the given email already exists (e.g., due to unique constraint).
+        PasswordHashPoolBusy: If the password hash pool is saturated.
     """
-    hashed_password = get_password_hash(user_create.password)
+    hashed_password = await get_password_hash_async(user_create.password)
     db_user = User(email=str(user_create.email), hashed_password=hashed_password)
 
     try:
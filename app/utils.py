@@ -2,6 +2,7 @@ import random
 import string
 import qrcode
 from qrcode.image.pil import PilImage
+from qrcode.image.svg import SvgPathImage
 import base64
 from io import BytesIO
 from typing import Final
@@ -11,6 +12,13 @@ logger = logging.getLogger(__name__)
 
 SHORT_CODE_CHARS: Final[str] = string.ascii_letters + string.digits
 
+QR_ERROR_CORRECTION: Final[dict[str, int]] = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
 
 def generate_short_code(length: int = 6) -> str:
     """
@@ -28,6 +36,109 @@ def generate_short_code(length: int = 6) -> str:
     return ''.join(random.choices(SHORT_CODE_CHARS, k=length))
 
 
+def encode_base62(number: int, width: int = 0) -> str:
+    """
+    Encodes a non-negative integer with the short code alphabet, left-padded to `width` characters.
+
+    Args:
+        number (int): The integer to encode.
+        width (int): The minimum length of the result. Defaults to 0 (no padding).
+
+    Returns:
+        str: The base62 representation of the number.
+    """
+    if number < 0:
+        raise ValueError("Only non-negative integers can be base62 encoded.")
+    digits = []
+    while number:
+        number, remainder = divmod(number, 62)
+        digits.append(SHORT_CODE_CHARS[remainder])
+    encoded = ''.join(reversed(digits)) or SHORT_CODE_CHARS[0]
+    return encoded.rjust(width, SHORT_CODE_CHARS[0])
+
+
+def decode_base62(code: str) -> int:
+    """
+    Decodes a string produced by `encode_base62` back into its integer value.
+
+    Args:
+        code (str): The base62 encoded string.
+
+    Returns:
+        int: The decoded integer.
+    """
+    number = 0
+    for char in code:
+        index = SHORT_CODE_CHARS.find(char)
+        if index < 0:
+            raise ValueError(f"Invalid base62 character: {char!r}")
+        number = number * 62 + index
+    return number
+
+
+def encode_cursor(key: int) -> str:
+    """
+    Encodes the last seen row ID of a keyset-paginated listing into an opaque cursor.
+
+    Args:
+        key (int): The ID of the last row of the current page.
+
+    Returns:
+        str: A URL-safe cursor for the next page.
+    """
+    return base64.urlsafe_b64encode(str(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodes a cursor produced by `encode_cursor` back into the row ID it points after.
+
+    Args:
+        cursor (str): The cursor received from a client.
+
+    Returns:
+        int: The ID of the last row of the previous page.
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
+
+
+def render_qr_code(data: str, box_size: int = 10, image_format: str = "png", error_correction: str = "L") -> bytes:
+    """
+    Renders a QR code for the given data as a PNG or SVG image.
+    A plain module-level function, so it can run in a process pool.
+
+    Args:
+        data (str): The string data to encode in the QR code (e.g., the short URL).
+        box_size (int): Pixels per QR module (tenths of a millimetre for SVG). Defaults to 10.
+        image_format (str): "png" or "svg". Defaults to "png".
+        error_correction (str): Error correction level, one of "L", "M", "Q" or "H". Defaults to "L".
+
+    Returns:
+        bytes: The encoded image.
+    """
+    if image_format not in ("png", "svg"):
+        raise ValueError(f"Unsupported QR code format: {image_format}")
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=QR_ERROR_CORRECTION[error_correction],
+        box_size=box_size,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    img = qr.make_image(image_factory=PilImage if image_format == "png" else SvgPathImage)
+    buffered = BytesIO()
+    if image_format == "png":
+        img.save(buffered, format="PNG")
+    else:
+        img.save(buffered)
+    return buffered.getvalue()
+
+
 def generate_qr_code_base64(data: str) -> str:
     """
     Generates a QR code for the given data and returns it as a base64 encoded string.
@@ -39,20 +150,7 @@ def generate_qr_code_base64(data: str) -> str:
         str: A base64 encoded string of the QR code image (PNG format).
     """
     try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-
-        img = qr.make_image(image_factory=PilImage)
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        img_str = base64.b64encode(render_qr_code(data)).decode("utf-8")
         logger.info(f"QR code generated for data: {data[:50]}...")
         return img_str
     except Exception as e:
@@ -0,0 +1,118 @@
+"""
+Benchmark of redirect throughput and latency through the FastAPI route and the ASGI fast path.
+
+Usage:
+    python -m benchmarks.bench_redirect [--urls 1000] [--requests 20000] [--concurrency 50]
+
+Both variants serve the same unlimited URLs from a temporary SQLite database, in-process through
+httpx's ASGI transport, so the numbers isolate the per-request cost of the application (routing,
+dependency injection, request and response objects) from the network and the ASGI server.
+Every code is requested once before timing starts, so the timed requests are resolution cache hits,
+which is the steady state of a hot redirect. Put both behind uvicorn and a load generator such
+as `wrk` for end-to-end numbers.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.redirect_fast_path import RedirectFastPathMiddleware
+from app.api.v1.deps import get_db
+from app.database.base import Base
+from app.main import app as fastapi_app
+from app.models import Url
+from app.services.click_counter import click_counter
+from app.services.click_ingestion import click_ingestor
+from app.services.redirect import resolution_cache
+from app.services.short_code_filter import short_code_filter
+
+
+async def seed(session_factory, urls: int) -> list[str]:
+    codes = [f"bench{i}" for i in range(urls)]
+    async with session_factory() as db:
+        await db.execute(insert(Url).values([
+            {"original_url": f"https://bench.example/{code}", "short_code": code} for code in codes
+        ]))
+        await db.commit()
+    for code in codes:
+        short_code_filter.add(code)
+    return codes
+
+
+async def run(app, codes: list[str], requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def client_loop(client: AsyncClient) -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(f"/{random.choice(codes)}", follow_redirects=False)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 307, response.text
+
+    resolution_cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for code in codes:
+            await client.get(f"/{code}", follow_redirects=False)
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests_per_second": requests / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    codes = await seed(session_factory, args.urls)
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+    fastapi_app.dependency_overrides[get_db] = override_get_db
+    # Clicks are written to the benchmark database by the background workers, as in production.
+    click_ingestor.session_factory = click_counter.session_factory = session_factory
+    await click_ingestor.start()
+    await click_counter.start()
+    fast_path = RedirectFastPathMiddleware(
+        fastapi_app,
+        reserved_paths=[route.path for route in fastapi_app.routes],
+        session_factory=session_factory,
+    )
+
+    print(f"{'variant':<10} {'requests/s':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for variant, app in (("route", fastapi_app), ("fast path", fast_path)):
+        result = await run(app, codes, args.requests, args.concurrency)
+        print(
+            f"{variant:<10} {result['requests_per_second']:>11.0f} "
+            f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+        )
+    await click_counter.stop()
+    await click_ingestor.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
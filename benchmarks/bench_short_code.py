@@ -0,0 +1,149 @@
+"""
+Benchmark of URL creation throughput per short code allocation strategy.
+
+Usage:
+    python -m benchmarks.bench_short_code [--sizes 1000000 10000000 100000000] [--creations 2000]
+
+Each run creates URLs through `create_short_urls_bulk` against a temporary SQLite database,
+committing once per `--batch-size` URLs so commit latency doesn't drown out allocation cost.
+
+The numbers for the random strategy are MODELLED. Seeding 100M rows is impractical for a benchmark,
+so the table is seeded with at most `--max-seed-rows` rows, and every candidate code that passes the
+real existence check is then rejected with probability rows / 62**length, exactly as a uniformly
+random code would be against a table of that size. The `retries/creation` column is the number of
+modelled redraws; use a smaller `--length` to reach the same occupancy with a fully seeded table.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import Url
+from app.schemas.url import UrlCreate
+from app.services import url as url_service
+from app.services.short_code import RandomShortCodeAllocator, SequenceShortCodeAllocator
+from app.utils import generate_short_code
+
+
+class OccupancyModelRandomAllocator(RandomShortCodeAllocator):
+    """
+    Random allocator that behaves as if the table held `rows` codes.
+    """
+
+    def __init__(self, rows: int, length: int):
+        super().__init__(length)
+        self.occupancy = min(rows / 62 ** length, 0.999)
+        self.queries = 0
+        self.retries = 0
+
+    def _collides(self) -> bool:
+        if random.random() < self.occupancy:
+            self.retries += 1
+            return True
+        return False
+
+    async def allocate(self, db: AsyncSession) -> str:
+        while True:
+            short_code = generate_short_code(self.length)
+            self.queries += 1
+            result = await db.execute(select(Url.id).where(Url.short_code == short_code))
+            if result.scalar_one_or_none() is None and not self._collides():
+                return short_code
+
+    async def allocate_many(self, db: AsyncSession, count: int) -> list[str]:
+        codes: set[str] = set()
+        while len(codes) < count:
+            candidates = {generate_short_code(self.length) for _ in range(count - len(codes))} - codes
+            self.queries += 1
+            result = await db.execute(select(Url.short_code).where(Url.short_code.in_(candidates)))
+            free = candidates - set(result.scalars().all())
+            codes |= {code for code in free if not self._collides()}
+        return list(codes)
+
+
+async def seed(session_factory, rows: int) -> None:
+    async with session_factory() as db:
+        for start in range(0, rows, 10_000):
+            count = min(10_000, rows - start)
+            await db.execute(insert(Url).values([
+                {"original_url": "https://seed.example", "short_code": f"seed{start + i}"}
+                for i in range(count)
+            ]))
+        await db.commit()
+
+
+async def run(
+        strategy: str,
+        rows: int,
+        creations: int,
+        batch_size: int,
+        max_seed_rows: int,
+        length: int,
+) -> dict:
+    directory = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await seed(session_factory, min(rows, max_seed_rows))
+
+    if strategy == "random":
+        allocator = OccupancyModelRandomAllocator(rows, length)
+    else:
+        allocator = SequenceShortCodeAllocator(length=length, key="benchmark")
+    url_service.short_code_allocator = allocator
+
+    url_create = UrlCreate(original_url="https://bench.example/")
+    started = time.perf_counter()
+    async with session_factory() as db:
+        for start in range(0, creations, batch_size):
+            items = [url_create] * min(batch_size, creations - start)
+            await url_service.create_short_urls_bulk(db, None, items)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    return {
+        "strategy": strategy,
+        "rows": rows,
+        "seeded": min(rows, max_seed_rows),
+        "creations_per_second": creations / elapsed,
+        "lookups_per_creation": getattr(allocator, "queries", 0) / creations,
+        "retries_per_creation": getattr(allocator, "retries", 0) / creations,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--creations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-seed-rows", type=int, default=200_000)
+    parser.add_argument("--length", type=int, default=6)
+    args = parser.parse_args()
+
+    print("random: modelled occupancy (see module docstring); sequence: measured")
+    print(
+        f"{'strategy':<10} {'rows':>12} {'seeded':>10} {'creations/s':>12} "
+        f"{'lookups/creation':>17} {'retries/creation':>17}"
+    )
+    for rows in args.sizes:
+        for strategy in ("random", "sequence"):
+            result = await run(
+                strategy, rows, args.creations, args.batch_size, args.max_seed_rows, args.length
+            )
+            print(
+                f"{result['strategy']:<10} {result['rows']:>12,} {result['seeded']:>10,} "
+                f"{result['creations_per_second']:>12.0f} {result['lookups_per_creation']:>17.3f} "
+                f"{result['retries_per_creation']:>17.3f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.api.v1.deps import get_db
+from app.api.v1.routes.metrics import router as metrics_router
+
+
+@pytest.mark.asyncio
+async def test_metrics_disabled_by_default(async_client):
+    """Test that the metrics endpoint is not mounted unless METRICS_ENABLED is set."""
+    response = await async_client.get("/api/v1/metrics/")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_metrics_require_authentication(db_session, user_token, async_client):
+    """Test that the metrics endpoint rejects anonymous requests and serves authenticated ones."""
+    app = FastAPI()
+    app.include_router(metrics_router, prefix="/api/v1/metrics")
+
+    async def override_get_db():
+        yield db_session
+    app.dependency_overrides[get_db] = override_get_db
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/metrics/")
+        assert response.status_code == 401
+        response = await client.get("/api/v1/metrics/", headers={"Authorization": f"Bearer {user_token}"})
+        assert response.status_code == 200
+        assert "redirect_cache" in response.json()
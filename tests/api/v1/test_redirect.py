@@ -58,3 +58,228 @@ async def test_redirect_one_time_use(async_client, user_token):
     assert resp1.status_code in (302, 307), "First click should redirect."
     resp2 = await async_client.get(f"/api/v1/redirect/{short_code}", follow_redirects=False)
     assert resp2.status_code == 404, "Second click should return 404."
+
+@pytest.mark.asyncio
+async def test_redirect_short_code(async_client, user_token):
+    """Test redirect via the root short code path."""
+    headers = auth_headers(user_token)
+    data = {"original_url": "https://root-redirect.com/"}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    short_code = create_resp.json()["short_code"]
+    response = await async_client.get(f"/{short_code}", follow_redirects=False)
+    assert response.status_code == 307, "Should redirect for valid short code."
+    assert response.headers["location"] == "https://root-redirect.com/", "Redirect location should match."
+
+@pytest.mark.asyncio
+async def test_redirect_served_from_cache(async_client, user_token):
+    """Test repeated redirects are served from the resolution cache."""
+    from app.services.redirect import resolution_cache
+
+    headers = auth_headers(user_token)
+    data = {"original_url": "https://cached.com/"}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    short_code = create_resp.json()["short_code"]
+    await async_client.get(f"/{short_code}", follow_redirects=False)
+    hits = resolution_cache.hits
+    response = await async_client.get(f"/{short_code}", follow_redirects=False)
+    assert response.status_code == 307
+    assert resolution_cache.hits == hits + 1, "Second redirect should be a cache hit."
+
+@pytest.mark.asyncio
+async def test_redirect_cache_invalidated_on_update(async_client, user_token):
+    """Test updating a URL invalidates its cached resolution."""
+    headers = auth_headers(user_token)
+    data = {"original_url": "https://before.com/"}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    url_id = create_resp.json()["id"]
+    short_code = create_resp.json()["short_code"]
+    await async_client.get(f"/{short_code}", follow_redirects=False)
+    await async_client.put(f"/api/v1/url/{url_id}", json={"original_url": "https://after.com/"}, headers=headers)
+    response = await async_client.get(f"/{short_code}", follow_redirects=False)
+    assert response.headers["location"] == "https://after.com/", "Updated target should be used."
+
+@pytest.mark.asyncio
+async def test_redirect_one_time_use_root(async_client, user_token):
+    """Test a one-time-use URL can only be followed once."""
+    headers = auth_headers(user_token)
+    data = {"original_url": "https://once.com/", "one_time_use": True}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    short_code = create_resp.json()["short_code"]
+    resp1 = await async_client.get(f"/{short_code}", follow_redirects=False)
+    assert resp1.status_code == 307, "First click should redirect."
+    resp2 = await async_client.get(f"/{short_code}", follow_redirects=False)
+    assert resp2.status_code == 404, "Second click should return 404."
+
+@pytest.mark.asyncio
+async def test_redirect_max_clicks_root(async_client, user_token):
+    """Test a URL stops redirecting once max_clicks is reached."""
+    headers = auth_headers(user_token)
+    data = {"original_url": "https://twice.com/", "max_clicks": 2}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    short_code = create_resp.json()["short_code"]
+    for _ in range(2):
+        response = await async_client.get(f"/{short_code}", follow_redirects=False)
+        assert response.status_code == 307, "Clicks within the limit should redirect."
+        assert response.headers["location"] == "https://twice.com/"
+    response = await async_client.get(f"/{short_code}", follow_redirects=False)
+    assert response.status_code == 404, "Click over the limit should return 404."
+
+@pytest.mark.asyncio
+async def test_redirect_status_and_cache_headers(async_client, user_token):
+    """Test that each URL redirects with its own status and a Cache-Control matching its limits."""
+    headers = auth_headers(user_token)
+    data = {"original_url": "https://permanent.com/", "redirect_status": 308}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    assert create_resp.json()["redirect_status"] == 308
+    response = await async_client.get(f"/{create_resp.json()['short_code']}", follow_redirects=False)
+    assert response.status_code == 308
+    assert response.headers["location"] == "https://permanent.com/"
+    assert response.headers["cache-control"] == "public, max-age=86400"
+
+    expires = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)).isoformat()
+    data = {"original_url": "https://expiring.com/", "redirect_status": 301, "expired_at": expires}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    response = await async_client.get(f"/{create_resp.json()['short_code']}", follow_redirects=False)
+    assert response.status_code == 301
+    max_age = int(response.headers["cache-control"].rsplit("=", 1)[1])
+    assert 3400 < max_age <= 3600 - 60, "Caches must not outlive the link."
+
+    data = {"original_url": "https://limited.com/", "redirect_status": 308, "max_clicks": 5}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    response = await async_client.get(f"/{create_resp.json()['short_code']}", follow_redirects=False)
+    assert response.status_code == 308
+    assert response.headers["cache-control"] == "no-store"
+
+    data = {"original_url": "https://temporary.com/"}
+    create_resp = await async_client.post("/api/v1/url/", json=data, headers=headers)
+    url = create_resp.json()
+    response = await async_client.get(f"/{url['short_code']}", follow_redirects=False)
+    assert response.headers["cache-control"] == "no-cache"
+    await async_client.put(f"/api/v1/url/{url['id']}", json={"redirect_status": 302}, headers=headers)
+    response = await async_client.get(f"/{url['short_code']}", follow_redirects=False)
+    assert response.status_code == 302
+
+@pytest.mark.asyncio
+async def test_redirect_fast_path(async_client, user_token, test_engine):
+    """Test the ASGI fast path answers unlimited redirects itself and hands everything else to the app."""
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from app.api.redirect_fast_path import RedirectFastPathMiddleware
+
+    calls = []
+
+    async def inner_app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 418, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = RedirectFastPathMiddleware(
+        inner_app,
+        reserved_paths=["/docs"],
+        session_factory=sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    headers = auth_headers(user_token)
+    unlimited = (await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://fast.com/", "redirect_status": 301}, headers=headers,
+    )).json()
+    limited = (await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://slow.com/", "max_clicks": 1}, headers=headers,
+    )).json()
+
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as client:
+        response = await client.get(f"/{unlimited['short_code']}", follow_redirects=False)
+        assert response.status_code == 301
+        assert response.headers["location"] == "https://fast.com/"
+        assert response.headers["cache-control"] == "public, max-age=86400"
+        assert calls == [], "Unlimited redirects should not reach the app."
+
+        response = await client.get("/doesnotexist", follow_redirects=False)
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Short URL not found."}
+
+        for path in (f"/{limited['short_code']}", "/docs", "/api/v1/url/"):
+            assert (await client.get(path, follow_redirects=False)).status_code == 418
+        assert (await client.post(f"/{unlimited['short_code']}")).status_code == 418
+        assert calls == [f"/{limited['short_code']}", "/docs", "/api/v1/url/", f"/{unlimited['short_code']}"]
+
+@pytest.mark.asyncio
+async def test_redirect_throttled(async_client, user_token):
+    """Test that throttled clicks redirect without being logged, or get 429 when configured or limited."""
+    from app.api.v1.routes import redirect as redirect_route
+    from app.services.redirect_throttle import RedirectThrottle
+
+    headers = auth_headers(user_token)
+    unlimited = (await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://flooded.com/"}, headers=headers,
+    )).json()
+    limited = (await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://flooded-limited.com/", "max_clicks": 10}, headers=headers,
+    )).json()
+    logged = []
+
+    async def record_click(url_id, *args):
+        logged.append(url_id)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(redirect_route, "log_click", record_click)
+        patch.setattr(redirect_route, "redirect_throttle", RedirectThrottle(enabled=True, ip_limit=1))
+        responses = [await async_client.get(f"/{unlimited['short_code']}", follow_redirects=False) for _ in range(3)]
+        assert [response.status_code for response in responses] == [307, 307, 307]
+        assert logged == [unlimited["id"]], "Only the click under the limit is logged."
+
+        response = await async_client.get(f"/{limited['short_code']}", follow_redirects=False)
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "60"
+
+        patch.setattr(redirect_route, "redirect_throttle", RedirectThrottle(enabled=True, action="reject", ip_limit=1))
+        statuses = [(await async_client.get(f"/{unlimited['short_code']}", follow_redirects=False)).status_code
+                    for _ in range(2)]
+        assert statuses == [307, 429]
+
+@pytest.mark.asyncio
+async def test_redirect_bots_and_prefetches_do_not_consume_clicks(async_client, user_token):
+    """Test that bots and prefetches are tallied apart and never consume a one-time link."""
+    from app.api.v1.routes import redirect as redirect_route
+    from app.services.bot_filter import BOT, PREFETCH, BotHitCounter
+
+    headers = auth_headers(user_token)
+    one_time = (await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://secret.com/", "one_time_use": True}, headers=headers,
+    )).json()
+    unlimited = (await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://shared.com/"}, headers=headers,
+    )).json()
+    logged = []
+
+    async def record_click(url_id, *args):
+        logged.append(url_id)
+
+    counter = BotHitCounter()
+    slackbot = {"User-Agent": "Slackbot-LinkExpanding 1.0 (+https://api.slack.com/robots)"}
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(redirect_route, "log_click", record_click)
+        patch.setattr(redirect_route, "bot_hit_counter", counter)
+
+        response = await async_client.get(f"/{one_time['short_code']}", headers=slackbot, follow_redirects=False)
+        assert response.status_code == 204
+        assert "location" not in response.headers
+        response = await async_client.get(
+            f"/{one_time['short_code']}", headers={"Sec-Purpose": "prefetch"}, follow_redirects=False,
+        )
+        assert response.status_code == 503
+        assert response.headers["cache-control"] == "no-store"
+
+        response = await async_client.get(f"/{unlimited['short_code']}", headers=slackbot, follow_redirects=False)
+        assert response.status_code == 307
+        assert response.headers["location"] == "https://shared.com/"
+        assert logged == []
+
+        response = await async_client.get(f"/{one_time['short_code']}", follow_redirects=False)
+        assert response.status_code == 307, "The one-time link is still unused."
+        assert logged == [one_time["id"]]
+
+    assert counter.stats()["bot_hits"] == 2
+    assert counter.stats()["prefetch_hits"] == 1
+    url = (await async_client.get(f"/api/v1/url/{one_time['id']}", headers=headers)).json()
+    assert url["clicks"] == 1
@@ -1,5 +1,9 @@
+import datetime
+import json
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, insert
+from app.models.click_log import ClickLog
 
 @pytest.mark.asyncio
 async def test_create_url(async_client, user_token):
@@ -76,6 +80,53 @@ async def test_get_url_analytics(async_client, user_token):
     assert response.status_code == 200
     assert "total_clicks" in response.json()
 
+@pytest.mark.asyncio
+async def test_get_url_analytics_aggregates(async_client, user_token, db_session):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    create_resp = await async_client.post("/api/v1/url/", json={"original_url": "https://agg.com"}, headers=headers)
+    url_id = create_resp.json()["id"]
+    base = datetime.datetime(2026, 1, 1, 10, 15, tzinfo=datetime.timezone.utc)
+    clicks = [
+        (base, "https://a.com", "10.0.0.1"),
+        (base + datetime.timedelta(minutes=10), "https://a.com", "10.0.0.1"),
+        (base + datetime.timedelta(hours=1), "https://b.com", "10.0.0.2"),
+        (base + datetime.timedelta(days=1), None, "10.0.0.3"),
+    ]
+    await db_session.execute(insert(ClickLog).values([
+        {"url_id": url_id, "clicked_at": at, "referrer": referrer, "user_agent": "test-agent", "ip_address": ip}
+        for at, referrer, ip in clicks
+    ]))
+    await db_session.commit()
+
+    params = {"start": "2026-01-01T00:00:00Z", "end": "2026-01-02T00:00:00Z", "bucket": "hour"}
+    response = await async_client.get(f"/api/v1/url/{url_id}/analytics", params=params, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["range_clicks"] == 3, "Clicks outside the range should not be counted."
+    assert body["unique_visitors"] == 2
+    assert [(b["bucket"][:13], b["clicks"]) for b in body["timeseries"]] == [("2026-01-01T10", 2), ("2026-01-01T11", 1)]
+    assert body["top_referrers"][0] == {"value": "https://a.com", "clicks": 2}
+    assert body["top_user_agents"] == [{"value": "test-agent", "clicks": 3}]
+
+    response = await async_client.get(f"/api/v1/url/{url_id}/clicks?limit=3", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    cursor = response.headers["X-Next-Cursor"]
+    response = await async_client.get(f"/api/v1/url/{url_id}/clicks?limit=3&cursor={cursor}", headers=headers)
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+    await db_session.execute(delete(ClickLog).where(ClickLog.url_id == url_id))
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_get_url_analytics_invalid_range(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    create_resp = await async_client.post("/api/v1/url/", json={"original_url": "https://agg.com"}, headers=headers)
+    url_id = create_resp.json()["id"]
+    params = {"start": "2020-01-01T00:00:00Z", "end": "2026-01-01T00:00:00Z", "bucket": "hour"}
+    response = await async_client.get(f"/api/v1/url/{url_id}/analytics", params=params, headers=headers)
+    assert response.status_code == 400
+
 @pytest.mark.asyncio
 async def test_get_qr_code(async_client, user_token):
     headers = {"Authorization": f"Bearer {user_token}"}
@@ -85,3 +136,154 @@ async def test_get_qr_code(async_client, user_token):
     response = await async_client.get(f"/api/v1/url/{url_id}/qr", headers=headers)
     assert response.status_code == 200
     assert "qr_code_png_base64" in response.json()
+
+@pytest.mark.asyncio
+async def test_get_qr_code_raw_images(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    create_resp = await async_client.post("/api/v1/url/", json={"original_url": "https://qr.com"}, headers=headers)
+    url_id = create_resp.json()["id"]
+
+    response = await async_client.get(f"/api/v1/url/{url_id}/qr?format=png&size=4", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(b"\x89PNG")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("private, max-age=")
+
+    response = await async_client.get(
+        f"/api/v1/url/{url_id}/qr?format=png&size=4", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = await async_client.get(f"/api/v1/url/{url_id}/qr?format=svg&error_correction=H", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert b"<svg" in response.content
+    assert response.headers["etag"] != etag
+
+    response = await async_client.get(f"/api/v1/url/{url_id}/qr?size=1000", headers=headers)
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_create_urls_bulk(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    await async_client.post(
+        "/api/v1/url/", json={"original_url": "https://taken.com", "custom_short_code": "bulktaken"}, headers=headers
+    )
+    items = [
+        {"original_url": "https://bulk1.com"},
+        {"original_url": "https://bulk2.com", "custom_short_code": "bulkfree"},
+        {"original_url": "https://bulk3.com", "custom_short_code": "bulktaken"},
+        {"original_url": "https://bulk4.com", "custom_short_code": "bulkfree"},
+    ]
+    response = await async_client.post("/api/v1/url/bulk", json={"items": items}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2
+    assert body["failed"] == 2
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert results[1]["url"]["short_code"] == "bulkfree"
+    assert "already in use" in results[2]["error"]
+    assert "already in use" in results[3]["error"], "Duplicates within the batch should fail."
+
+@pytest.mark.asyncio
+async def test_create_urls_bulk_ndjson(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}", "Content-Type": "application/x-ndjson"}
+    body = '{"original_url": "https://nd1.com"}\nnot json\n{"original_url": "https://nd2.com"}'
+    response = await async_client.post("/api/v1/url/bulk/ndjson", content=body, headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert set(by_index) == {0, 1, 2}
+    assert by_index[0]["url"]["original_url"].rstrip("/") == "https://nd1.com"
+    assert by_index[1]["error"] is not None
+    assert by_index[2]["url"] is not None
+
+@pytest.mark.asyncio
+async def test_create_urls_bulk_ndjson_line_too_long(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}", "Content-Type": "application/x-ndjson"}
+    body = '{"original_url": "https://nd.com/' + "a" * 10_000 + '"}'
+    response = await async_client.post("/api/v1/url/bulk/ndjson", content=body, headers=headers)
+    assert response.status_code == 413
+
+@pytest.mark.asyncio
+async def test_list_user_urls_paginated(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    items = [{"original_url": f"https://page{i}.com"} for i in range(5)]
+    await async_client.post("/api/v1/url/bulk", json={"items": items}, headers=headers)
+    everything = (await async_client.get("/api/v1/url/?limit=500", headers=headers)).json()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await async_client.get("/api/v1/url/", params=params, headers=headers)
+        assert response.status_code == 200
+        seen += [url["id"] for url in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [url["id"] for url in everything], "Pages should cover every URL exactly once, newest first."
+    assert seen == sorted(seen, reverse=True)
+
+@pytest.mark.asyncio
+async def test_list_user_urls_invalid_cursor(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = await async_client.get("/api/v1/url/?cursor=!!!", headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_user_urls_status_filter(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    data = {"original_url": "https://gone.com", "expired_at": "2000-01-01T00:00:00Z"}
+    url_id = (await async_client.post("/api/v1/url/", json=data, headers=headers)).json()["id"]
+    expired = (await async_client.get("/api/v1/url/?status=expired&limit=500", headers=headers)).json()
+    active = (await async_client.get("/api/v1/url/?status=active&limit=500", headers=headers)).json()
+    assert url_id in [url["id"] for url in expired]
+    assert url_id not in [url["id"] for url in active]
+
+@pytest.mark.asyncio
+async def test_export_user_urls(async_client, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    listed = (await async_client.get("/api/v1/url/?limit=500", headers=headers)).json()
+
+    response = await async_client.get("/api/v1/url/export", headers=headers)
+    assert response.status_code == 200
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [url["id"] for url in exported] == [url["id"] for url in listed]
+
+    response = await async_client.get("/api/v1/url/export?format=csv", headers=headers)
+    assert response.status_code == 200
+    rows = response.text.splitlines()
+    assert rows[0].startswith("id,original_url,short_code")
+    assert len(rows) == len(listed) + 1
+
+@pytest.mark.asyncio
+async def test_export_qr_codes_zip(async_client, user_token):
+    import io
+    import zipfile
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    codes = []
+    for i in range(3):
+        create_resp = await async_client.post(
+            "/api/v1/url/", json={"original_url": f"https://zip{i}.com", "custom_short_code": f"zipqr{i}"}, headers=headers
+        )
+        codes.append(create_resp.json())
+
+    body = {"url_ids": [url["id"] for url in codes[:2]], "size": 2}
+    response = await async_client.post("/api/v1/url/qr/export", json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == ["manifest.csv", "zipqr0.png", "zipqr1.png"]
+    assert archive.read("zipqr0.png").startswith(b"\x89PNG")
+    manifest = archive.read("manifest.csv").decode()
+    assert "zipqr1.png" in manifest and "/zipqr1" in manifest
+
+    body = {"url_ids": [codes[2]["id"], 999999], "format": "svg"}
+    response = await async_client.post("/api/v1/url/qr/export", json=body, headers=headers)
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(archive.namelist()) == ["manifest.csv", "zipqr2.svg"], "Unknown IDs should be skipped."
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.main import app as fastapi_app
 from app.database.base import Base
-from app.api.v1.deps import get_db
+from app.api.v1.deps import get_db, get_session_factory
 from fastapi_limiter import FastAPILimiter
 from httpx import ASGITransport
 
@@ -41,11 +41,14 @@ async def db_session(test_engine, create_test_db):
         yield session
 
 @pytest.fixture(scope="function")
-async def async_client(db_session, monkeypatch):
+async def async_client(test_engine, db_session, monkeypatch):
     # Override get_db dependency
     async def override_get_db():
         yield db_session
     fastapi_app.dependency_overrides[get_db] = override_get_db
+    fastapi_app.dependency_overrides[get_session_factory] = lambda: sessionmaker(
+        test_engine, class_=AsyncSession, expire_on_commit=False
+    )
 
     # Mock FastAPILimiter for tests (disable rate limiting)
     class DummyRedis:
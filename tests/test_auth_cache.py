@@ -0,0 +1,56 @@
+import datetime
+import pytest
+
+from sqlalchemy import select
+from app.models.user import User
+from app.services.auth import Principal, PrincipalCache, principal_cache
+from app.api.v1 import deps
+
+
+def test_principal_cache_hit_and_invalidate_user():
+    """Test that principals are cached per token and evicted when their user changes."""
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.set("token-a", Principal(id=1, email="a@example.com"))
+    cache.set("token-b", Principal(id=1, email="a@example.com"))
+    cache.set("token-c", Principal(id=2, email="c@example.com"))
+    assert cache.get("token-a") == Principal(id=1, email="a@example.com")
+    cache.invalidate_user(1)
+    assert cache.get("token-a") is None
+    assert cache.get("token-b") is None
+    assert cache.get("token-c") is not None, "Other users should stay cached."
+
+def test_principal_cache_respects_token_expiry():
+    """Test that an already expired token is never cached."""
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    expired = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+    cache.set("token", Principal(id=1, email="a@example.com"), expired)
+    assert cache.get("token") is None
+
+@pytest.mark.asyncio
+async def test_cached_token_skips_user_lookup(async_client, user_token, monkeypatch):
+    """Test that a token seen before is authenticated without a database lookup."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert (await async_client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+
+    async def fail_lookup(*args, **kwargs):
+        raise AssertionError("The user should come from the principal cache.")
+    monkeypatch.setattr(deps, "get_user_by_email", fail_lookup)
+    response = await async_client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "testuser@example.com"
+
+@pytest.mark.asyncio
+async def test_user_update_invalidates_principals(async_client, user_token, db_session):
+    """Test that updating a user through the ORM evicts its cached tokens."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    await async_client.get("/api/v1/auth/me", headers=headers)
+    assert principal_cache.get(user_token) is not None
+
+    user = (await db_session.execute(select(User).where(User.email == "testuser@example.com"))).scalar_one()
+    hashed_password = user.hashed_password
+    user.hashed_password = "changed"
+    await db_session.flush()
+    assert principal_cache.get(user_token) is None
+
+    user.hashed_password = hashed_password
+    await db_session.commit()
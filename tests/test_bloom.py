@@ -0,0 +1,20 @@
+from app.core.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added item is reported as present."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"code{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+
+def test_bloom_filter_false_positive_rate():
+    """Test that the false positive rate at capacity stays near the configured rate."""
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"code{i}")
+    false_positives = sum(f"probe{i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+    assert abs(bloom.false_positive_rate() - 0.01) < 0.005
+    assert bloom.memory_bytes < 10_000 * 10 // 8 + 1
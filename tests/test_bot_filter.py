@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.click_rollup import BotHitDaily
+from app.models.url import Url
+from app.services.bot_filter import BOT, PREFETCH, BotHitCounter, classify_request
+
+
+def test_classify_request():
+    """Test that link preview crawlers and speculative loads are told apart from visits."""
+    chrome = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+    assert classify_request(chrome, None) is None
+    assert classify_request(None, None) is None
+    assert classify_request("curl/8.5.0", None) is None
+    assert classify_request("Slackbot-LinkExpanding 1.0 (+https://api.slack.com/robots)", None) == BOT
+    assert classify_request("facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)", None) == BOT
+    assert classify_request("Mozilla/5.0 (compatible; Twitterbot/1.0)", None) == BOT
+    assert classify_request(chrome, "prefetch") == PREFETCH
+    assert classify_request(chrome, "prefetch;prerender") == PREFETCH
+    assert classify_request(chrome, "navigate") is None
+
+
+@pytest.mark.asyncio
+async def test_bot_hit_counter_aggregates_per_day(test_engine, db_session):
+    """Test that bot hits are added up per URL, day and kind across flushes."""
+    url = Url(original_url="https://previewed.com", short_code="botcnt1")
+    db_session.add(url)
+    await db_session.commit()
+
+    counter = BotHitCounter(sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False))
+    for _ in range(3):
+        counter.increment(url.id, BOT)
+    counter.increment(url.id, PREFETCH)
+    await counter.flush()
+    counter.increment(url.id, BOT)
+    await counter.flush()
+
+    rows = dict((await db_session.execute(
+        select(BotHitDaily.kind, BotHitDaily.hits).where(BotHitDaily.url_id == url.id)
+    )).all())
+    assert rows == {BOT: 4, PREFETCH: 1}
+    assert counter.stats()["flushed_rows"] == 3
+
+    await db_session.execute(delete(BotHitDaily).where(BotHitDaily.url_id == url.id))
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
@@ -0,0 +1,54 @@
+import pytest
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_get_and_set():
+    """Test that stored values are returned and counted as hits."""
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1, "Stored value should be returned."
+    assert cache.get("b") is None, "Missing key should return None."
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when full."""
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None, "Least recently used entry should be evicted."
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_entries_expire():
+    """Test that entries expire after their time-to-live."""
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 6
+    assert cache.get("a") is None, "Expired entry should not be returned."
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+def test_cache_invalidate():
+    """Test that invalidated entries are removed."""
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("a", 1)
+    assert cache.invalidate("a") is True
+    assert cache.invalidate("a") is False
+    assert cache.get("a") is None
+
+def test_cache_invalid_size():
+    """Test that a non-positive size raises ValueError."""
+    with pytest.raises(ValueError):
+        TTLCache(max_size=0, ttl_seconds=10)
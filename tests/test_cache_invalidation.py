@@ -0,0 +1,52 @@
+import pytest
+from app.core.cache import TTLCache
+from app.services.cache_invalidation import CacheInvalidationBus
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.messages = []
+
+    async def publish(self, channel, message):
+        if self.fail:
+            raise ConnectionError("redis is down")
+        self.messages.append((channel, message))
+
+
+def make_bus():
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    return cache, CacheInvalidationBus(cache.invalidate, cache.clear, channel="test")
+
+
+@pytest.mark.asyncio
+async def test_publish_invalidates_locally_and_broadcasts():
+    """Test that an invalidation evicts the local entry and is published to the other workers."""
+    cache, bus = make_bus()
+    redis = FakeRedis()
+    bus._redis = redis
+    cache.set("abc", 1)
+    await bus.publish("abc")
+    assert "abc" not in cache
+    assert redis.messages == [("test", "abc")]
+
+@pytest.mark.asyncio
+async def test_publish_without_redis_still_invalidates():
+    """Test that a Redis failure doesn't prevent the local invalidation."""
+    cache, bus = make_bus()
+    bus._redis = FakeRedis(fail=True)
+    cache.set("abc", 1)
+    await bus.publish("abc")
+    assert "abc" not in cache
+    assert bus.stats()["publish_failures"] == 1
+
+def test_received_message_invalidates():
+    """Test that invalidations published by another worker evict the local entry."""
+    cache, bus = make_bus()
+    cache.set("abc", 1)
+    cache.set("def", 2)
+    bus.handle_message({"type": "subscribe", "data": 1})
+    bus.handle_message({"type": "message", "data": b"abc"})
+    assert "abc" not in cache
+    assert "def" in cache
+    assert bus.stats()["received"] == 1
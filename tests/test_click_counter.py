@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.url import Url
+from app.services.click_counter import ClickCounter, claim_limited_click
+
+
+@pytest.fixture
+def session_factory(test_engine):
+    return sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def make_url(db_session, short_code, **kwargs):
+    url = Url(original_url="https://counter.com", short_code=short_code, **kwargs)
+    db_session.add(url)
+    await db_session.commit()
+    return url
+
+
+@pytest.mark.asyncio
+async def test_counter_coalesces_increments(session_factory, db_session):
+    """Test that increments are coalesced and applied on flush."""
+    url = await make_url(db_session, "count001")
+    counter = ClickCounter(session_factory=session_factory, batch_size=2)
+    for _ in range(5):
+        counter.increment(url.id)
+    assert counter.pending(url.id) == 5, "Increments should be buffered in memory."
+
+    await counter.flush()
+    await db_session.refresh(url)
+    assert url.clicks == 5, "Flush should add the coalesced delta."
+    assert counter.pending(url.id) == 0
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_claim_limited_click_enforces_limit(session_factory, db_session):
+    """Test that concurrent claims never exceed max_clicks."""
+    url = await make_url(db_session, "limit001", max_clicks=3)
+
+    async def claim():
+        async with session_factory() as db:
+            return await claim_limited_click(db, url.id)
+
+    results = await asyncio.gather(*(claim() for _ in range(6)))
+    await db_session.refresh(url)
+    claimed = [result for result in results if result is not None]
+    assert len(claimed) == 3, "Exactly max_clicks claims should succeed."
+    assert claimed[0] == "https://counter.com", "A successful claim should return the target URL."
+    assert url.clicks == 3
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_claim_one_time_use_url(session_factory, db_session):
+    """Test that a one-time-use URL can only be claimed once."""
+    url = await make_url(db_session, "once0001", one_time_use=True)
+    async with session_factory() as db:
+        assert await claim_limited_click(db, url.id) == "https://counter.com"
+        assert await claim_limited_click(db, url.id) is None, "Second claim should fail."
+    await db_session.refresh(url)
+    assert url.clicks == 1
+    assert url.expired_at is not None, "Consumed one-time URL should be marked expired."
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
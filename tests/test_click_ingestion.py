@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import select, delete, func, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database.base import Base
+from app.models.click_log import ClickLog
+from app.models.url import Url
+from app.models.url_sketch import UrlSketch
+from app.services.click_ingestion import ClickEvent, ClickIngestor, OverflowPolicy
+from app.services.unique_visitors import get_url_visitors
+
+
+@pytest.fixture
+async def url(db_session):
+    url = Url(original_url="https://ingest.com", short_code="ingest01")
+    db_session.add(url)
+    await db_session.commit()
+    yield url
+    await db_session.execute(delete(ClickLog).where(ClickLog.url_id == url.id))
+    await db_session.execute(delete(UrlSketch).where(UrlSketch.url_id == url.id))
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
+
+
+def make_ingestor(test_engine, **kwargs):
+    session_factory = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    return ClickIngestor(session_factory=session_factory, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_ingestor_flushes_batch(test_engine, db_session, url):
+    """Test that queued events are written in one batch."""
+    ingestor = make_ingestor(test_engine, batch_size=10, flush_interval=0.05)
+    await ingestor.start()
+    for _ in range(4):
+        await ingestor.submit(ClickEvent(url_id=url.id, referrer=None, user_agent="ua", ip_address="1.2.3.4"))
+    await ingestor.stop()
+
+    logs = await db_session.scalar(select(func.count()).select_from(ClickLog).where(ClickLog.url_id == url.id))
+    assert logs == 4, "Every queued event should be stored."
+    assert ingestor.stats()["batches"] == 1, "Events should be flushed in a single batch."
+    assert (await get_url_visitors(db_session, url.id)).count() == 1, "Visitors should be sketched on ingestion."
+
+@pytest.mark.asyncio
+async def test_ingestor_drops_newest_when_full(test_engine):
+    """Test the drop_newest overflow policy."""
+    ingestor = make_ingestor(test_engine, max_queue_size=1, overflow_policy=OverflowPolicy.DROP_NEWEST)
+    assert await ingestor.submit(ClickEvent(url_id=1, referrer=None, user_agent=None, ip_address=None))
+    assert not await ingestor.submit(ClickEvent(url_id=2, referrer=None, user_agent=None, ip_address=None))
+    assert ingestor.stats()["dropped"] == 1
+
+@pytest.mark.asyncio
+async def test_ingestor_drops_oldest_when_full(test_engine):
+    """Test the drop_oldest overflow policy keeps the newest event."""
+    ingestor = make_ingestor(test_engine, max_queue_size=1, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    await ingestor.submit(ClickEvent(url_id=1, referrer=None, user_agent=None, ip_address=None))
+    assert await ingestor.submit(ClickEvent(url_id=2, referrer=None, user_agent=None, ip_address=None))
+    assert ingestor._queue.get_nowait().url_id == 2, "Oldest event should have been dropped."
+
+@pytest.fixture
+async def fk_engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_ingestor_drops_orphan_events(fk_engine):
+    """Test that clicks for a deleted URL don't take the rest of the batch down with them."""
+    ingestor = make_ingestor(fk_engine)
+    async with ingestor.session_factory() as db:
+        url = Url(original_url="https://kept.com", short_code="kept0001")
+        db.add(url)
+        await db.commit()
+        url_id = url.id
+
+    batch = [ClickEvent(url_id=url_id, referrer=None, user_agent=None, ip_address=None) for _ in range(5)]
+    batch.append(ClickEvent(url_id=url_id + 1000, referrer=None, user_agent=None, ip_address=None))
+    await ingestor.flush(batch)
+
+    async with ingestor.session_factory() as db:
+        logs = await db.scalar(select(func.count()).select_from(ClickLog))
+    assert logs == 5, "Events of existing URLs should still be stored."
+    assert ingestor.stats()["flushed"] == 5
+    assert ingestor.stats()["orphaned"] == 1
+    assert ingestor.stats()["failed"] == 0
+
+@pytest.mark.asyncio
+async def test_ingestor_keeps_batch_on_transient_error(test_engine):
+    """Test that a batch failing with a non-integrity error is kept for a retry."""
+    def broken_session():
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    ingestor = ClickIngestor(session_factory=broken_session, max_retries=1)
+    batch = [ClickEvent(url_id=1, referrer=None, user_agent=None, ip_address=None)]
+    await ingestor.flush(batch)
+    assert ingestor.stats()["pending_retry"] == 1, "Batch should be kept for a retry."
+    assert ingestor.stats()["failed"] == 0
+    await ingestor.flush(batch)
+    assert ingestor.stats()["failed"] == 1, "Batch should be dropped once retries are exhausted."
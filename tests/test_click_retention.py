@@ -0,0 +1,110 @@
+import csv
+import datetime
+import gzip
+import pytest
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.click_log import ClickLog
+from app.models.click_rollup import RollupCheckpoint
+from app.models.url import Url
+from app.services.click_retention import ClickRetentionWorker, month_start, next_month
+from app.services.rollup import CLICK_ROLLUP_CHECKPOINT
+
+
+@pytest.fixture
+async def url(db_session):
+    url = Url(original_url="https://retention.com", short_code="retain01")
+    db_session.add(url)
+    await db_session.commit()
+    yield url
+    await db_session.execute(delete(ClickLog).where(ClickLog.url_id == url.id))
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
+
+
+@pytest.fixture
+async def rolled_up_to(db_session):
+    """Moves the click rollup checkpoint for a test and puts it back afterwards."""
+    previous = await db_session.scalar(
+        select(RollupCheckpoint.last_id).where(RollupCheckpoint.name == CLICK_ROLLUP_CHECKPOINT)
+    )
+
+    async def move(last_id):
+        await db_session.execute(delete(RollupCheckpoint).where(RollupCheckpoint.name == CLICK_ROLLUP_CHECKPOINT))
+        await db_session.execute(insert(RollupCheckpoint).values(name=CLICK_ROLLUP_CHECKPOINT, last_id=last_id))
+        await db_session.commit()
+
+    yield move
+    await db_session.execute(delete(RollupCheckpoint).where(RollupCheckpoint.name == CLICK_ROLLUP_CHECKPOINT))
+    if previous is not None:
+        await db_session.execute(insert(RollupCheckpoint).values(name=CLICK_ROLLUP_CHECKPOINT, last_id=previous))
+    await db_session.commit()
+
+
+async def add_clicks(db_session, url_id, times):
+    await db_session.execute(insert(ClickLog).values([
+        {"url_id": url_id, "clicked_at": at, "referrer": "https://a.com", "ip_address": "10.0.0.1"} for at in times
+    ]))
+    await db_session.commit()
+    result = await db_session.execute(select(ClickLog.id).where(ClickLog.url_id == url_id).order_by(ClickLog.id))
+    return list(result.scalars().all())
+
+
+def make_worker(test_engine, export_dir, **kwargs):
+    return ClickRetentionWorker(
+        sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+        export_dir=str(export_dir),
+        **{"retention_days": 365, "chunk_size": 2, **kwargs},
+    )
+
+
+def test_month_arithmetic():
+    """Test month boundaries, including the turn of the year."""
+    value = datetime.datetime(2025, 12, 31, 23, 59, tzinfo=datetime.timezone.utc)
+    assert month_start(value) == datetime.datetime(2025, 12, 1, tzinfo=datetime.timezone.utc)
+    assert next_month(month_start(value)) == datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_retention_exports_and_deletes_old_months(test_engine, db_session, url, rolled_up_to, tmp_path):
+    """Test that months past the retention period are exported to compressed CSV files and deleted."""
+    utc = datetime.timezone.utc
+    recent = datetime.datetime.now(utc) - datetime.timedelta(days=1)
+    ids = await add_clicks(db_session, url.id, [
+        datetime.datetime(2020, 1, 3, tzinfo=utc),
+        datetime.datetime(2020, 1, 20, tzinfo=utc),
+        datetime.datetime(2020, 1, 31, 23, 59, tzinfo=utc),
+        datetime.datetime(2020, 2, 1, tzinfo=utc),
+        recent,
+    ])
+    await rolled_up_to(ids[-1])
+
+    worker = make_worker(test_engine, tmp_path)
+    assert await worker.run_once() == 4
+    assert worker.deleted_rows == 4
+
+    files = sorted((tmp_path / "default").iterdir())
+    assert [path.name[:len("click_logs_2020_01")] for path in files] == ["click_logs_2020_01", "click_logs_2020_02"]
+    with gzip.open(files[0], "rt", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [int(row["id"]) for row in rows] == ids[:3]
+    assert rows[0]["referrer"] == "https://a.com"
+
+    remaining = (await db_session.execute(select(ClickLog.id).where(ClickLog.url_id == url.id))).scalars().all()
+    assert remaining == [ids[-1]]
+
+
+@pytest.mark.asyncio
+async def test_retention_keeps_clicks_not_rolled_up(test_engine, db_session, url, rolled_up_to, tmp_path):
+    """Test that click logs the rollups have not seen yet are neither exported nor deleted."""
+    utc = datetime.timezone.utc
+    ids = await add_clicks(db_session, url.id, [
+        datetime.datetime(2020, 3, 1, tzinfo=utc),
+        datetime.datetime(2020, 3, 2, tzinfo=utc),
+    ])
+    await rolled_up_to(ids[0])
+
+    assert await make_worker(test_engine, tmp_path).run_once() == 1
+    remaining = (await db_session.execute(select(ClickLog.id).where(ClickLog.url_id == url.id))).scalars().all()
+    assert remaining == [ids[1]]
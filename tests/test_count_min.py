@@ -0,0 +1,49 @@
+import pytest
+from app.core.count_min import CountMinSketch
+from app.services.redirect_throttle import RedirectThrottle
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_count_min_sketch_never_undercounts():
+    """Test that estimates are at least the true counts and close to them for heavy hitters."""
+    sketch = CountMinSketch(width=512, depth=4)
+    for i in range(5000):
+        sketch.add(f"light{i}")
+    for _ in range(1000):
+        sketch.add("heavy")
+    assert sketch.estimate("heavy") >= 1000
+    assert sketch.estimate("heavy") <= 1000 + sketch.error_bound * sketch.total
+    assert all(sketch.estimate(f"light{i}") >= 1 for i in range(0, 5000, 50))
+    assert sketch.estimate("never-added") <= sketch.error_bound * sketch.total
+    assert sketch.memory_bytes == 512 * 4 * 8
+
+
+def test_redirect_throttle_flags_heavy_ips_and_codes():
+    """Test that IPs and codes over their limits are throttled until the window slides past them."""
+    clock = Clock(0.0)
+    throttle = RedirectThrottle(enabled=True, window_seconds=60, code_limit=5, ip_limit=3, clock=clock)
+    assert [throttle.hit("abc", "10.0.0.1") for _ in range(4)] == [False, False, False, True]
+    assert throttle.hit("abc", "10.0.0.2") is False
+    assert throttle.hit("abc", "10.0.0.3") is True, "The code is over its limit whatever the IP."
+    assert throttle.hit("xyz", "10.0.0.3") is False
+
+    clock.now = 60 + 59  # the previous window still counts for a sixtieth
+    assert throttle.hit("abc", "10.0.0.1") is False
+    clock.now = 300
+    assert throttle.hit("abc", "10.0.0.1") is False
+    assert throttle.stats()["throttled"] == 2
+
+
+def test_redirect_throttle_disabled_or_misconfigured():
+    """Test that a disabled throttle lets everything through and unknown actions are refused."""
+    throttle = RedirectThrottle(enabled=False, ip_limit=0)
+    assert throttle.hit("abc", "10.0.0.1") is False
+    with pytest.raises(ValueError):
+        RedirectThrottle(action="drop")
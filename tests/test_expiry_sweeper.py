@@ -0,0 +1,86 @@
+import datetime
+import pytest
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.archive import ArchivedClickLog, ArchivedUrl
+from app.models.click_log import ClickLog
+from app.models.click_rollup import ClickRollupHourly
+from app.models.url import Url
+from app.services.expiry_sweeper import EXPIRY_SWEEP_CHECKPOINT, ExpirySweeper
+from app.services.rollup import get_rollup_checkpoint
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+@pytest.fixture
+async def urls(db_session):
+    urls = {
+        "alive": Url(original_url="https://alive.com", short_code="sweep01"),
+        "expired": Url(original_url="https://expired.com", short_code="sweep02", expired_at=NOW - datetime.timedelta(days=3)),
+        "grace": Url(original_url="https://grace.com", short_code="sweep03", expired_at=NOW - datetime.timedelta(minutes=5)),
+        "exhausted": Url(original_url="https://exhausted.com", short_code="sweep04", max_clicks=2, clicks=2),
+        "consumed": Url(original_url="https://consumed.com", short_code="sweep05", one_time_use=True, clicks=1),
+        "limited": Url(original_url="https://limited.com", short_code="sweep06", max_clicks=2, clicks=1),
+    }
+    db_session.add_all(urls.values())
+    await db_session.commit()
+    ids = [url.id for url in urls.values()]
+    yield urls
+    for model in (ClickLog, ClickRollupHourly, ArchivedClickLog):
+        await db_session.execute(delete(model).where(model.url_id.in_(ids)))
+    for model in (Url, ArchivedUrl):
+        await db_session.execute(delete(model).where(model.id.in_(ids)))
+    await db_session.commit()
+
+
+def make_sweeper(test_engine, **kwargs):
+    kwargs = {"grace_seconds": 3600, "scan_size": 2, "batch_size": 1, "chunk_size": 2, "pause": 0, **kwargs}
+    return ExpirySweeper(sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_sweeper_archives_dead_urls(test_engine, db_session, urls):
+    """Test that a sweep moves dead URLs and their click logs to the archive tables in small batches."""
+    expired = urls["expired"]
+    await db_session.execute(insert(ClickLog).values([
+        {"url_id": url.id, "clicked_at": NOW - datetime.timedelta(days=4), "ip_address": f"10.0.0.{i}"}
+        for i, url in enumerate([expired] * 5 + [urls["alive"]])
+    ]))
+    await db_session.execute(insert(ClickRollupHourly).values(
+        url_id=expired.id, bucket_start=NOW.replace(minute=0, second=0, microsecond=0), clicks=5, unique_visitors=5,
+    ))
+    await db_session.commit()
+
+    sweeper = make_sweeper(test_engine)
+    assert await sweeper.run_once() >= 3
+
+    ids = {name: url.id for name, url in urls.items()}
+    remaining = set((await db_session.execute(select(Url.id).where(Url.id.in_(ids.values())))).scalars())
+    assert remaining == {ids["alive"], ids["grace"], ids["limited"]}
+    archived = dict((await db_session.execute(
+        select(ArchivedUrl.id, ArchivedUrl.short_code).where(ArchivedUrl.id.in_(ids.values()))
+    )).all())
+    assert archived == {ids["expired"]: "sweep02", ids["exhausted"]: "sweep04", ids["consumed"]: "sweep05"}
+
+    assert len((await db_session.execute(
+        select(ArchivedClickLog.id).where(ArchivedClickLog.url_id == expired.id)
+    )).all()) == 5
+    assert await db_session.scalar(select(ClickLog.id).where(ClickLog.url_id == expired.id)) is None
+    assert await db_session.scalar(select(ClickLog.id).where(ClickLog.url_id == ids["alive"])) is not None
+    assert await db_session.scalar(select(ClickRollupHourly.url_id).where(ClickRollupHourly.url_id == expired.id)) is None
+    assert await get_rollup_checkpoint(db_session, EXPIRY_SWEEP_CHECKPOINT) == 0, "A full pass rewinds the checkpoint."
+
+
+@pytest.mark.asyncio
+async def test_sweeper_keeps_revived_urls(test_engine, db_session, urls):
+    """Test that a URL revived between the scan and its archival stays in place."""
+    expired = urls["expired"]
+    await db_session.execute(
+        Url.__table__.update().where(Url.id == expired.id).values(expired_at=NOW + datetime.timedelta(days=1))
+    )
+    await db_session.commit()
+
+    sweeper = make_sweeper(test_engine)
+    assert await sweeper.archive([expired.id], NOW - datetime.timedelta(hours=1)) == 0
+    assert await db_session.scalar(select(Url.id).where(Url.id == expired.id)) == expired.id
@@ -0,0 +1,30 @@
+import pytest
+from app.core.hashring import ConsistentHashRing
+
+
+def test_ring_spreads_keys_over_nodes():
+    """Test that keys are spread roughly evenly and always map to the same node."""
+    ring = ConsistentHashRing(["a", "b", "c", "d"])
+    keys = [f"code{i}" for i in range(20_000)]
+    owners = [ring.node_for(key) for key in keys]
+    for node in "abcd":
+        assert 0.15 < owners.count(node) / len(keys) < 0.35
+    assert owners == [ring.node_for(key) for key in keys]
+
+def test_adding_a_node_moves_a_bounded_share_of_keys():
+    """Test that a new node only takes over about 1/N of the keys, and only onto itself."""
+    ring = ConsistentHashRing(["a", "b", "c", "d"])
+    keys = [f"code{i}" for i in range(20_000)]
+    before = {key: ring.node_for(key) for key in keys}
+    ring.add("e")
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert all(ring.node_for(key) == "e" for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.3
+
+    ring.remove("e")
+    assert {key: ring.node_for(key) for key in keys} == before
+
+def test_empty_ring_has_no_owner():
+    """Test that an empty ring refuses lookups."""
+    with pytest.raises(LookupError):
+        ConsistentHashRing().node_for("abc")
@@ -0,0 +1,46 @@
+import pytest
+from app.core.hll import HyperLogLog
+
+
+def test_hll_estimates_within_error_bound():
+    """Test that estimates stay within four standard errors of the true cardinality."""
+    for cardinality in (1_000, 50_000):
+        sketch = HyperLogLog()
+        for i in range(cardinality):
+            sketch.add(f"10.{i}")
+        assert abs(sketch.count() - cardinality) <= 4 * sketch.relative_error * cardinality
+
+def test_hll_small_cardinality_and_duplicates():
+    """Test that repeated values are only counted once."""
+    sketch = HyperLogLog()
+    for _ in range(3):
+        for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+            sketch.add(ip)
+    assert sketch.count() == 3
+
+def test_hll_merge_estimates_union():
+    """Test that merged sketches estimate the union of their values."""
+    first, second = HyperLogLog(), HyperLogLog()
+    for i in range(2000):
+        first.add(str(i))
+        second.add(str(i + 1000))
+    merged = first.merge(second)
+    assert abs(merged.count() - 3000) <= 4 * merged.relative_error * 3000
+
+def test_hll_serialization_roundtrip():
+    """Test that sparse and dense serializations restore the same registers."""
+    sparse = HyperLogLog()
+    sparse.add("only")
+    assert len(sparse.to_bytes()) < 16, "A nearly empty sketch should serialize sparsely."
+    assert HyperLogLog.from_bytes(sparse.to_bytes()).registers == sparse.registers
+
+    dense = HyperLogLog()
+    for i in range(20_000):
+        dense.add(str(i))
+    assert len(dense.to_bytes()) == dense.size + 3
+    assert HyperLogLog.from_bytes(dense.to_bytes()).registers == dense.registers
+
+def test_hll_rejects_mismatched_precision():
+    """Test that sketches of different precisions can't be merged."""
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(10))
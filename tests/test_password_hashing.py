@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import pytest
+from app.core.security import (
+    PasswordHashPool,
+    PasswordHashPoolBusy,
+    get_password_hash_async,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_hash_round_trip():
+    """Test that passwords hashed on the pool verify on the pool."""
+    hashed = await get_password_hash_async("s3cret-pass")
+    assert await verify_password_async("s3cret-pass", hashed)
+    assert not await verify_password_async("wrong-pass", hashed)
+
+@pytest.mark.asyncio
+async def test_pool_keeps_event_loop_responsive():
+    """Test that the event loop keeps running while a hash job blocks a pool thread."""
+    pool = PasswordHashPool(max_workers=1, queue_size=0)
+    release = threading.Event()
+    job = asyncio.create_task(pool.run(release.wait, 5))
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert ticks == 5 and not job.done()
+    release.set()
+    assert await job is True
+    pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_pool_rejects_jobs_beyond_queue_limit():
+    """Test that jobs beyond the workers and queue slots are rejected and wait times are recorded."""
+    pool = PasswordHashPool(max_workers=1, queue_size=1)
+    release = threading.Event()
+    jobs = [asyncio.create_task(pool.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordHashPoolBusy):
+        await pool.run(release.wait, 5)
+    release.set()
+    await asyncio.gather(*jobs)
+
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["max_wait_seconds"] >= 0
+    pool.shutdown()
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from app.services.qr import QrCodeRenderer, qr_etag
+
+
+@pytest.mark.asyncio
+async def test_qr_renderer_caches_and_coalesces():
+    """Test that concurrent requests for one image render it once and later ones hit the cache."""
+    renderer = QrCodeRenderer(max_workers=0, cache_size=10, cache_ttl_seconds=60)
+    first, second = await asyncio.gather(
+        renderer.render("https://sho.rt/abc"),
+        renderer.render("https://sho.rt/abc"),
+    )
+    assert first is second
+    assert renderer.rendered == 1 and renderer.coalesced == 1
+    assert await renderer.render("https://sho.rt/abc") is first
+    assert renderer.cache.hits == 1
+
+    svg = await renderer.render("https://sho.rt/abc", image_format="svg")
+    assert svg.media_type == "image/svg+xml"
+    assert renderer.rendered == 2
+
+
+@pytest.mark.asyncio
+async def test_qr_renderer_process_pool():
+    """Test that QR codes render in worker processes."""
+    renderer = QrCodeRenderer(max_workers=1, cache_size=10, cache_ttl_seconds=60)
+    try:
+        rendered = await renderer.render("https://sho.rt/pool", box_size=2, error_correction="Q")
+    finally:
+        renderer.shutdown()
+    assert rendered.content.startswith(b"\x89PNG")
+
+
+def test_qr_etag_depends_on_every_option():
+    """Test that ETags differ whenever the rendered image would."""
+    base = qr_etag("https://sho.rt/abc", 10, "png", "L")
+    assert base == qr_etag("https://sho.rt/abc", 10, "png", "L")
+    assert len({
+        base,
+        qr_etag("https://sho.rt/abd", 10, "png", "L"),
+        qr_etag("https://sho.rt/abc", 11, "png", "L"),
+        qr_etag("https://sho.rt/abc", 10, "svg", "L"),
+        qr_etag("https://sho.rt/abc", 10, "png", "H"),
+    }) == 5
+
+
+@pytest.mark.asyncio
+async def test_stream_qr_zip_writes_entries_as_they_render():
+    """Test that the ZIP streams in several chunks and lists failed renders in its manifest."""
+    import io
+    import zipfile
+    from app.services.qr import stream_qr_zip
+
+    async def items():
+        for i in range(5):
+            yield f"code{i}", f"https://sho.rt/code{i}"
+        yield "toolong", "x" * 5000
+
+    renderer = QrCodeRenderer(max_workers=0, cache_size=10, cache_ttl_seconds=60)
+    chunks = [chunk async for chunk in stream_qr_zip(items(), renderer, box_size=1, concurrency=2)]
+    assert len(chunks) > 2, "Entries should be streamed as they are rendered."
+    assert len(renderer.cache) == 0, "Bulk renders should not fill the cache."
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == ["code0.png", "code1.png", "code2.png", "code3.png", "code4.png", "manifest.csv"]
+    manifest = archive.read("manifest.csv").decode().splitlines()
+    assert len(manifest) == 7
+    assert any(line.startswith(",xxxx") for line in manifest), "Failed renders should be listed with their error."
@@ -0,0 +1,160 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi_limiter import FastAPILimiter, default_identifier
+from httpx import ASGITransport, AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.core.config import settings
+from app.core.rate_limit import RateLimit, SlidingWindowLimiter, local_rate_limiter
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incrby(self, key, amount):
+        self.commands.append(("incrby", key, amount))
+
+    def pexpire(self, key, milliseconds):
+        self.commands.append(("pexpire", key, milliseconds))
+
+    async def execute(self):
+        if self.redis.fail:
+            raise RedisConnectionError("redis is down")
+        results = []
+        for command, key, value in self.commands:
+            if command == "incrby":
+                self.redis.counters[key] = self.redis.counters.get(key, 0) + value
+                results.append(self.redis.counters[key])
+            else:
+                results.append(True)
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.counters = {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def test_limiter_blocks_after_limit():
+    """Test that hits over the limit are rejected with the time left until the next one is allowed."""
+    clock = Clock(1000.0)
+    limiter = SlidingWindowLimiter(shards=4, clock=clock)
+    assert all(limiter.hit("client", 3, 60) == 0 for _ in range(3))
+    retry_after = limiter.hit("client", 3, 60)
+    assert 0 < retry_after <= 60
+    assert limiter.hit("other", 3, 60) == 0, "Limits are per key."
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_limiter_slides_over_previous_window():
+    """Test that hits of the previous window keep counting for the part of it still covered."""
+    clock = Clock(960.0)  # start of a 60 second window
+    limiter = SlidingWindowLimiter(shards=1, clock=clock)
+    for _ in range(4):
+        assert limiter.hit("client", 4, 60) == 0
+
+    clock.now = 1020.0 + 15  # a quarter into the next window: 3 of the 4 hits still count
+    assert limiter.hit("client", 4, 60) == 0
+    retry_after = limiter.hit("client", 4, 60)
+    assert retry_after == pytest.approx(15.0)
+
+    clock.now += retry_after
+    assert limiter.hit("client", 4, 60) == 0
+
+    clock.now = 1200.0  # two windows later everything has expired
+    assert all(limiter.hit("client", 4, 60) == 0 for _ in range(4))
+
+
+def test_limiter_sweeps_idle_keys():
+    """Test that keys whose windows have passed are dropped as the shard keeps being hit."""
+    clock = Clock(1000.0)
+    limiter = SlidingWindowLimiter(shards=1, sweep_every=5, clock=clock)
+    for i in range(3):
+        limiter.hit(f"idle-{i}", 10, 1)
+    clock.now += 10
+    for _ in range(2):
+        limiter.hit("active", 10, 1)
+    assert limiter.stats()["keys"] == 1
+    assert limiter.stats()["swept"] == 3
+
+
+@pytest.mark.asyncio
+async def test_hybrid_sync_shares_counts_between_workers():
+    """Test that synced counts make every worker enforce the limit for all of them."""
+    clock = Clock(1000.0)
+    redis = FakeRedis()
+    first = SlidingWindowLimiter(shards=2, clock=clock)
+    second = SlidingWindowLimiter(shards=2, clock=clock)
+    first._redis = second._redis = redis
+
+    for _ in range(3):
+        assert first.hit("client", 5, 60) == 0
+    assert second.hit("client", 5, 60) == 0
+    assert await first.sync() == 1
+    assert await second.sync() == 1
+    assert await first.sync() == 1, "Live keys keep refreshing the counts of the other workers."
+    assert sum(redis.counters.values()) == 4
+
+    assert first.hit("client", 5, 60) == 0
+    assert first.hit("client", 5, 60) > 0
+    assert second.hit("client", 5, 60) == 0, "Hits since the last sync are only counted locally."
+    await first.sync()
+    await second.sync()
+    assert second.hit("client", 5, 60) > 0
+
+
+@pytest.mark.asyncio
+async def test_hybrid_sync_failure_keeps_hits_pending():
+    """Test that hits which could not be synced are sent again with the next sync."""
+    clock = Clock(1000.0)
+    redis = FakeRedis()
+    limiter = SlidingWindowLimiter(shards=1, clock=clock)
+    limiter._redis = redis
+    limiter.hit("client", 5, 60)
+    limiter.hit("client", 5, 60)
+
+    redis.fail = True
+    with pytest.raises(RedisConnectionError):
+        await limiter.sync()
+    redis.fail = False
+    await limiter.sync()
+    assert list(redis.counters.values()) == [2]
+
+
+@pytest.mark.asyncio
+async def test_dependency_falls_back_to_local_limiter():
+    """Test that the limiter keeps enforcing limits in process when Redis fails."""
+    class BrokenRedis:
+        async def evalsha(self, *args, **kwargs):
+            raise RedisConnectionError("redis is down")
+
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(RateLimit(times=2, seconds=60))])
+    async def limited():
+        return {"ok": True}
+
+    local_rate_limiter.reset()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(FastAPILimiter, "redis", BrokenRedis())
+        patch.setattr(FastAPILimiter, "identifier", default_identifier)
+        patch.setattr(settings, "RATE_LIMIT_BACKEND", "redis")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            responses = [await client.get("/limited") for _ in range(3)]
+    local_rate_limiter.reset()
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert int(responses[-1].headers["Retry-After"]) > 0
@@ -0,0 +1,93 @@
+import datetime
+import pytest
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.click_log import ClickLog
+from app.models.click_rollup import ClickRollupHourly, ClickRollupDaily, ClickRollupDimension
+from app.models.url import Url
+from app.schemas.url import AnalyticsBucket
+from app.services.analytics import get_url_analytics
+from app.services.rollup import ClickRollupWorker, get_rollup_checkpoint
+
+BASE = datetime.datetime(2026, 2, 1, 8, 30, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+async def url(db_session):
+    url = Url(original_url="https://rollup.com", short_code="rollup01", user_id=424242)
+    db_session.add(url)
+    await db_session.commit()
+    yield url
+    for model in (ClickRollupDimension, ClickRollupHourly, ClickRollupDaily, ClickLog):
+        await db_session.execute(delete(model).where(model.url_id == url.id))
+    await db_session.execute(delete(Url).where(Url.id == url.id))
+    await db_session.commit()
+
+
+async def add_clicks(db_session, url_id, clicks):
+    await db_session.execute(insert(ClickLog).values([
+        {"url_id": url_id, "clicked_at": at, "referrer": referrer, "user_agent": "ua", "ip_address": ip}
+        for at, referrer, ip in clicks
+    ]))
+    await db_session.commit()
+
+
+def make_worker(test_engine, **kwargs):
+    return ClickRollupWorker(sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_rollup_aggregates_clicks(test_engine, db_session, url):
+    """Test that click logs are folded into hourly, daily and dimension rollups in batches."""
+    await add_clicks(db_session, url.id, [
+        (BASE, "https://a.com", "10.0.0.1"),
+        (BASE + datetime.timedelta(minutes=5), "https://a.com", "10.0.0.2"),
+        (BASE + datetime.timedelta(hours=2), None, "10.0.0.1"),
+    ])
+    worker = make_worker(test_engine, batch_size=2)
+    await worker.roll_up(await db_session.scalar(select(func.max(ClickLog.id))))
+
+    hourly = (await db_session.execute(
+        select(ClickRollupHourly.clicks).where(ClickRollupHourly.url_id == url.id).order_by(ClickRollupHourly.bucket_start)
+    )).scalars().all()
+    daily, daily_visitors = (await db_session.execute(
+        select(ClickRollupDaily.clicks, ClickRollupDaily.unique_visitors).where(ClickRollupDaily.url_id == url.id)
+    )).one()
+    referrers = dict((await db_session.execute(
+        select(ClickRollupDimension.value, ClickRollupDimension.clicks)
+        .where(ClickRollupDimension.url_id == url.id, ClickRollupDimension.dimension == "referrer")
+    )).all())
+    assert hourly == [2, 1]
+    assert daily == 3, "Increments of several batches should be added up."
+    assert daily_visitors == 2, "A visitor seen in several batches should only be counted once."
+    assert referrers == {"https://a.com": 2, "": 1}
+
+@pytest.mark.asyncio
+async def test_rollup_settles_one_run_behind(test_engine, db_session, url):
+    """Test that a run only rolls up rows that were visible on the previous run."""
+    await add_clicks(db_session, url.id, [(BASE, None, "10.0.0.1")])
+    max_id = await db_session.scalar(select(func.max(ClickLog.id)))
+    worker = make_worker(test_engine)
+    assert await worker.run_once() == 0, "The first run should only observe the current maximum ID."
+    await add_clicks(db_session, url.id, [(BASE, None, "10.0.0.2")])
+    assert await worker.run_once() >= 1
+    assert await get_rollup_checkpoint(db_session) == max_id, "Rows inserted after the first run should wait."
+
+@pytest.mark.asyncio
+async def test_analytics_merges_rollups_and_tail(test_engine, db_session, url):
+    """Test that analytics combine rolled up buckets with not-yet-rolled click logs."""
+    await add_clicks(db_session, url.id, [(BASE, "https://a.com", "10.0.0.1")])
+    await make_worker(test_engine).roll_up(await db_session.scalar(select(func.max(ClickLog.id))))
+    await add_clicks(db_session, url.id, [
+        (BASE + datetime.timedelta(minutes=1), "https://b.com", "10.0.0.2"),
+        (BASE + datetime.timedelta(minutes=2), "https://b.com", "10.0.0.3"),
+    ])
+
+    analytics = await get_url_analytics(
+        db_session, url.id, url.user_id, BASE, BASE + datetime.timedelta(hours=1), AnalyticsBucket.HOUR
+    )
+    assert analytics.range_clicks == 3
+    assert [(b.bucket.hour, b.clicks) for b in analytics.timeseries] == [(8, 3)]
+    assert [(r.value, r.clicks) for r in analytics.top_referrers] == [("https://b.com", 2), ("https://a.com", 1)]
+    assert analytics.unique_visitors == 3
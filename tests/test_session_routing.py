@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database.base import Base
+from app.database.routing import SessionRouter
+from app.database.session import session_router
+
+
+def _factory(engine):
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def replica_engines(tmp_path):
+    engines = [create_async_engine(f"sqlite+aiosqlite:///{tmp_path / f'replica{i}.db'}") for i in range(2)]
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("CREATE TABLE replica_name (name TEXT)"))
+            await conn.execute(text("INSERT INTO replica_name VALUES (:name)"), {"name": engine.url.database})
+    yield engines
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_over_healthy_replicas(replica_engines, tmp_path):
+    """Test that reads alternate between replicas and skip one that fails its health check."""
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = SessionRouter([_factory(engine) for engine in replica_engines] + [_factory(broken)])
+    await router.check_health()
+    assert router.stats()["healthy_replicas"] == 2
+
+    names = set()
+    for _ in range(4):
+        async with router.read_session_factory()() as db:
+            names.add(await db.scalar(text("SELECT name FROM replica_name")))
+    assert names == {engine.url.database for engine in replica_engines}
+    await broken.dispose()
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary():
+    """Test that reads go to the primary without replicas and stay there right after a user's write."""
+    assert SessionRouter().read_session_factory() is None
+
+    router = SessionRouter([lambda: None], sticky_seconds=60)
+    router.record_write(1)
+    assert router.read_session_factory(1) is None
+    assert router.read_session_factory(2) is not None
+    assert router.stats()["sticky_reads"] == 1
+
+@pytest.mark.asyncio
+async def test_user_reads_their_own_writes(async_client, user_token, replica_engines, monkeypatch):
+    """Test that a lagging replica serves listings, except right after the user created a URL."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    monkeypatch.setattr(session_router, "replicas", [_factory(replica_engines[0])])
+    monkeypatch.setattr(session_router, "_healthy", [True])
+    session_router._recent_writers.clear()
+
+    response = await async_client.get("/api/v1/url/", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [], "The empty replica should have served the listing."
+
+    response = await async_client.post("/api/v1/url/", json={"original_url": "https://example.com/ryw"}, headers=headers)
+    assert response.status_code == 201
+    code = response.json()["short_code"]
+    response = await async_client.get("/api/v1/url/", headers=headers)
+    assert code in [url["short_code"] for url in response.json()]
+
+    response = await async_client.get(f"/{code}", follow_redirects=False)
+    assert response.status_code == 307, "Codes unknown to the replica should be resolved on the primary."
+    session_router._recent_writers.clear()
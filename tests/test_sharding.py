@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.hashring import ConsistentHashRing
+from app.database.base import Base
+from app.database.session import shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.models.click_log import ClickLog
+from app.models.url import Url
+from app.services.click_ingestion import ClickEvent, ClickIngestor
+
+
+@pytest.fixture
+async def second_shard(tmp_path, test_engine, monkeypatch):
+    """
+    Splits short codes between the test database and a second SQLite database, whose URL IDs
+    start far above the first one's so they stay unique across shards.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'shard.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Url(id=1_000_000, original_url="https://seed.com", short_code="shard-seed"))
+        await db.commit()
+
+    default = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(shard_router, "shards", {DEFAULT_SHARD: default, "second": factory})
+    monkeypatch.setattr(shard_router, "ring", ConsistentHashRing([DEFAULT_SHARD, "second"]))
+    yield factory
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_urls_are_spread_over_shards(async_client, user_token, db_session, second_shard):
+    """Test that URLs are stored on the shard of their code and served from there."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    created = []
+    for i in range(12):
+        response = await async_client.post(
+            "/api/v1/url/", json={"original_url": f"https://sharded.com/{i}"}, headers=headers
+        )
+        assert response.status_code == 201
+        created.append(response.json())
+    response = await async_client.post(
+        "/api/v1/url/bulk",
+        json={"items": [{"original_url": f"https://sharded.com/bulk{i}"} for i in range(8)]},
+        headers=headers,
+    )
+    created += [result["url"] for result in response.json()["results"]]
+
+    async with second_shard() as db:
+        on_second = set((await db.execute(select(Url.short_code).where(Url.user_id.is_not(None)))).scalars())
+    codes = {url["short_code"] for url in created}
+    assert on_second and on_second < codes, "Both shards should have received URLs."
+    assert all(shard_router.shard_for(code) == "second" for code in on_second)
+
+    listed = (await async_client.get("/api/v1/url/?limit=500", headers=headers)).json()
+    ids = [url["id"] for url in listed]
+    assert ids == sorted(ids, reverse=True)
+    assert codes <= {url["short_code"] for url in listed}, "Listing should merge every shard."
+
+    remote = next(url for url in created if url["short_code"] in on_second)
+    response = await async_client.get(f"/api/v1/url/{remote['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["short_code"] == remote["short_code"]
+    response = await async_client.get(f"/{remote['short_code']}", follow_redirects=False)
+    assert response.status_code == 307
+
+    for url in created:
+        response = await async_client.delete(f"/api/v1/url/{url['id']}", headers=headers)
+        assert response.status_code == 204
+    async with second_shard() as db:
+        assert await db.scalar(select(func.count()).select_from(Url)) == 1
+
+@pytest.mark.asyncio
+async def test_clicks_are_ingested_on_their_shard(test_engine, second_shard):
+    """Test that click events are written to the shard of their URL."""
+    default = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    ingestor = ClickIngestor(session_factory=default)
+    await ingestor.flush([
+        ClickEvent(url_id=1_000_000, referrer=None, user_agent="ua", ip_address="1.2.3.4", shard="second")
+    ])
+    async with second_shard() as db:
+        assert await db.scalar(select(func.count()).select_from(ClickLog)) == 1
+    async with default() as db:
+        assert await db.scalar(select(func.count()).select_from(ClickLog).where(ClickLog.url_id == 1_000_000)) == 0
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import delete
+from app.models.short_code_sequence import ShortCodeSequence
+from app.services.short_code import SequenceShortCodeAllocator, RandomShortCodeAllocator
+
+
+def test_scrambled_codes_are_unique():
+    """Test that scrambling is a bijection over the code space."""
+    allocator = SequenceShortCodeAllocator(length=2, scramble=True, key="test-key")
+    codes = {allocator.encode(value) for value in range(62 ** 2)}
+    assert len(codes) == 62 ** 2, "Every counter value should map to a distinct code."
+
+def test_scrambled_codes_decode():
+    """Test that scrambled codes decode back to their counter value."""
+    allocator = SequenceShortCodeAllocator(length=6, key="test-key")
+    for value in (0, 1, 999, 123456):
+        code = allocator.encode(value)
+        assert len(code) == 6
+        assert allocator.decode(code) == value
+
+def test_scrambled_codes_depend_on_key():
+    """Test that the permutation is keyed, so codes can't be predicted without the key."""
+    first = SequenceShortCodeAllocator(length=6, key="first-key")
+    second = SequenceShortCodeAllocator(length=6, key="second-key")
+    assert [first.encode(v) for v in range(10)] != [second.encode(v) for v in range(10)]
+
+def test_scramble_requires_key():
+    """Test that the placeholder SECRET_KEY is rejected as a scramble key."""
+    with pytest.raises(ValueError):
+        SequenceShortCodeAllocator(length=6, key="")
+    with pytest.raises(ValueError):
+        SequenceShortCodeAllocator(length=6, key="your-super-secret-key")
+
+@pytest.mark.asyncio
+async def test_sequence_allocator_reserves_blocks(db_session):
+    """Test that codes are handed out from reserved blocks without collisions."""
+    first = SequenceShortCodeAllocator(block_size=3, key="test-key", sequence_name="test_blocks")
+    second = SequenceShortCodeAllocator(block_size=3, key="test-key", sequence_name="test_blocks")
+    codes = await first.allocate_many(db_session, 4) + await second.allocate_many(db_session, 4)
+    assert len(set(codes)) == 8, "Workers should never hand out the same code."
+    assert first.blocks_reserved == 2
+    await db_session.execute(delete(ShortCodeSequence).where(ShortCodeSequence.name == "test_blocks"))
+    await db_session.commit()
+
+@pytest.mark.asyncio
+async def test_random_allocator(db_session):
+    """Test that the random allocator returns codes of the configured length."""
+    code = await RandomShortCodeAllocator(length=8).allocate(db_session)
+    assert len(code) == 8
+
+class ScriptedAllocator:
+    def __init__(self, codes):
+        self.codes = list(codes)
+
+    async def allocate(self, db):
+        return self.codes.pop(0)
+
+    async def allocate_many(self, db, count):
+        return [self.codes.pop(0) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_retries_clashing_generated_code(db_session, monkeypatch):
+    """Test that a generated code clashing with an existing row is replaced instead of failing."""
+    from app.models.url import Url
+    from app.schemas.url import UrlCreate
+    from app.services import url as url_service
+
+    db_session.add(Url(original_url="https://old.com", short_code="clash01"))
+    await db_session.commit()
+    monkeypatch.setattr(url_service, "short_code_allocator", ScriptedAllocator(["clash01", "fresh01"]))
+
+    results = await url_service.create_short_urls_bulk(
+        db_session, None, [UrlCreate(original_url="https://new.com")]
+    )
+    assert results[0].error is None, "Generated code clashes should be retried."
+    assert results[0].url.short_code == "fresh01"
+    await db_session.execute(delete(Url).where(Url.short_code.in_(["clash01", "fresh01"])))
+    await db_session.commit()
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.database.session import shard_router
+from app.database.sharding import DEFAULT_SHARD
+from app.services.short_code_filter import ShortCodeFilter, short_code_filter
+
+
+@pytest.fixture
+def test_shards(test_engine, monkeypatch):
+    default = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(shard_router, "shards", {DEFAULT_SHARD: default})
+
+
+@pytest.mark.asyncio
+async def test_filter_rejects_unknown_codes(async_client, user_token, test_shards, monkeypatch):
+    """Test that a built filter 404s unknown codes without a lookup and lets existing and new codes through."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = await async_client.post("/api/v1/url/", json={"original_url": "https://bloom.com/old"}, headers=headers)
+    old_code = response.json()["short_code"]
+
+    monkeypatch.setattr(short_code_filter, "_filter", None)
+    await short_code_filter.rebuild()
+    rejected = short_code_filter.rejected
+
+    async def fail_lookup(*args, **kwargs):
+        raise AssertionError("Unknown codes should not reach the database.")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("app.api.v1.routes.redirect.resolve_short_code", fail_lookup)
+        response = await async_client.get("/wp-admin", follow_redirects=False)
+    assert response.status_code == 404
+    assert short_code_filter.rejected == rejected + 1
+
+    response = await async_client.post("/api/v1/url/", json={"original_url": "https://bloom.com/new"}, headers=headers)
+    new_code = response.json()["short_code"]
+    for code in (old_code, new_code):
+        assert short_code_filter.might_exist(code)
+        response = await async_client.get(f"/{code}", follow_redirects=False)
+        assert response.status_code == 307
+    short_code_filter.reset()
+
+@pytest.mark.asyncio
+async def test_filter_passes_everything_until_built():
+    """Test that an unbuilt or reset filter never rejects a code."""
+    code_filter = ShortCodeFilter(capacity=100)
+    assert code_filter.might_exist("anything")
+    code_filter.add("abc123")
+    assert code_filter.might_exist("missing")
@@ -1,6 +1,6 @@
 import pytest
 import base64
-from app.utils import generate_short_code, generate_qr_code_base64
+from app.utils import generate_short_code, generate_qr_code_base64, encode_base62, decode_base62
 
 
 def test_generate_short_code_length():
@@ -28,3 +28,14 @@ def test_generate_qr_code_base64():
         assert len(decoded) > 0, "Decoded QR should not be empty."
     except Exception:
         pytest.fail("QR code is not valid base64")
+
+def test_base62_round_trip():
+    """Test that base62 encoding round-trips and pads to width."""
+    for number in (0, 1, 61, 62, 123456789):
+        assert decode_base62(encode_base62(number)) == number
+    assert encode_base62(1, 6) == "aaaaab", "Encoded value should be left-padded."
+
+def test_base62_rejects_negative():
+    """Test that negative numbers cannot be encoded."""
+    with pytest.raises(ValueError):
+        encode_base62(-1)